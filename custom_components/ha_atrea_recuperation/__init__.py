@@ -11,28 +11,49 @@ Exposes:
 - number: target temperature (holding 1002)
 - sensors: input and holding registers from the device doc
 - buttons: coil actions (7001, 8000, 8001, 8002)
+- binary sensors: zone triggers (7103-7105), with an event on every edge
+- services: read_registers / write_registers for raw register blocks
 """
 
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT, Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT, EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import Event, HomeAssistant
 from homeassistant.helpers import discovery
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.util import slugify
 
 from .const import (
     DOMAIN,
+    CAPTURE_DIR,
+    DISCOVERY_DEVICE_KEY,
+    DEFAULT_BURST_WINDOW,
     DEFAULT_NAME,
+    DEFAULT_PIPELINE_DEPTH,
+    DEFAULT_REPLAY_SPEED,
+    DEFAULT_TRIGGER_INTERVAL,
+    CONF_CAPTURE,
+    CONF_IDENTITY,
+    CONF_BURST_WINDOW,
     CONF_MODBUS_HUB,
+    CONF_PIPELINE_DEPTH,
+    CONF_REPLAY,
+    CONF_REPLAY_SPEED,
+    CONF_TRIGGER_INTERVAL,
     CONF_UNIT,
     CONF_POLL_INTERVAL,
+    CONF_POLL_INTERVAL_MAX,
+    CONF_POLL_INTERVAL_MIN,
     DEFAULT_POLL_INTERVAL,
+    DEFAULT_POLL_INTERVAL_MAX,
+    DEFAULT_POLL_INTERVAL_MIN,
 )
+from .coordinator import create_coordinators
 from .hub import HaAtreaModbusHub
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -43,9 +64,15 @@ PLATFORMS: list[Platform] = [
     Platform.FAN,
     Platform.NUMBER,
     Platform.BUTTON,
+    Platform.BINARY_SENSOR,
 ]
 
 
+def _capture_path(hass: HomeAssistant, name: str, unit: int) -> str:
+    """Return the traffic capture file of a device in the config directory."""
+    return hass.config.path(CAPTURE_DIR, f"capture_{slugify(name)}_{unit}.jsonl")
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up HA Atrea Recuperation from a config entry."""
     hass.data.setdefault(DOMAIN, {})
@@ -63,6 +90,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         CONF_POLL_INTERVAL,
         entry.data.get(CONF_POLL_INTERVAL, DEFAULT_POLL_INTERVAL)
     )
+    poll_interval_min = entry.options.get(CONF_POLL_INTERVAL_MIN, DEFAULT_POLL_INTERVAL_MIN)
+    poll_interval_max = entry.options.get(CONF_POLL_INTERVAL_MAX, DEFAULT_POLL_INTERVAL_MAX)
+    burst_window = entry.options.get(CONF_BURST_WINDOW, DEFAULT_BURST_WINDOW)
+    pipeline_depth = int(entry.options.get(CONF_PIPELINE_DEPTH, DEFAULT_PIPELINE_DEPTH))
+    capture = entry.options.get(CONF_CAPTURE, False)
+    trigger_interval = float(entry.options.get(CONF_TRIGGER_INTERVAL, DEFAULT_TRIGGER_INTERVAL))
 
     # Create hub
     hub = HaAtreaModbusHub(
@@ -73,31 +106,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         unit=unit,
         modbus_hub_name=modbus_hub,
         poll_interval=poll_interval,
+        poll_interval_min=poll_interval_min,
+        poll_interval_max=poll_interval_max,
+        burst_window=burst_window,
+        pipeline_depth=pipeline_depth,
+        capture_path=_capture_path(hass, name, unit) if capture else None,
+        trigger_interval=trigger_interval,
         hvac_map=None,  # Use default
+        identity=entry.data.get(CONF_IDENTITY),
     )
 
-    # Create DataUpdateCoordinator
-    coordinator = DataUpdateCoordinator(
-        hass,
-        _LOGGER,
-        name=f"{DOMAIN}_{name}",
-        update_method=hub.async_update,
-        update_interval=timedelta(seconds=poll_interval),
-    )
+    # Create the poll coordinator and the coordinators entities subscribe to (one per polling tier)
+    coordinator, coordinators = create_coordinators(hass, hub, name)
 
-    # Perform initial refresh
-    await coordinator.async_config_entry_first_refresh()
+    # Perform initial refresh (HA retries the setup if the device cannot be read yet)
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        await hub.async_shutdown()
+        raise
 
     # Store hub and coordinator
     device_key = entry.entry_id
     hass.data[DOMAIN]["devices"][device_key] = {
         "hub": hub,
         "coordinator": coordinator,
+        "coordinators": coordinators,
         "name": name,
         "config": entry.data,
         "entry_id": entry.entry_id,
     }
 
+    async def _async_shutdown_hub(event: Event) -> None:
+        """Write throttled values and release coils of pulses still in progress when Home Assistant stops."""
+        await hub.async_shutdown()
+
+    entry.async_on_unload(hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown_hub))
+
     # Set up platforms
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -114,7 +159,9 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
         # Remove device data
         device_key = entry.entry_id
-        hass.data[DOMAIN]["devices"].pop(device_key, None)
+        device_data = hass.data[DOMAIN]["devices"].pop(device_key, None)
+        if device_data:
+            await device_data["hub"].async_shutdown()
         _LOGGER.info("HA Atrea Recuperation device unloaded")
 
     return unload_ok
@@ -125,15 +172,39 @@ async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
     await hass.config_entries.async_reload(entry.entry_id)
 
 
+async def _async_setup_yaml_device(
+    hass: HomeAssistant,
+    config: dict,
+    device_key: str,
+    name: str,
+    coordinator: DataUpdateCoordinator,
+) -> None:
+    """Run the first refresh of a YAML device, then load its platforms.
+
+    Devices are set up concurrently, so an unresponsive unit only delays its own entities.
+    Units behind one gateway share its connection, which bounds the requests in flight.
+    """
+    await coordinator.async_refresh()
+    if not coordinator.last_update_success:
+        _LOGGER.warning("HA Atrea Recuperation device '%s' did not answer the first refresh; its entities stay unavailable until it does", name)
+
+    # Load platforms using discovery helper, for this device only
+    for platform in PLATFORMS:
+        await discovery.async_load_platform(hass, platform, DOMAIN, {DISCOVERY_DEVICE_KEY: device_key}, config)
+
+    _LOGGER.info("HA Atrea Recuperation device '%s' initialized from YAML", name)
+
+
 async def async_setup(hass: HomeAssistant, config: dict):
     """YAML setup entrypoint for the custom component (backward compatibility)."""
-    conf = config.get(DOMAIN)
-    if conf is None:
-        return True
-
     # Initialize hass.data storage for this domain
     hass.data.setdefault(DOMAIN, {})
     hass.data[DOMAIN].setdefault("devices", {})
+    await async_setup_services(hass)
+
+    conf = config.get(DOMAIN)
+    if conf is None:
+        return True
 
     # Support both single device (dict) and multiple devices (list) configuration
     devices_config = []
@@ -152,6 +223,14 @@ async def async_setup(hass: HomeAssistant, config: dict):
         port = int(device_conf.get("modbus_port", 502))
         unit = int(device_conf.get("unit", 1))
         poll = int(device_conf.get("poll_interval", 10))
+        poll_min = int(device_conf.get(CONF_POLL_INTERVAL_MIN, DEFAULT_POLL_INTERVAL_MIN))
+        poll_max = int(device_conf.get(CONF_POLL_INTERVAL_MAX, DEFAULT_POLL_INTERVAL_MAX))
+        burst_window = int(device_conf.get(CONF_BURST_WINDOW, DEFAULT_BURST_WINDOW))
+        pipeline_depth = int(device_conf.get(CONF_PIPELINE_DEPTH, DEFAULT_PIPELINE_DEPTH))
+        capture = bool(device_conf.get(CONF_CAPTURE, False))
+        replay = device_conf.get(CONF_REPLAY)  # captured session answering instead of the device
+        replay_speed = float(device_conf.get(CONF_REPLAY_SPEED, DEFAULT_REPLAY_SPEED))
+        trigger_interval = float(device_conf.get(CONF_TRIGGER_INTERVAL, DEFAULT_TRIGGER_INTERVAL))
         hvac_map = device_conf.get("hvac_mode_labels", None)
 
         hub = HaAtreaModbusHub(
@@ -162,20 +241,19 @@ async def async_setup(hass: HomeAssistant, config: dict):
             unit=unit,
             modbus_hub_name=modbus_hub,
             poll_interval=poll,
+            poll_interval_min=poll_min,
+            poll_interval_max=poll_max,
+            burst_window=burst_window,
+            pipeline_depth=pipeline_depth,
+            capture_path=_capture_path(hass, name, unit) if capture else None,
+            replay_path=hass.config.path(replay) if replay else None,
+            replay_speed=replay_speed,
+            trigger_interval=trigger_interval,
             hvac_map=hvac_map,
         )
 
-        # Create DataUpdateCoordinator for this device
-        coordinator = DataUpdateCoordinator(
-            hass,
-            _LOGGER,
-            name=f"{DOMAIN}_{name}",
-            update_method=hub.async_update,
-            update_interval=timedelta(seconds=poll),
-        )
-
-        # Perform initial refresh suitable for YAML-based integration
-        await coordinator.async_refresh()
+        # Create the poll coordinator and the tier coordinators for this device
+        coordinator, coordinators = create_coordinators(hass, hub, name)
 
         # Store hub and coordinator in hass.data for platforms to access
         # Use device name + host/port + unit as key to support multiple devices
@@ -183,23 +261,27 @@ async def async_setup(hass: HomeAssistant, config: dict):
         hass.data[DOMAIN]["devices"][device_key] = {
             "hub": hub,
             "coordinator": coordinator,
+            "coordinators": coordinators,
             "name": name,
             "config": device_conf,
         }
 
-        _LOGGER.info("HA Atrea Recuperation device '%s' initialized from YAML", name)
-
-    # Load platforms using discovery helper (once for all devices)
-    for platform in ("climate", "sensor", "select", "fan", "number", "button"):
-        hass.async_create_task(
-            discovery.async_load_platform(
-                hass,
-                platform,
-                DOMAIN,
-                {},
-                config,
-            )
+        # First refresh and platforms run in the background, so one unit does not wait for another
+        hass.async_create_background_task(
+            _async_setup_yaml_device(hass, config, device_key, name, coordinator),
+            f"{DOMAIN} setup {name}",
         )
 
+    async def _async_shutdown_hubs(event: Event) -> None:
+        """Write throttled values and release coils of pulses still in progress when Home Assistant stops.
+
+        Hubs of config entries have their own listener (async_setup_entry).
+        """
+        for device_data in hass.data[DOMAIN]["devices"].values():
+            if "entry_id" not in device_data:
+                await device_data["hub"].async_shutdown()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown_hubs)
+
     _LOGGER.info("HA Atrea Recuperation integration initialized with %d device(s)", len(devices_config))
     return True
@@ -0,0 +1,98 @@
+"""Binary sensors for the zone trigger registers (WC/bath/technical room, 7103-7105).
+
+The hub reads the registers marked "trigger" in the register map every trigger_interval seconds
+on their own, so short trigger pulses show up within about a second. Each edge also fires an
+ha_atrea_recuperation_trigger event.
+"""
+
+from __future__ import annotations
+
+from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DISCOVERY_DEVICE_KEY, TABLE_HOLDING, TABLE_INPUT, TIER_TRIGGER
+from .entity import HaAtreaEntity
+
+DOMAIN = "ha_atrea_recuperation"
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up the binary sensor platform from a config entry."""
+    device_data = hass.data[DOMAIN]["devices"][entry.entry_id]
+    hub = device_data["hub"]
+    coordinator = device_data["coordinators"][TIER_TRIGGER]
+    name = device_data["name"]
+
+    async_add_entities(_build_triggers(coordinator, hub, name))
+
+
+async def async_setup_platform(hass: HomeAssistant, config, async_add_entities, discovery_info=None):
+    """Set up the binary sensor platform (YAML backward compatibility)."""
+    entities = []
+
+    # Get the device this platform was loaded for (all devices without discovery info)
+    devices = hass.data[DOMAIN].get("devices", {})
+    if discovery_info and discovery_info.get(DISCOVERY_DEVICE_KEY) in devices:
+        devices = {discovery_info[DISCOVERY_DEVICE_KEY]: devices[discovery_info[DISCOVERY_DEVICE_KEY]]}
+
+    # Create trigger binary sensors for each device (skip config entry devices)
+    for device_key, device_data in devices.items():
+        # Skip if this is a config entry device (has entry_id)
+        if "entry_id" in device_data:
+            continue
+
+        hub = device_data["hub"]
+        coordinator = device_data["coordinators"][TIER_TRIGGER]
+        name = device_data["name"]
+
+        entities.extend(_build_triggers(coordinator, hub, name))
+
+    async_add_entities(entities)
+
+
+def _build_triggers(coordinator, hub, name: str) -> list[BinarySensorEntity]:
+    """Create a binary sensor for every trigger register of the device's register map."""
+    return [
+        HaAtreaTriggerBinarySensor(coordinator, hub, f"{name} {meta['name']}", (table, address))
+        for table in (TABLE_INPUT, TABLE_HOLDING)
+        for address, meta in hub.register_map.definitions[table].items()
+        if meta.get("trigger")
+    ]
+
+
+class HaAtreaTriggerBinarySensor(HaAtreaEntity, BinarySensorEntity):
+    """On while a zone trigger register is non-zero."""
+
+    def __init__(self, coordinator, hub, name: str, key: tuple[str, int]) -> None:
+        super().__init__(coordinator)
+        self._hub = hub
+        self._name = name
+        self._key = key
+        self._demand = (key,)
+        # Include device name in unique_id to avoid conflicts with multiple devices
+        device_id = hub.name.lower().replace(" ", "_")
+        self._attr_unique_id = f"ha_atrea_{device_id}_trigger_{key[0]}_{key[1]}"
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def device_info(self):
+        """Return device info to link this entity to the device."""
+        return self._hub.device_info
+
+    @property
+    def is_on(self) -> bool | None:
+        if self.coordinator.data is None:
+            return None
+        value = self.coordinator.data.get(self._key)
+        if value is None:
+            return None
+        return bool(value)
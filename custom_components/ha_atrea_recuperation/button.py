@@ -8,7 +8,7 @@ from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import COILS
+from .const import COILS, DISCOVERY_DEVICE_KEY, TIER_CONTROL
 
 DOMAIN = "ha_atrea_recuperation"
 
@@ -22,7 +22,7 @@ async def async_setup_entry(
     entities = []
     device_data = hass.data[DOMAIN]["devices"][entry.entry_id]
     hub = device_data["hub"]
-    coordinator = device_data["coordinator"]
+    coordinator = device_data["coordinators"][TIER_CONTROL]
     name = device_data["name"]
 
     # Buttons for coils
@@ -36,8 +36,10 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
     """Set up the button platform (YAML backward compatibility)."""
     entities = []
 
-    # Get all devices from hass.data
+    # Get the device this platform was loaded for (all devices without discovery info)
     devices = hass.data[DOMAIN].get("devices", {})
+    if discovery_info and discovery_info.get(DISCOVERY_DEVICE_KEY) in devices:
+        devices = {discovery_info[DISCOVERY_DEVICE_KEY]: devices[discovery_info[DISCOVERY_DEVICE_KEY]]}
 
     # Create button entities for each device (skip config entry devices)
     for device_key, device_data in devices.items():
@@ -46,7 +48,7 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
             continue
             
         hub = device_data["hub"]
-        coordinator = device_data["coordinator"]
+        coordinator = device_data["coordinators"][TIER_CONTROL]
         name = device_data["name"]
 
         # Buttons for coils
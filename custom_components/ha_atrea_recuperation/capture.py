@@ -0,0 +1,194 @@
+"""Modbus traffic capture and replay for HA Atrea Recuperation.
+
+- TrafficCapture: records every transport operation of a hub (request, response, duration,
+  path) as one compact JSON line and writes them to a size-rotated file in the executor.
+- ReplayTransport: a transport that answers from a captured session instead of a device,
+  with the recorded response times scaled by a speed factor (0 answers at once), so field
+  traffic can be reproduced and benchmarked offline.
+
+Record format (one JSON object per line):
+    {"t": wall clock time, "p": path, "u": unit, "op": operation, "a": arguments,
+     "r": result (words, true/false or null), "d": duration in seconds, "e": error text,
+     "x": [function, exception code] of a Modbus exception response}
+"""
+from __future__ import annotations
+
+from collections import defaultdict, deque
+from typing import Any, Deque, Dict, Optional
+import asyncio
+import json
+import logging
+import os
+import time
+
+from homeassistant.core import HomeAssistant
+
+from .const import CAPTURE_BACKUPS, CAPTURE_MAX_BYTES, PATH_REPLAY
+from .modbus_tcp import ModbusError
+from .transport import ModbusTransport
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _write_lines(path: str, lines: list[str], max_bytes: int, backups: int) -> None:
+    """Append lines to path, rotating it to path.1 ... path.<backups> when it gets too big."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if os.path.exists(path) and os.path.getsize(path) >= max_bytes:
+        for index in range(backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{index}"):
+                os.replace(f"{path}.{index}", f"{path}.{index + 1}")
+        if backups:
+            os.replace(path, f"{path}.1")
+        else:
+            os.remove(path)
+    with open(path, "a", encoding="utf-8") as file:
+        file.write("".join(lines))
+
+
+def _read_records(path: str, backups: int) -> list[Dict[str, Any]]:
+    """Read a capture and its rotated files, oldest record first."""
+    records = []
+    for name in [f"{path}.{index}" for index in range(backups, 0, -1)] + [path]:
+        if not os.path.exists(name):
+            continue
+        with open(name, encoding="utf-8") as file:
+            for line_no, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    _LOGGER.warning("Skipping malformed capture record %s:%d", name, line_no)
+    return records
+
+
+def _request_key(operation: str, args: Any) -> str:
+    return f"{operation}:{json.dumps(list(args), separators=(',', ':'))}"
+
+
+class TrafficCapture:
+    """Buffer transport records in memory and write them to a rotating file on flush()."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        max_bytes: int = CAPTURE_MAX_BYTES,
+        backups: int = CAPTURE_BACKUPS,
+    ) -> None:
+        self.hass = hass
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._lines: list[str] = []
+
+    def record(
+        self,
+        path: str,
+        unit: int,
+        operation: str,
+        args: tuple,
+        result: Any,
+        duration: float,
+        error: Optional[str] = None,
+        exception: Optional[ModbusError] = None,
+    ) -> None:
+        """Buffer one operation; result is the transport's return value, or the exception response it raised."""
+        entry = {
+            "t": round(time.time(), 3),
+            "p": path,
+            "u": unit,
+            "op": operation,
+            "a": list(args),
+            "r": result,
+            "d": round(duration, 4),
+        }
+        if exception is not None:
+            entry["x"] = [exception.function, exception.code]
+            error = error or str(exception)
+        if error:
+            entry["e"] = error
+        self._lines.append(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    async def async_flush(self) -> None:
+        """Write buffered records to the capture file in the executor."""
+        if not self._lines:
+            return
+        lines, self._lines = self._lines, []
+        try:
+            await self.hass.async_add_executor_job(_write_lines, self.path, lines, self.max_bytes, self.backups)
+        except OSError as ex:
+            _LOGGER.warning("Cannot write Modbus capture %s: %s", self.path, ex)
+
+
+class ReplayTransport(ModbusTransport):
+    """Transport answering from a captured session.
+
+    Each request gets the next recorded response for the same operation and arguments (in
+    capture order, starting over when they run out), after the recorded duration divided by
+    speed. Captured exception responses are raised again as ModbusError. Requests that were
+    never captured fail like a device that does not answer.
+    max_in_flight should match the pipeline depth the session was captured with.
+    """
+
+    name = PATH_REPLAY
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        unit: int,
+        speed: float = 1.0,
+        max_in_flight: int = 1,
+        backups: int = CAPTURE_BACKUPS,
+    ) -> None:
+        super().__init__(unit)
+        self.hass = hass
+        self.path = path
+        self.speed = float(speed)
+        self.backups = backups
+        self._max_in_flight = max(1, int(max_in_flight))
+        self.endpoint = f"{PATH_REPLAY}:{path}/{self.unit}"
+        self._responses: Dict[str, Deque[Dict[str, Any]]] | None = None
+        self._load_lock = asyncio.Lock()
+
+    @property
+    def max_in_flight(self) -> int:
+        return self._max_in_flight
+
+    async def _async_replay(self, operation: str, *args: Any) -> Any:
+        if self._responses is None:
+            async with self._load_lock:
+                if self._responses is None:
+                    records = await self.hass.async_add_executor_job(_read_records, self.path, self.backups)
+                    responses: Dict[str, Deque[Dict[str, Any]]] = defaultdict(deque)
+                    for record in records:
+                        responses[_request_key(record["op"], record["a"])].append(record)
+                    self._responses = responses
+                    _LOGGER.info("Replaying %d Modbus records from %s at speed %s", len(records), self.path, self.speed)
+        queue = self._responses.get(_request_key(operation, args))
+        if not queue:
+            _LOGGER.debug("No captured response for %s %s", operation, args)
+            return None
+        record = queue.popleft()
+        queue.append(record)
+        if self.speed > 0:
+            await asyncio.sleep(record.get("d", 0) / self.speed)
+        if record.get("x"):
+            raise ModbusError(*record["x"])
+        return record.get("r")
+
+    async def read_registers(self, table: str, address: int, count: int) -> list[int] | None:
+        return await self._async_replay("read_registers", table, int(address), int(count))
+
+    async def write_register(self, address: int, value: int) -> bool:
+        return bool(await self._async_replay("write_register", int(address), int(value)))
+
+    async def write_registers(self, address: int, values: list[int]) -> bool:
+        return bool(await self._async_replay("write_registers", int(address), list(values)))
+
+    async def write_coil(self, address: int, value: bool) -> bool:
+        return bool(await self._async_replay("write_coil", int(address), bool(value)))
+
+    async def read_write_registers(self, read_address: int, read_count: int, write_address: int, values: list[int]) -> list[int] | None:
+        return await self._async_replay("read_write_registers", int(read_address), int(read_count), int(write_address), list(values))
@@ -11,7 +11,9 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import ATTR_TEMPERATURE
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DISCOVERY_DEVICE_KEY, TABLE_HOLDING, TABLE_INPUT
+from .entity import HaAtreaEntity
 
 DOMAIN = "ha_atrea_recuperation"
 
@@ -24,7 +26,7 @@ async def async_setup_entry(
     """Set up the climate platform from a config entry."""
     device_data = hass.data[DOMAIN]["devices"][entry.entry_id]
     hub = device_data["hub"]
-    coordinator = device_data["coordinator"]
+    coordinator = device_data["coordinators"][hub.tier_for(HaAtreaClimate._demand)]
     name = device_data["name"]
 
     async_add_entities([HaAtreaClimate(coordinator, hub, name)])
@@ -34,8 +36,10 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
     """Set up the climate platform (YAML backward compatibility)."""
     entities = []
 
-    # Get all devices from hass.data
+    # Get the device this platform was loaded for (all devices without discovery info)
     devices = hass.data[DOMAIN].get("devices", {})
+    if discovery_info and discovery_info.get(DISCOVERY_DEVICE_KEY) in devices:
+        devices = {discovery_info[DISCOVERY_DEVICE_KEY]: devices[discovery_info[DISCOVERY_DEVICE_KEY]]}
 
     # Create climate entity for each device (skip config entry devices)
     for device_key, device_data in devices.items():
@@ -44,7 +48,7 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
             continue
             
         hub = device_data["hub"]
-        coordinator = device_data["coordinator"]
+        coordinator = device_data["coordinators"][hub.tier_for(HaAtreaClimate._demand)]
         name = device_data["name"]
 
         entities.append(HaAtreaClimate(coordinator, hub, name))
@@ -52,9 +56,12 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
     async_add_entities(entities)
 
 
-class HaAtreaClimate(CoordinatorEntity, ClimateEntity):
+class HaAtreaClimate(HaAtreaEntity, ClimateEntity):
     """Climate entity backed by HaAtreaModbusHub and DataUpdateCoordinator."""
 
+    _demand = ((TABLE_INPUT, 1104), (TABLE_HOLDING, 1002), (TABLE_HOLDING, 1001))
+    _writes = ((TABLE_HOLDING, 1002), (TABLE_HOLDING, 1001))
+
     def __init__(self, coordinator, hub, name: str) -> None:
         super().__init__(coordinator)
         self._hub = hub
@@ -80,19 +87,13 @@ class HaAtreaClimate(CoordinatorEntity, ClimateEntity):
     def current_temperature(self) -> float | None:
         if self.coordinator.data is None:
             return None
-        val = self.coordinator.data.get(1104)
-        if val is None:
-            return None
-        return float(val) / 10.0
+        return self.coordinator.data.get((TABLE_INPUT, 1104))
 
     @property
     def target_temperature(self) -> float | None:
         if self.coordinator.data is None:
             return None
-        val = self.coordinator.data.get(1002)
-        if val is None:
-            return None
-        return float(val) / 10.0
+        return self.coordinator.data.get((TABLE_HOLDING, 1002))
 
     @property
     def hvac_modes(self) -> list[str]:
@@ -102,10 +103,9 @@ class HaAtreaClimate(CoordinatorEntity, ClimateEntity):
     def hvac_mode(self) -> str:
         if self.coordinator.data is None:
             return HVACMode.OFF
-        dev_mode_val = self.coordinator.data.get(1001)
-        if dev_mode_val is None:
+        dev_mode = self._hub.mode_code(self.coordinator.data.get((TABLE_HOLDING, 1001)))
+        if dev_mode is None:
             return HVACMode.OFF
-        dev_mode = int(dev_mode_val)
         if dev_mode == 0:
             return HVACMode.OFF
         if dev_mode == 1:
@@ -121,8 +121,7 @@ class HaAtreaClimate(CoordinatorEntity, ClimateEntity):
     async def async_set_temperature(self, **kwargs):
         if ATTR_TEMPERATURE in kwargs:
             temp = kwargs[ATTR_TEMPERATURE]
-            await self._hub.write_holding(1002, int(round(float(temp) * 10.0)))
-            await self.coordinator.async_request_refresh()
+            await self._hub.write_value(1002, float(temp))
 
     async def async_set_hvac_mode(self, hvac_mode: str):
         inv = {
@@ -132,4 +131,3 @@ class HaAtreaClimate(CoordinatorEntity, ClimateEntity):
         }
         val = inv.get(hvac_mode, 1)
         await self._hub.write_holding(1001, int(val))
-        await self.coordinator.async_request_refresh()
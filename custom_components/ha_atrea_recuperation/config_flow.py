@@ -1,6 +1,7 @@
 """Config flow for HA Atrea Recuperation integration."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
@@ -15,14 +16,34 @@ import homeassistant.helpers.config_validation as cv
 
 from .const import (
     DOMAIN,
+    CONF_BURST_WINDOW,
+    CONF_TRIGGER_INTERVAL,
+    CONF_CAPTURE,
+    CONF_HOSTS,
+    CONF_IDENTITY,
     CONF_MODBUS_HUB,
+    CONF_PIPELINE_DEPTH,
     CONF_UNIT,
+    CONF_UNIT_END,
+    CONF_UNIT_START,
     CONF_POLL_INTERVAL,
+    CONF_POLL_INTERVAL_MAX,
+    CONF_POLL_INTERVAL_MIN,
+    DEFAULT_BURST_WINDOW,
+    DEFAULT_TRIGGER_INTERVAL,
     DEFAULT_NAME,
+    DEFAULT_PIPELINE_DEPTH,
     DEFAULT_PORT,
     DEFAULT_UNIT,
     DEFAULT_POLL_INTERVAL,
+    DEFAULT_POLL_INTERVAL_MAX,
+    DEFAULT_POLL_INTERVAL_MIN,
+    MAX_PIPELINE_DEPTH,
+    MAX_UNIT,
+    MIN_UNIT,
 )
+from .discovery import DiscoveredUnit, ProbeResult, async_probe_unit, async_scan_units
+from .modbus_tcp import ModbusError
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,6 +56,8 @@ class HaAtreaRecuperationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     def __init__(self) -> None:
         """Initialize the config flow."""
         self._data: dict[str, Any] = {}
+        self._discovered: dict[str, DiscoveredUnit] = {}
+        self._probe: ProbeResult | None = None
 
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
@@ -72,6 +95,8 @@ class HaAtreaRecuperationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 return await self.async_step_modbus_hub()
             elif connection_type == "direct":
                 return await self.async_step_direct_connection()
+            elif connection_type == "scan":
+                return await self.async_step_scan()
 
         # Get available modbus hubs
         available_hubs = await self._get_available_modbus_hubs()
@@ -85,6 +110,9 @@ class HaAtreaRecuperationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         options.append(
             selector.SelectOptionDict(value="direct", label="Direct TCP Connection")
         )
+        options.append(
+            selector.SelectOptionDict(value="scan", label="Scan for devices")
+        )
 
         data_schema = vol.Schema(
             {
@@ -179,11 +207,137 @@ class HaAtreaRecuperationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def async_step_scan(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Scan unit IDs on hosts and/or an existing Modbus hub for Atrea units."""
+        errors: dict[str, str] = {}
+        available_hubs = await self._get_available_modbus_hubs()
+
+        if user_input is not None:
+            hosts = [h.strip() for h in user_input.get(CONF_HOSTS, "").replace(";", ",").split(",") if h.strip()]
+            modbus_hub = user_input.get(CONF_MODBUS_HUB) or None
+            unit_start = int(user_input[CONF_UNIT_START])
+            unit_end = int(user_input[CONF_UNIT_END])
+
+            if not hosts and not modbus_hub:
+                errors["base"] = "scan_no_target"
+            elif unit_start > unit_end:
+                errors["base"] = "invalid_unit"
+            else:
+                found = await async_scan_units(
+                    self.hass,
+                    range(unit_start, unit_end + 1),
+                    hosts=hosts,
+                    port=int(user_input.get(CONF_PORT, DEFAULT_PORT)),
+                    modbus_hub=modbus_hub,
+                )
+                configured = self._async_current_ids()
+                discovered = {self._generate_unique_id(self._discovered_data(unit)): unit for unit in found}
+                self._discovered = {key: unit for key, unit in discovered.items() if key not in configured}
+                if self._discovered:
+                    return await self.async_step_scan_select()
+                errors["base"] = "no_devices_found"
+
+        fields: dict[Any, Any] = {}
+        if available_hubs:
+            fields[vol.Optional(CONF_MODBUS_HUB)] = selector.SelectSelector(
+                selector.SelectSelectorConfig(
+                    options=[selector.SelectOptionDict(value=hub, label=hub) for hub in available_hubs],
+                    mode=selector.SelectSelectorMode.DROPDOWN,
+                )
+            )
+        fields[vol.Optional(CONF_HOSTS, default="")] = selector.TextSelector(
+            selector.TextSelectorConfig(type=selector.TextSelectorType.TEXT)
+        )
+        fields[vol.Required(CONF_PORT, default=DEFAULT_PORT)] = selector.NumberSelector(
+            selector.NumberSelectorConfig(min=1, max=65535, mode=selector.NumberSelectorMode.BOX)
+        )
+        fields[vol.Required(CONF_UNIT_START, default=MIN_UNIT)] = selector.NumberSelector(
+            selector.NumberSelectorConfig(min=MIN_UNIT, max=MAX_UNIT, mode=selector.NumberSelectorMode.BOX)
+        )
+        fields[vol.Required(CONF_UNIT_END, default=MAX_UNIT)] = selector.NumberSelector(
+            selector.NumberSelectorConfig(min=MIN_UNIT, max=MAX_UNIT, mode=selector.NumberSelectorMode.BOX)
+        )
+
+        return self.async_show_form(
+            step_id="scan",
+            data_schema=vol.Schema(fields),
+            errors=errors,
+        )
+
+    async def async_step_scan_select(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Choose which discovered units to add.
+
+        The first selected unit continues in this flow; the others are added as
+        separate entries named after this device plus their unit ID.
+        """
+        errors: dict[str, str] = {}
+
+        if user_input is not None:
+            selected = [key for key in user_input["units"] if key in self._discovered]
+            if not selected:
+                errors["base"] = "no_devices_selected"
+            else:
+                first = self._discovered[selected[0]]
+                self._data.update(self._discovered_data(first))
+                multiple_targets = len({unit.target for unit in self._discovered.values()}) > 1
+                for key in selected[1:]:
+                    unit = self._discovered[key]
+                    suffix = f"{unit.target} {unit.unit}" if multiple_targets else f"{unit.unit}"
+                    self.hass.async_create_task(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN,
+                            context={"source": config_entries.SOURCE_IMPORT},
+                            data={
+                                CONF_NAME: f"{self._data[CONF_NAME]} {suffix}",
+                                CONF_POLL_INTERVAL: DEFAULT_POLL_INTERVAL,
+                                **self._discovered_entry_data(unit),
+                            },
+                        )
+                    )
+                return await self.async_step_device_config()
+
+        options = [
+            selector.SelectOptionDict(
+                value=key,
+                label=f"{unit.model or 'Atrea'} (S/N {unit.serial or '?'}) - unit {unit.unit} on {unit.target}",
+            )
+            for key, unit in sorted(self._discovered.items(), key=lambda item: (item[1].target, item[1].unit))
+        ]
+        data_schema = vol.Schema(
+            {
+                vol.Required("units", default=[options[0]["value"]]): selector.SelectSelector(
+                    selector.SelectSelectorConfig(
+                        options=options,
+                        multiple=True,
+                        mode=selector.SelectSelectorMode.LIST,
+                    )
+                ),
+            }
+        )
+
+        return self.async_show_form(
+            step_id="scan_select",
+            data_schema=data_schema,
+            errors=errors,
+            description_placeholders={"count": str(len(options))},
+        )
+
+    async def async_step_import(self, import_data: dict[str, Any]) -> FlowResult:
+        """Create an entry for a unit selected in another flow's scan."""
+        await self.async_set_unique_id(self._generate_unique_id(import_data))
+        self._abort_if_unique_id_configured()
+        return self.async_create_entry(title=import_data[CONF_NAME], data=import_data)
+
     async def async_step_device_config(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
-        """Handle device configuration (unit, poll interval)."""
+        """Handle device configuration (unit, poll interval) and validate the connection."""
         errors: dict[str, str] = {}
+        placeholders = {"error": ""}
 
         if user_input is not None:
             self._data[CONF_UNIT] = user_input[CONF_UNIT]
@@ -193,14 +347,33 @@ class HaAtreaRecuperationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             await self.async_set_unique_id(self._generate_unique_id(self._data))
             self._abort_if_unique_id_configured()
 
-            return self.async_create_entry(
-                title=self._data[CONF_NAME],
-                data=self._data,
-            )
+            try:
+                self._probe = await async_probe_unit(
+                    self.hass,
+                    int(self._data[CONF_UNIT]),
+                    host=self._data.get(CONF_HOST),
+                    port=int(self._data.get(CONF_PORT, DEFAULT_PORT)),
+                    modbus_hub=self._data.get(CONF_MODBUS_HUB),
+                )
+            except asyncio.TimeoutError:
+                errors["base"] = "timeout"
+            except ModbusError as ex:
+                errors["base"] = "modbus_exception"
+                placeholders["error"] = str(ex)
+            except Exception as ex:
+                _LOGGER.debug("Connection validation failed: %s", ex)
+                errors["base"] = "cannot_connect"
+                placeholders["error"] = str(ex)
+            else:
+                if self._probe.serial is None and self._probe.model is None:
+                    errors["base"] = "not_atrea"
+                else:
+                    self._data[CONF_IDENTITY] = self._probe.words
+                    return await self.async_step_confirm()
 
         data_schema = vol.Schema(
             {
-                vol.Required(CONF_UNIT, default=DEFAULT_UNIT): selector.NumberSelector(
+                vol.Required(CONF_UNIT, default=self._data.get(CONF_UNIT, DEFAULT_UNIT)): selector.NumberSelector(
                     selector.NumberSelectorConfig(
                         min=1,
                         max=247,
@@ -222,6 +395,27 @@ class HaAtreaRecuperationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             step_id="device_config",
             data_schema=data_schema,
             errors=errors,
+            description_placeholders=placeholders,
+        )
+
+    async def async_step_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Show what the connection check found and create the entry."""
+        if user_input is not None:
+            return self.async_create_entry(
+                title=self._data[CONF_NAME],
+                data=self._data,
+            )
+
+        return self.async_show_form(
+            step_id="confirm",
+            description_placeholders={
+                "unit": str(self._data[CONF_UNIT]),
+                "model": self._probe.model or "unknown model",
+                "serial": self._probe.serial or "unknown",
+                "latency": f"{self._probe.latency * 1000:.0f}",
+            },
         )
 
     async def _get_available_modbus_hubs(self) -> list[str]:
@@ -241,6 +435,18 @@ class HaAtreaRecuperationConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
         return all_hub_names
 
+    @staticmethod
+    def _discovered_data(unit: DiscoveredUnit) -> dict[str, Any]:
+        """Return the connection data of a discovered unit."""
+        if unit.modbus_hub:
+            return {CONF_MODBUS_HUB: unit.modbus_hub, CONF_UNIT: unit.unit}
+        return {CONF_HOST: unit.host, CONF_PORT: unit.port, CONF_UNIT: unit.unit}
+
+    @staticmethod
+    def _discovered_entry_data(unit: DiscoveredUnit) -> dict[str, Any]:
+        """Return the entry data of a discovered unit, including its identity block."""
+        return {**HaAtreaRecuperationConfigFlow._discovered_data(unit), CONF_IDENTITY: unit.words}
+
     def _generate_unique_id(self, data: dict[str, Any]) -> str:
         """Generate a unique ID for this device configuration."""
         # Use modbus_hub + unit or host + port + unit
@@ -272,7 +478,10 @@ class HaAtreaRecuperationOptionsFlow(config_entries.OptionsFlow):
         errors: dict[str, str] = {}
 
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            if not user_input[CONF_POLL_INTERVAL_MIN] <= user_input[CONF_POLL_INTERVAL] <= user_input[CONF_POLL_INTERVAL_MAX]:
+                errors["base"] = "invalid_poll_bounds"
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
         data_schema = vol.Schema(
             {
@@ -290,6 +499,65 @@ class HaAtreaRecuperationOptionsFlow(config_entries.OptionsFlow):
                         unit_of_measurement="seconds",
                     )
                 ),
+                vol.Required(
+                    CONF_POLL_INTERVAL_MIN,
+                    default=self.config_entry.options.get(CONF_POLL_INTERVAL_MIN, DEFAULT_POLL_INTERVAL_MIN),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1,
+                        max=300,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="seconds",
+                    )
+                ),
+                vol.Required(
+                    CONF_POLL_INTERVAL_MAX,
+                    default=self.config_entry.options.get(CONF_POLL_INTERVAL_MAX, DEFAULT_POLL_INTERVAL_MAX),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=5,
+                        max=3600,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="seconds",
+                    )
+                ),
+                vol.Required(
+                    CONF_BURST_WINDOW,
+                    default=self.config_entry.options.get(CONF_BURST_WINDOW, DEFAULT_BURST_WINDOW),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=120,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="seconds",
+                    )
+                ),
+                vol.Required(
+                    CONF_TRIGGER_INTERVAL,
+                    default=self.config_entry.options.get(CONF_TRIGGER_INTERVAL, DEFAULT_TRIGGER_INTERVAL),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=0,
+                        max=10,
+                        step=0.5,
+                        mode=selector.NumberSelectorMode.BOX,
+                        unit_of_measurement="seconds",
+                    )
+                ),
+                vol.Required(
+                    CONF_PIPELINE_DEPTH,
+                    default=self.config_entry.options.get(CONF_PIPELINE_DEPTH, DEFAULT_PIPELINE_DEPTH),
+                ): selector.NumberSelector(
+                    selector.NumberSelectorConfig(
+                        min=1,
+                        max=MAX_PIPELINE_DEPTH,
+                        mode=selector.NumberSelectorMode.BOX,
+                    )
+                ),
+                vol.Required(
+                    CONF_CAPTURE,
+                    default=self.config_entry.options.get(CONF_CAPTURE, False),
+                ): selector.BooleanSelector(),
             }
         )
 
@@ -7,82 +7,272 @@ DOMAIN = "ha_atrea_recuperation"
 CONF_MODBUS_HUB = "modbus_hub"
 CONF_UNIT = "unit"
 CONF_POLL_INTERVAL = "poll_interval"
+CONF_POLL_INTERVAL_MIN = "poll_interval_min"
+CONF_POLL_INTERVAL_MAX = "poll_interval_max"
+CONF_BURST_WINDOW = "burst_window"
 
 # Defaults
 DEFAULT_NAME = "HA Atrea Recuperation"
 DEFAULT_PORT = 502
 DEFAULT_UNIT = 1
 DEFAULT_POLL_INTERVAL = 10
+DEFAULT_POLL_INTERVAL_MIN = 5
+DEFAULT_POLL_INTERVAL_MAX = 60
 
-# Input registers (read-only) with scale and unit (subset shown; hub polls a larger list)
-INPUT_REGISTERS = {
-    1001: {"name": "Mode (input)", "scale": 1, "unit": None},
-    1002: {"name": "Desired temperature (input)", "scale": 10, "unit": "°C"},
-    1101: {"name": "Outdoor temperature", "scale": 10, "unit": "°C"},
-    1102: {"name": "Supply temperature", "scale": 10, "unit": "°C"},
-    1103: {"name": "Extract temperature", "scale": 10, "unit": "°C"},
-    1104: {"name": "Indoor temperature", "scale": 10, "unit": "°C"},
-    1105: {"name": "Return temperature", "scale": 10, "unit": "°C"},
-    1107: {"name": "Supply fan power", "scale": 1, "unit": "%"},
-    1108: {"name": "Extract fan power", "scale": 1, "unit": "%"},
-    1109: {"name": "Supply flow", "scale": 0.1, "unit": "m³/h"},
-    1110: {"name": "Extract flow", "scale": 0.1, "unit": "m³/h"},
-    1111: {"name": "Fresh air flow", "scale": 0.1, "unit": "m³/h"},
-    # serial chars and hour counters will be decoded by the hub/sensor
-    3000: {"name": "SN char 1", "scale": 1, "unit": None},
-    3001: {"name": "SN char 2", "scale": 1, "unit": None},
-    3002: {"name": "SN char 3", "scale": 1, "unit": None},
-    3003: {"name": "SN char 4", "scale": 1, "unit": None},
-    3004: {"name": "SN char 5", "scale": 1, "unit": None},
-    3005: {"name": "SN char 6", "scale": 1, "unit": None},
-    3006: {"name": "SN char 7", "scale": 1, "unit": None},
-    3007: {"name": "SN char 8", "scale": 1, "unit": None},
-    3008: {"name": "SN char 9", "scale": 1, "unit": None},
+# After a write the hub polls the written registers and the "burst" registers of the map
+# (fans/flows that ramp after a mode or setpoint change) every BURST_INTERVAL seconds for
+# burst_window seconds (0 disables), then returns to the normal schedule
+DEFAULT_BURST_WINDOW = 10
+BURST_INTERVAL = 1.0
+
+# Writes to each holding register are rate limited with a token bucket to spare the controller's
+# non-volatile memory: WRITE_RATE_BURST writes in a row, then one per WRITE_RATE_INTERVAL seconds.
+# A throttled value waits for the next token and is replaced by newer values written meanwhile.
+WRITE_RATE_BURST = 3
+WRITE_RATE_INTERVAL = 20.0
+
+# Written values are shown right away (optimistic) and marked pending until a read returns them.
+# If the device keeps reporting another value, or nothing is read, for OPTIMISTIC_TIMEOUT seconds
+# after the write, the value read from the device is shown again and a warning is logged.
+OPTIMISTIC_TIMEOUT = 10.0
+# State attribute of the climate, fan, select and number entities: True while a written value is pending
+ATTR_PENDING = "pending"
+
+# Adaptive poll interval: the hub starts at the configured poll interval and after each poll
+# - lengthens it by POLL_BACKOFF_FACTOR when a block read failed or the poll took more than
+#   POLL_SLOW_CYCLE_RATIO of the interval
+# - shortens it by POLL_SPEEDUP_FACTOR when at least POLL_FAST_CHANGE_RATIO of the words read changed
+# - otherwise moves it POLL_RELAX_FACTOR of the way back to the configured interval
+# always staying within the min/max bounds
+POLL_BACKOFF_FACTOR = 1.5
+POLL_SPEEDUP_FACTOR = 0.5
+POLL_RELAX_FACTOR = 0.25
+POLL_SLOW_CYCLE_RATIO = 0.5
+POLL_FAST_CHANGE_RATIO = 0.25
+
+# YAML setup: first refreshes of all devices run concurrently. Each device's platforms are
+# loaded once its refresh is done, with discovery info naming the device (DISCOVERY_DEVICE_KEY).
+DISCOVERY_DEVICE_KEY = "device_key"
+
+# Unit discovery (config flow scan step)
+CONF_HOSTS = "hosts"
+CONF_UNIT_START = "unit_start"
+CONF_UNIT_END = "unit_end"
+MIN_UNIT = 1
+MAX_UNIT = 247
+# Seconds to wait for a single probe and probes allowed in flight at once on one host
+DEFAULT_SCAN_TIMEOUT = 0.5
+DEFAULT_SCAN_IN_FLIGHT = 16
+# Seconds to wait for the identity read that validates a connection in the config flow
+DEFAULT_VALIDATE_TIMEOUT = 2.0
+# Entry data key holding the identity block words read during validation
+CONF_IDENTITY = "identity"
+
+# Register tables (also the HA Modbus hub call types used to read them)
+TABLE_INPUT = "input"
+TABLE_HOLDING = "holding"
+
+# Register value types, decoded by decoder.decode_registers().
+# Every register definition (see MAPS_DIR) may set "type" (default uint16) and, depending on the type:
+# - "scale": raw value is divided by scale (numeric types)
+# - "word_order": WORD_ORDER_LOW_FIRST / WORD_ORDER_HIGH_FIRST (32-bit types)
+# - "count": number of registers (string, one ASCII code per register)
+# - "strict": string is invalid (None) unless every register holds a printable char
+# - "options": name of an ENUM_OPTIONS set (enum)
+# - "bits": {bit index: flag name} (bitfield)
+# - "priority": its read block is read first in every poll, even when the poll budget is used up
+# - "burst": polled every BURST_INTERVAL seconds for a while after a write (see CONF_BURST_WINDOW)
+# - "monotonic"/"max_rate": counter that may only grow by max_rate units per hour; other
+#   changes (resets, torn reads) are published only after the next read confirms them
+# - "trigger": zone trigger read every trigger_interval seconds, firing EVENT_TRIGGER on edges
+# - "tier": polling tier (see TIER_POLL_CYCLES), overriding the tier derived from the flags above
+TYPE_INT16 = "int16"
+TYPE_UINT16 = "uint16"
+TYPE_INT32 = "int32"
+TYPE_UINT32 = "uint32"
+TYPE_FLOAT32 = "float32"
+TYPE_STRING = "string"
+TYPE_ENUM = "enum"
+TYPE_BITFIELD = "bitfield"
+
+# Word order for 32-bit types
+WORD_ORDER_LOW_FIRST = "low_first"  # low word at N, high word at N+1 (Atrea hour counters)
+WORD_ORDER_HIGH_FIRST = "high_first"
+
+# Registers occupied by fixed-size types (strings use "count")
+TYPE_WORDS = {
+    TYPE_INT16: 1,
+    TYPE_UINT16: 1,
+    TYPE_INT32: 2,
+    TYPE_UINT32: 2,
+    TYPE_FLOAT32: 2,
+    TYPE_ENUM: 1,
+    TYPE_BITFIELD: 1,
+}
+
+# Named option sets for enum registers ("operation_mode" can be overridden by hvac_mode_labels)
+ENUM_OPTIONS = {
+    "operation_mode": {
+        0: "Off",
+        1: "Auto",
+        2: "Ventilation",
+        3: "Circulation with ventilation",
+        4: "Circulation",
+        5: "Night precooling",
+        6: "Balancing",
+        7: "Overpressure",
+        8: "Undefined",
+    },
+}
+
+# Register maps: one JSON file per Atrea model family in MAPS_DIR, each with "name",
+# "models" (model string prefixes it applies to), "max_gap" and "input"/"holding" tables of
+# register definitions. DEFAULT_MAP is used when no file matches the decoded model string.
+MAPS_DIR = "maps"
+DEFAULT_MAP = "default.json"
+
+# Largest register count a single Modbus read may request
+MAX_READ_COUNT = 125
+
+# Identity registers read before a register map is selected (input table).
+# Register maps may define the same registers again to expose them as sensors.
+IDENTITY_REGISTERS = {
+    3000: {"name": "Serial number", "type": TYPE_STRING, "count": 9, "strict": True},
     # Model/Type string (registers 3009-3019 assumed based on pattern)
-    3009: {"name": "Model char 1", "scale": 1, "unit": None},
-    3010: {"name": "Model char 2", "scale": 1, "unit": None},
-    3011: {"name": "Model char 3", "scale": 1, "unit": None},
-    3012: {"name": "Model char 4", "scale": 1, "unit": None},
-    3013: {"name": "Model char 5", "scale": 1, "unit": None},
-    3014: {"name": "Model char 6", "scale": 1, "unit": None},
-    3015: {"name": "Model char 7", "scale": 1, "unit": None},
-    3016: {"name": "Model char 8", "scale": 1, "unit": None},
-    3017: {"name": "Model char 9", "scale": 1, "unit": None},
-    3018: {"name": "Model char 10", "scale": 1, "unit": None},
-    3019: {"name": "Model char 11", "scale": 1, "unit": None},
-    # SW Version string (registers 3100-3103 already polled in hub.py)
-    3100: {"name": "SW ver char 1", "scale": 1, "unit": None},
-    3101: {"name": "SW ver char 2", "scale": 1, "unit": None},
-    3102: {"name": "SW ver char 3", "scale": 1, "unit": None},
-    3103: {"name": "SW ver char 4", "scale": 1, "unit": None},
-    3200: {"name": "M1 hours (low)", "scale": 1, "unit": "h"},
-    3201: {"name": "M1 hours (high)", "scale": 1, "unit": None},
-    3202: {"name": "M2 hours (low)", "scale": 1, "unit": "h"},
-    3203: {"name": "M2 hours (high)", "scale": 1, "unit": None},
-    3204: {"name": "UV hours (low)", "scale": 1, "unit": "h"},
-    3205: {"name": "UV hours (high)", "scale": 1, "unit": None},
-    7103: {"name": "Trigger WC+upper bath", "scale": 1, "unit": None},
-    7104: {"name": "Trigger WC+lower bath", "scale": 1, "unit": None},
-    7105: {"name": "Trigger technical room", "scale": 1, "unit": None},
+    3009: {"name": "Model", "type": TYPE_STRING, "count": 11},
+    3100: {"name": "SW version", "type": TYPE_STRING, "count": 4},
 }
+IDENTITY_SERIAL = 3000
+IDENTITY_MODEL = 3009
+IDENTITY_SW_VERSION = 3100
+# Serial number and model (3000-3019) in one read, used to identify units during discovery
+IDENTITY_BLOCK = (IDENTITY_SERIAL, 20)
 
-# Holding registers (read/write where appropriate)
-HOLDING_REGISTERS = {
-    1001: {"name": "Mode (holding)", "scale": 1, "unit": None},
-    1002: {"name": "Desired temperature (holding)", "scale": 10, "unit": "°C"},
-    1003: {"name": "Selected zone (holding)", "scale": 1, "unit": None},
-    1004: {"name": "Desired power (holding)", "scale": 1, "unit": "%"},
-    1005: {"name": "Desired ventilation power", "scale": 0.1, "unit": "m³/h"},
-    1006: {"name": "Desired supply power", "scale": 0.1, "unit": "m³/h"},
-    1500: {"name": "Indoor temperature (holding)", "scale": 10, "unit": "°C"},
-    1501: {"name": "Outdoor temperature (holding)", "scale": 10, "unit": "°C"},
-    3189: {"name": "Active calendar", "scale": 1, "unit": None},
-    3190: {"name": "Active scene", "scale": 1, "unit": None},
+# Each poll may spend POLL_BUDGET_RATIO of the poll interval reading blocks. Blocks left over
+# are deferred to the next poll, which starts with them (round robin); priority blocks are
+# always read first. A block read in progress is always completed.
+POLL_BUDGET_RATIO = 0.8
+
+# Polling tiers. Every register belongs to one tier: its "tier", else TIER_STATIC for identity
+# registers, TIER_TRIGGER for "trigger" registers, TIER_SLOW for "monotonic" counters,
+# TIER_CONTROL for "priority" and "burst" registers and TIER_NORMAL for the rest (and for
+# derived and diagnostic values). A tier is read every TIER_POLL_CYCLES[tier] polls (all of them
+# in the first poll) and has its own coordinator, so entities are only notified when the
+# registers of their tier were read.
+TIER_TRIGGER = "trigger"
+TIER_CONTROL = "control"
+TIER_NORMAL = "normal"
+TIER_SLOW = "slow"
+TIER_STATIC = "static"
+TIER_POLL_CYCLES = {TIER_TRIGGER: 1, TIER_CONTROL: 1, TIER_NORMAL: 1, TIER_SLOW: 30, TIER_STATIC: 360}
+
+# Zone triggers (WC/bath/technical room, 7103-7105): between polls the trigger registers alone
+# are read every trigger_interval seconds (0 = only with the poll). A value changing between
+# zero and non-zero fires EVENT_TRIGGER with the edge (EDGE_RISING/EDGE_FALLING) and updates
+# the trigger binary sensors.
+CONF_TRIGGER_INTERVAL = "trigger_interval"
+DEFAULT_TRIGGER_INTERVAL = 1.0
+EVENT_TRIGGER = f"{DOMAIN}_trigger"
+EDGE_RISING = "rising"
+EDGE_FALLING = "falling"
+
+# Transport paths: the HA Modbus integration hub and direct TCP. Path health is an exponentially
+# weighted (HEALTH_ALPHA) success rate and latency; the healthiest path carries all traffic and an
+# inactive path is re-probed with a read every PATH_REPROBE_INTERVAL seconds
+# Home Assistant Modbus integration: hubs live in hass.data[MODBUS_DOMAIN] keyed by hub name and
+# are replaced (or stopped) by these services, so the cached hub is resolved again after them
+MODBUS_DOMAIN = "modbus"
+MODBUS_RELOAD_SERVICES = ("reload", "restart", "stop")
+
+PATH_HA_HUB = "ha_hub"
+PATH_DIRECT = "direct"
+HEALTH_ALPHA = 0.2
+PATH_REPROBE_INTERVAL = 60
+
+# Direct TCP pipelining: up to pipeline_depth requests in flight on one connection per gateway
+# (1 = strict request/response). Gateways that mix up pipelined responses are
+# switched back to one request at a time automatically.
+CONF_PIPELINE_DEPTH = "pipeline_depth"
+DEFAULT_PIPELINE_DEPTH = 1
+MAX_PIPELINE_DEPTH = 16
+# Seconds to wait for a response on a pipelined connection
+DEFAULT_TCP_TIMEOUT = 3.0
+
+# Traffic capture (capture.py): every transport operation is written to
+# <config>/CAPTURE_DIR/capture_<device>.jsonl, rotated at CAPTURE_MAX_BYTES keeping
+# CAPTURE_BACKUPS old files. A replay file makes the hub answer from a capture instead of the
+# device (PATH_REPLAY), with recorded response times divided by replay_speed (0 = no delay).
+CONF_CAPTURE = "capture"
+CONF_REPLAY = "replay"
+CONF_REPLAY_SPEED = "replay_speed"
+CAPTURE_DIR = "ha_atrea_recuperation"
+CAPTURE_MAX_BYTES = 1_000_000
+CAPTURE_BACKUPS = 3
+DEFAULT_REPLAY_SPEED = 1.0
+PATH_REPLAY = "replay"
+
+# Registers the device answers with Modbus exception MODBUS_ILLEGAL_ADDRESS (illegal data
+# address) are stored per device (UNSUPPORTED_STORAGE_*) and left out of the read plan. The
+# list is dropped when the SW version (3100-3103) changes or after UNSUPPORTED_REPROBE_INTERVAL
+# seconds, so the registers are probed again.
+MODBUS_ILLEGAL_ADDRESS = 2
+# Exception code of a device or gateway that does not implement a function code
+MODBUS_ILLEGAL_FUNCTION = 1
+UNSUPPORTED_STORAGE_KEY = f"{DOMAIN}.unsupported"
+UNSUPPORTED_STORAGE_VERSION = 1
+UNSUPPORTED_SAVE_DELAY = 10
+UNSUPPORTED_REPROBE_INTERVAL = 7 * 24 * 3600
+
+# Entities become unavailable when a register they read was not read successfully by the last
+# STALE_AFTER_POLLS polls due to read its tier (and at least STALE_MIN_AGE seconds ago)
+STALE_AFTER_POLLS = 3
+STALE_MIN_AGE = 60
+
+# Diagnostic sensors exposing hub state stored in the coordinator data under their key
+DIAGNOSTIC_SENSORS = {
+    "poll_interval": {"name": "Poll interval", "unit": "s"},
+    "failed_blocks": {"name": "Failed block reads", "unit": None},
+    "deferred_blocks": {"name": "Deferred block reads", "unit": None},
+    "active_path": {"name": "Active connection path", "unit": None, "measurement": False, "attributes": "path_health"},
+    "writes_applied": {"name": "Applied writes", "unit": None},
+    "writes_throttled": {"name": "Throttled writes", "unit": None},
+}
+
+# Derived sensors computed by the hub once per poll from the registers in "inputs".
+# Values are only recomputed when one of the input registers changes.
+DERIVED_SENSORS = {
+    "supply_efficiency": {"name": "Heat recovery efficiency", "unit": "%", "inputs": (1101, 1102, 1103)},
+    "extract_efficiency": {"name": "Extract heat recovery efficiency", "unit": "%", "inputs": (1101, 1103, 1105)},
+    "recovered_heat_power": {"name": "Recovered heat power", "unit": "W", "inputs": (1101, 1102, 1109)},
+    "flow_imbalance": {"name": "Flow imbalance", "unit": "m³/h", "inputs": (1109, 1110)},
+    "flow_imbalance_ratio": {"name": "Flow imbalance ratio", "unit": "%", "inputs": (1109, 1110)},
 }
 
+# Volumetric heat capacity of air (~1.2 kg/m³ * 1005 J/(kg·K)) expressed in Wh/(m³·K)
+AIR_HEAT_CAPACITY = 0.335
+
+# Minimum outdoor/extract temperature difference (°C) for a meaningful efficiency value
+MIN_EFFICIENCY_DELTA_T = 1.0
+
 COILS = {
     7001: "Example function",
     8000: "reset_states",
     8001: "reset_filters",
     8002: "reset_uv",
 }
+
+# Services
+SERVICE_READ_REGISTERS = "read_registers"
+SERVICE_WRITE_REGISTERS = "write_registers"
+ATTR_DEVICE_ID = "device_id"
+ATTR_TABLE = "table"
+ATTR_ADDRESS = "address"
+ATTR_COUNT = "count"
+ATTR_VALUES = "values"
+# Modbus limit for a single write multiple registers (FC16) request
+MAX_WRITE_COUNT = 123
+# Modbus limit for the registers written by a read/write multiple registers (FC23) request
+MAX_READ_WRITE_COUNT = 121
+# FC23 requests in a row a path may leave unanswered, while plain writes on it succeed, before
+# it is no longer sent FC23 (an illegal function exception stops it at once)
+READ_WRITE_MAX_MISSES = 3
@@ -0,0 +1,105 @@
+"""Coordinators for HA Atrea Recuperation.
+
+Each device has one poll coordinator that runs the hub's polls at the interval the hub picks
+after each poll, and one TierCoordinator per polling tier (see TIER_POLL_CYCLES). Entities
+subscribe to the coordinator of their tier, which only notifies them when a poll, burst or
+write touched the registers of that tier, so a fast read of the control registers does not
+wake the entities of sensors, counters and identity registers.
+"""
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import DOMAIN, TIER_POLL_CYCLES
+from .hub import HaAtreaModbusHub
+from .snapshot import Snapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class TierCoordinator(DataUpdateCoordinator[Snapshot]):
+    """Coordinator of one polling tier, fed with snapshots by the device's poll coordinator.
+
+    It never polls itself: refresh requests go to the poll coordinator, which runs while any
+    tier coordinator has listeners.
+    """
+
+    def __init__(self, hass: HomeAssistant, poll_coordinator: DataUpdateCoordinator[Snapshot], tier: str) -> None:
+        super().__init__(hass, _LOGGER, name=f"{poll_coordinator.name}_{tier}")
+        self.tier = tier
+        self._poll_coordinator = poll_coordinator
+        self._unsub_poll: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE, context: Any = None) -> Callable[[], None]:
+        """Listen for data updates; the first listener starts the poll coordinator's schedule."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        if self._unsub_poll is None:
+            self._unsub_poll = self._poll_coordinator.async_add_listener(lambda: None)
+
+        @callback
+        def _remove() -> None:
+            remove_listener()
+            if not self._listeners and self._unsub_poll is not None:
+                self._unsub_poll()
+                self._unsub_poll = None
+
+        return _remove
+
+    async def async_request_refresh(self) -> None:
+        """Request a poll from the poll coordinator."""
+        await self._poll_coordinator.async_request_refresh()
+
+    @callback
+    def async_set_poll_failed(self, err: Exception) -> None:
+        """Mark the tier failed after a failed poll (the poll coordinator logged the error)."""
+        self.last_exception = err
+        if self.last_update_success:
+            self.last_update_success = False
+            self.async_update_listeners()
+
+
+def create_coordinators(
+    hass: HomeAssistant, hub: HaAtreaModbusHub, name: str
+) -> tuple[DataUpdateCoordinator[Snapshot], dict[str, TierCoordinator]]:
+    """Create the poll coordinator of a hub and the coordinators of its tiers.
+
+    The poll coordinator polls at the interval the hub picks after each poll. Its snapshots,
+    and those the hub publishes between polls, go to the coordinators of the tiers that were
+    read, and to tiers still marked failed by an earlier poll.
+    """
+    tiers: dict[str, TierCoordinator] = {}
+
+    @callback
+    def _dispatch(snapshot: Snapshot, polled: Iterable[str]) -> None:
+        polled = set(polled)
+        for tier, tier_coordinator in tiers.items():
+            if tier in polled or not tier_coordinator.last_update_success:
+                tier_coordinator.async_set_updated_data(snapshot)
+
+    async def _async_update() -> Snapshot:
+        try:
+            snapshot = await hub.async_update()
+        except Exception as ex:
+            for tier_coordinator in tiers.values():
+                tier_coordinator.async_set_poll_failed(ex)
+            raise
+        finally:
+            coordinator.update_interval = hub.poll_interval
+        _dispatch(snapshot, hub.polled_tiers)
+        return snapshot
+
+    coordinator = DataUpdateCoordinator(
+        hass,
+        _LOGGER,
+        name=f"{DOMAIN}_{name}",
+        update_method=_async_update,
+        update_interval=hub.poll_interval,
+    )
+    tiers.update((tier, TierCoordinator(hass, coordinator, tier)) for tier in TIER_POLL_CYCLES)
+    hub.set_update_listener(_dispatch)
+    return coordinator, tiers
@@ -0,0 +1,187 @@
+"""Register decoding for HA Atrea Recuperation.
+
+Converts raw 16-bit register words into typed values using the declarative
+register definitions of the register maps (see the TYPE_* constants in const.py). The hub runs
+decode_registers() once per poll; every platform reads the decoded values.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+import logging
+import struct
+
+from .const import (
+    TYPE_BITFIELD,
+    TYPE_ENUM,
+    TYPE_FLOAT32,
+    TYPE_INT16,
+    TYPE_INT32,
+    TYPE_STRING,
+    TYPE_UINT16,
+    TYPE_UINT32,
+    TYPE_WORDS,
+    WORD_ORDER_HIGH_FIRST,
+    WORD_ORDER_LOW_FIRST,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# ASCII printable character range for string registers
+ASCII_PRINTABLE_MIN = 32
+ASCII_PRINTABLE_MAX = 126
+
+
+def register_type(meta: Mapping[str, Any]) -> str:
+    """Return the declared type of a register definition (uint16 by default)."""
+    return meta.get("type", TYPE_UINT16)
+
+
+def register_count(meta: Mapping[str, Any]) -> int:
+    """Return the number of consecutive registers a definition occupies."""
+    rtype = register_type(meta)
+    if rtype == TYPE_STRING:
+        return int(meta.get("count", 1))
+    return TYPE_WORDS[rtype]
+
+
+def _scaled(value: int | float, meta: Mapping[str, Any]) -> int | float:
+    scale = meta.get("scale", 1)
+    if scale == 1:
+        return value
+    return value / scale
+
+
+def _join32(words: Sequence[int], meta: Mapping[str, Any]) -> int:
+    if meta.get("word_order", WORD_ORDER_HIGH_FIRST) == WORD_ORDER_LOW_FIRST:
+        low, high = words[0], words[1]
+    else:
+        high, low = words[0], words[1]
+    return ((int(high) & 0xFFFF) << 16) | (int(low) & 0xFFFF)
+
+
+def _decode_string(words: Sequence[int], meta: Mapping[str, Any]) -> Optional[str]:
+    """Decode one ASCII code per register, stopping at a NUL terminator."""
+    strict = bool(meta.get("strict", False))
+    chars = []
+    for w in words:
+        w = int(w)
+        if w == 0:
+            break
+        if not ASCII_PRINTABLE_MIN <= w <= ASCII_PRINTABLE_MAX:
+            if strict:
+                return None
+            break
+        chars.append(chr(w))
+    result = "".join(chars).strip()
+    return result or None
+
+
+def decode_value(
+    words: Sequence[int],
+    meta: Mapping[str, Any],
+    enum_options: Mapping[str, Mapping[int, str]] | None = None,
+) -> Any:
+    """Decode the raw words of a single register definition.
+
+    Args:
+        words: Raw register words, exactly register_count(meta) of them
+        meta: Register definition
+        enum_options: Named option sets for enum registers
+
+    Returns:
+        Decoded value (int/float/str/dict) or None if it cannot be decoded
+    """
+    rtype = register_type(meta)
+    if rtype == TYPE_UINT16:
+        return _scaled(int(words[0]) & 0xFFFF, meta)
+    if rtype == TYPE_INT16:
+        raw = int(words[0]) & 0xFFFF
+        return _scaled(raw - 0x10000 if raw & 0x8000 else raw, meta)
+    if rtype == TYPE_UINT32:
+        return _scaled(_join32(words, meta), meta)
+    if rtype == TYPE_INT32:
+        raw = _join32(words, meta)
+        return _scaled(raw - 0x100000000 if raw & 0x80000000 else raw, meta)
+    if rtype == TYPE_FLOAT32:
+        value = struct.unpack(">f", struct.pack(">I", _join32(words, meta)))[0]
+        if value != value:  # NaN
+            return None
+        return _scaled(value, meta)
+    if rtype == TYPE_STRING:
+        return _decode_string(words, meta)
+    if rtype == TYPE_ENUM:
+        code = int(words[0]) & 0xFFFF
+        options = (enum_options or {}).get(meta.get("options"), {})
+        return options.get(code, f"{code}")
+    if rtype == TYPE_BITFIELD:
+        raw = int(words[0]) & 0xFFFF
+        return {name: bool(raw & (1 << int(bit))) for bit, name in meta.get("bits", {}).items()}
+    raise ValueError(f"Unknown register type {rtype}")
+
+
+def decode_registers(
+    raw: Mapping[int, int],
+    entries: Iterable[Tuple[int, int, Mapping[str, Any]]],
+    enum_options: Mapping[str, Mapping[int, str]] | None = None,
+) -> Dict[int, Any]:
+    """Decode one register table from raw words.
+
+    Args:
+        raw: Raw words of the table keyed by address
+        entries: (address, count, definition) decode table, see RegisterMap.decode_table
+        enum_options: Named option sets for enum registers
+
+    Definitions whose registers are not all present in raw are left out, so a
+    multi-register value is never built from a partial read.
+    """
+    values: Dict[int, Any] = {}
+    for address, count, meta in entries:
+        words = [raw.get(address + i) for i in range(count)]
+        if any(w is None for w in words):
+            continue
+        try:
+            values[address] = decode_value(words, meta, enum_options)
+        except Exception:
+            _LOGGER.exception("Error decoding register %s as %s", address, register_type(meta))
+    return values
+
+
+def encode_value(
+    value: Any,
+    meta: Mapping[str, Any],
+    enum_options: Mapping[str, Mapping[int, str]] | None = None,
+) -> list[int]:
+    """Encode a value into raw register words (inverse of decode_value).
+
+    Raises:
+        ValueError: If the value cannot be represented by the register type
+    """
+    rtype = register_type(meta)
+    if rtype == TYPE_ENUM:
+        options = (enum_options or {}).get(meta.get("options"), {})
+        for code, label in options.items():
+            if label == value:
+                return [int(code)]
+        return [int(value) & 0xFFFF]
+    if rtype in (TYPE_STRING, TYPE_BITFIELD):
+        raise ValueError(f"Writing {rtype} registers is not supported")
+
+    scaled = float(value) * meta.get("scale", 1)
+    if rtype == TYPE_FLOAT32:
+        raw = struct.unpack(">I", struct.pack(">f", scaled))[0]
+    else:
+        raw = int(round(scaled))
+        bits = 16 if TYPE_WORDS[rtype] == 1 else 32
+        signed = rtype in (TYPE_INT16, TYPE_INT32)
+        low_limit = -(1 << (bits - 1)) if signed else 0
+        high_limit = (1 << (bits - 1)) - 1 if signed else (1 << bits) - 1
+        if not low_limit <= raw <= high_limit:
+            raise ValueError(f"Value {value} out of range for {rtype}")
+        raw &= (1 << bits) - 1
+
+    if TYPE_WORDS[rtype] == 1:
+        return [raw]
+    high, low = (raw >> 16) & 0xFFFF, raw & 0xFFFF
+    if meta.get("word_order", WORD_ORDER_HIGH_FIRST) == WORD_ORDER_LOW_FIRST:
+        return [low, high]
+    return [high, low]
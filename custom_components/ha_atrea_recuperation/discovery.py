@@ -0,0 +1,208 @@
+"""Unit discovery and connection validation for HA Atrea Recuperation.
+
+Probes Modbus unit IDs (on direct TCP hosts or an existing HA Modbus hub) with a short
+timeout each. Probes of a host share one connection with a bounded number of requests in
+flight; probes through an HA Modbus hub run one at a time, since the hub serializes its
+requests anyway. A unit counts as an Atrea unit when its identity block (serial number and
+model, see IDENTITY_BLOCK) decodes. The config flow validates a single unit with the same
+one-block read.
+"""
+from __future__ import annotations
+
+from typing import Iterable, List, NamedTuple, Optional
+import asyncio
+import logging
+import time
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DEFAULT_SCAN_IN_FLIGHT,
+    DEFAULT_SCAN_TIMEOUT,
+    DEFAULT_VALIDATE_TIMEOUT,
+    IDENTITY_BLOCK,
+    IDENTITY_MODEL,
+    IDENTITY_SERIAL,
+    TABLE_INPUT,
+)
+from .decoder import decode_registers
+from .hub import IDENTITY_MAP
+from .modbus_tcp import PipelinedConnection, acquire_connection, async_read_registers, release_connection
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DiscoveredUnit(NamedTuple):
+    """An Atrea unit answering on a host or HA Modbus hub."""
+
+    host: Optional[str]
+    port: Optional[int]
+    modbus_hub: Optional[str]
+    unit: int
+    serial: Optional[str]
+    model: Optional[str]
+    words: List[int]
+
+    @property
+    def target(self) -> str:
+        """Return the host:port or HA Modbus hub name the unit answers on."""
+        return self.modbus_hub or f"{self.host}:{self.port}"
+
+
+class ProbeResult(NamedTuple):
+    """Identity block of a unit and how long reading it took."""
+
+    words: List[int]
+    serial: Optional[str]
+    model: Optional[str]
+    latency: float
+
+
+def _tcp_reader(host: str, port: int, timeout: float):
+    async def _read(unit: int, address: int, count: int) -> list[int]:
+        return await async_read_registers(host, port, unit, TABLE_INPUT, address, count, timeout)
+    return _read
+
+
+def _connection_reader(connection: PipelinedConnection, timeout: float):
+    async def _read(unit: int, address: int, count: int) -> list[int]:
+        return await connection.read_registers(unit, TABLE_INPUT, address, count, timeout)
+    return _read
+
+
+def _hub_reader(ha_hub, timeout: float, lock: Optional[asyncio.Lock] = None):
+    """Return a reader through an HA Modbus hub; with a lock, reads run one at a time.
+
+    The timeout only covers the hub call, not the wait for the lock.
+    """
+    async def _call(unit: int, address: int, count: int) -> list[int] | None:
+        result = await asyncio.wait_for(ha_hub.async_pb_call(unit, address, count, TABLE_INPUT), timeout)
+        return list(result.registers) if result and hasattr(result, "registers") else None
+
+    async def _read(unit: int, address: int, count: int) -> list[int] | None:
+        if lock is None:
+            return await _call(unit, address, count)
+        async with lock:
+            return await _call(unit, address, count)
+    return _read
+
+
+def _get_ha_hub(hass: HomeAssistant, modbus_hub: str):
+    """Return the HA Modbus hub called modbus_hub, or None."""
+    ha_hub = hass.data.get("modbus", {}).get(modbus_hub)
+    return ha_hub if ha_hub is not None and hasattr(ha_hub, "async_pb_call") else None
+
+
+def decode_identity(words: List[int]) -> tuple[Optional[str], Optional[str]]:
+    """Decode (serial, model) from the words of IDENTITY_BLOCK."""
+    address, count = IDENTITY_BLOCK
+    raw = {address + i: w for i, w in enumerate(words[:count])}
+    values = decode_registers(raw, IDENTITY_MAP.decode_table[TABLE_INPUT])
+    return values.get(IDENTITY_SERIAL), values.get(IDENTITY_MODEL)
+
+
+async def _async_probe(read, target: str, unit: int) -> tuple[Optional[str], Optional[str], List[int]] | None:
+    """Read the identity block of one unit; None if it does not answer as an Atrea unit."""
+    address, count = IDENTITY_BLOCK
+    try:
+        words = await read(unit, address, count)
+    except asyncio.TimeoutError:
+        return None
+    except Exception as ex:
+        _LOGGER.debug("Probe of unit %s on %s failed: %s", unit, target, ex)
+        return None
+    if not words or len(words) != count:
+        return None
+    serial, model = decode_identity(words)
+    if serial is None and model is None:
+        _LOGGER.debug("Unit %s on %s answered but is not an Atrea unit", unit, target)
+        return None
+    return serial, model, list(words)
+
+
+async def async_scan_units(
+    hass: HomeAssistant,
+    units: Iterable[int],
+    hosts: Iterable[str] = (),
+    port: int = 502,
+    modbus_hub: Optional[str] = None,
+    timeout: float = DEFAULT_SCAN_TIMEOUT,
+    max_in_flight: int = DEFAULT_SCAN_IN_FLIGHT,
+) -> List[DiscoveredUnit]:
+    """Probe every unit ID on every host (and/or the HA Modbus hub) and return the Atrea units found.
+
+    Each host is probed over one connection (shared with hubs using the same gateway) with at
+    most max_in_flight requests outstanding; a host that cannot be connected to is skipped.
+    The HA Modbus hub is probed one unit at a time. Each probe gives up after timeout seconds
+    of waiting for its response.
+    """
+    units = list(units)
+    probes = []
+    connections: list[PipelinedConnection] = []
+
+    async def _probe(read, unit: int, host: Optional[str], target_port: Optional[int], hub_name: Optional[str]):
+        identity = await _async_probe(read, hub_name or f"{host}:{target_port}", unit)
+        if identity is None:
+            return None
+        return DiscoveredUnit(host, target_port, hub_name, unit, *identity)
+
+    try:
+        for host in hosts:
+            connection = acquire_connection(host, port, max_in_flight)
+            connections.append(connection)
+            try:
+                await connection.connect(timeout)
+            except (asyncio.TimeoutError, OSError) as ex:
+                _LOGGER.warning("Cannot connect to %s:%s (%s); skipping it in the scan", host, port, str(ex) or "timeout")
+                continue
+            read = _connection_reader(connection, timeout)
+            probes.extend(_probe(read, unit, host, port, None) for unit in units)
+
+        if modbus_hub:
+            ha_hub = _get_ha_hub(hass, modbus_hub)
+            if ha_hub is not None:
+                read = _hub_reader(ha_hub, timeout, asyncio.Lock())
+                probes.extend(_probe(read, unit, None, None, modbus_hub) for unit in units)
+            else:
+                _LOGGER.warning("Modbus hub %s not found; skipping it in the scan", modbus_hub)
+
+        found = [unit for unit in await asyncio.gather(*probes) if unit is not None]
+    finally:
+        for connection in connections:
+            release_connection(connection)
+    _LOGGER.debug("Scanned %d probes, found %d Atrea unit(s)", len(probes), len(found))
+    return found
+
+
+async def async_probe_unit(
+    hass: HomeAssistant,
+    unit: int,
+    host: Optional[str] = None,
+    port: int = 502,
+    modbus_hub: Optional[str] = None,
+    timeout: float = DEFAULT_VALIDATE_TIMEOUT,
+) -> ProbeResult:
+    """Read the identity block of one unit in a single request.
+
+    Raises:
+        asyncio.TimeoutError: If the unit does not answer within timeout
+        OSError: If the host cannot be reached
+        ModbusError: If the unit answers with a Modbus exception
+        ValueError: If the Modbus hub does not exist or the response is incomplete
+    """
+    if modbus_hub:
+        ha_hub = _get_ha_hub(hass, modbus_hub)
+        if ha_hub is None:
+            raise ValueError(f"Modbus hub {modbus_hub} not found")
+        read = _hub_reader(ha_hub, timeout)
+    else:
+        read = _tcp_reader(host, port, timeout)
+
+    address, count = IDENTITY_BLOCK
+    start = time.monotonic()
+    words = await read(unit, address, count)
+    latency = time.monotonic() - start
+    if not words or len(words) != count:
+        raise ValueError(f"Expected {count} registers, got {len(words) if words else 0}")
+    serial, model = decode_identity(words)
+    return ProbeResult(list(words), serial, model, latency)
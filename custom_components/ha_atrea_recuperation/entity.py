@@ -0,0 +1,59 @@
+"""Base entity for HA Atrea Recuperation."""
+
+from __future__ import annotations
+
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import ATTR_PENDING
+
+
+class HaAtreaEntity(CoordinatorEntity):
+    """Coordinator entity that tells the hub which registers it reads.
+
+    Subclasses set self._demand to the (table, address) keys they read. The keys are
+    registered with the hub while the entity is added to hass, so disabled entities
+    never cause their registers to be polled, and the entity goes unavailable once any
+    of them has not been read for too long.
+
+    The state is only written when the coordinator publishes a new snapshot version or
+    availability changes.
+
+    Subclasses that write holding registers set self._writes to their keys; the pending
+    attribute is True while a written value has not been confirmed by a read yet.
+    """
+
+    _demand: tuple = ()
+    _writes: tuple = ()
+    _written: tuple | None = None
+
+    @property
+    def available(self) -> bool:
+        """Unavailable when the last poll failed or a register this entity reads is stale."""
+        return super().available and self._hub.is_fresh(self._demand)
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        """Mark a written value that is shown before the device confirmed it."""
+        if not self._writes:
+            return None
+        data = self.coordinator.data
+        return {ATTR_PENDING: data is not None and any(data.is_pending(key) for key in self._writes)}
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        written = (getattr(self.coordinator.data, "version", None), self.available)
+        if written[0] is not None and written == self._written:
+            return
+        self._written = written
+        super()._handle_coordinator_update()
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        if not self._demand:
+            return
+        self.async_on_remove(self._hub.register_demand(self._demand))
+        data = self.coordinator.data or {}
+        if any(key not in data for key in self._demand):
+            # registers not read yet (e.g. entity just enabled): fetch them now
+            self.hass.async_create_task(self.coordinator.async_request_refresh())
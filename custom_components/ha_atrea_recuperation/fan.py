@@ -6,7 +6,9 @@ from homeassistant.components.fan import FanEntity, FanEntityFeature
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DISCOVERY_DEVICE_KEY, TABLE_HOLDING
+from .entity import HaAtreaEntity
 
 DOMAIN = "ha_atrea_recuperation"
 
@@ -19,7 +21,7 @@ async def async_setup_entry(
     """Set up the fan platform from a config entry."""
     device_data = hass.data[DOMAIN]["devices"][entry.entry_id]
     hub = device_data["hub"]
-    coordinator = device_data["coordinator"]
+    coordinator = device_data["coordinators"][hub.tier_for(HaAtreaFan._demand)]
     name = device_data["name"]
 
     async_add_entities([HaAtreaFan(coordinator, hub, f"{name} Fan")])
@@ -29,8 +31,10 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
     """Set up the fan platform (YAML backward compatibility)."""
     entities = []
 
-    # Get all devices from hass.data
+    # Get the device this platform was loaded for (all devices without discovery info)
     devices = hass.data[DOMAIN].get("devices", {})
+    if discovery_info and discovery_info.get(DISCOVERY_DEVICE_KEY) in devices:
+        devices = {discovery_info[DISCOVERY_DEVICE_KEY]: devices[discovery_info[DISCOVERY_DEVICE_KEY]]}
 
     # Create fan entity for each device (skip config entry devices)
     for device_key, device_data in devices.items():
@@ -39,7 +43,7 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
             continue
             
         hub = device_data["hub"]
-        coordinator = device_data["coordinator"]
+        coordinator = device_data["coordinators"][hub.tier_for(HaAtreaFan._demand)]
         name = device_data["name"]
 
         entities.append(HaAtreaFan(coordinator, hub, f"{name} Fan"))
@@ -47,9 +51,12 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
     async_add_entities(entities)
 
 
-class HaAtreaFan(CoordinatorEntity, FanEntity):
+class HaAtreaFan(HaAtreaEntity, FanEntity):
     """Percentage fan mapped to holding register 1004."""
 
+    _demand = ((TABLE_HOLDING, 1004),)
+    _writes = _demand
+
     def __init__(self, coordinator, hub, name: str) -> None:
         super().__init__(coordinator)
         self._hub = hub
@@ -71,7 +78,7 @@ class HaAtreaFan(CoordinatorEntity, FanEntity):
     def is_on(self) -> bool:
         if self.coordinator.data is None:
             return False
-        val = self.coordinator.data.get(1004)
+        val = self.coordinator.data.get((TABLE_HOLDING, 1004))
         if val is None:
             return False
         return int(val) > 0
@@ -80,7 +87,7 @@ class HaAtreaFan(CoordinatorEntity, FanEntity):
     def percentage(self) -> int | None:
         if self.coordinator.data is None:
             return None
-        val = self.coordinator.data.get(1004)
+        val = self.coordinator.data.get((TABLE_HOLDING, 1004))
         if val is None:
             return None
         return int(val)
@@ -90,8 +97,7 @@ class HaAtreaFan(CoordinatorEntity, FanEntity):
         return FanEntityFeature.SET_SPEED
 
     async def async_set_percentage(self, percentage: int) -> None:
-        await self._hub.write_holding(1004, int(percentage))
-        await self.coordinator.async_request_refresh()
+        await self._hub.write_value(1004, int(percentage))
 
     async def async_turn_on(self, percentage: int | None = None, **kwargs) -> None:
         if percentage is None:
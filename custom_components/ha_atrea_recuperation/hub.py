@@ -1,37 +1,110 @@
 """Hub that manages Modbus I/O for HA Atrea Recuperation.
 
-- Uses Home Assistant Modbus integration hub when configured (recommended).
-- Falls back to pymodbus ModbusTcpClient for direct TCP access when HA Modbus hub is not available.
-- Polls input registers and holdings, caches values and notifies subscribers.
+- Talks to the device through the Home Assistant Modbus integration hub (recommended) and/or
+  direct TCP with pymodbus or a pipelined connection (see transport.py), routing traffic
+  through the healthiest path. Traffic can be captured to a file and replayed instead of a
+  device (see capture.py).
+- Selects the register map for the device model (see register_map.py), reads it with a block
+  read plan, caches raw words per table and decodes them once per poll (see decoder.py) into
+  the values every platform reads from the coordinator, published as an immutable snapshot
+  at the end of each cycle (see snapshot.py).
+- Remembers registers the device reports as illegal addresses and plans reads around them.
+- Reads back the holding block around each write, in the same transaction (function 23) where
+  the endpoint supports it.
+- Rate limits writes per holding register (see limiter.py); throttled values are shown right
+  away and the newest one is written when the register's bucket has a token again.
+- Reads each polling tier (control, normal, slow counters, static identity) at its own rate and
+  reports which tiers a poll read, so only the coordinators of those tiers notify entities.
+- Reads the zone trigger registers on their own every second and fires an event on each edge.
+- Computes derived values (heat recovery efficiency, recovered power, flow imbalance) once per poll.
 """
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, Iterable, Optional
 from datetime import timedelta
+import asyncio
 import logging
+import time
 
-from homeassistant.core import HomeAssistant
+from homeassistant.const import ATTR_DOMAIN, ATTR_SERVICE, EVENT_CALL_SERVICE
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import UpdateFailed
+from homeassistant.util import slugify
+
+from .const import (
+    AIR_HEAT_CAPACITY,
+    BURST_INTERVAL,
+    DEFAULT_BURST_WINDOW,
+    DEFAULT_PIPELINE_DEPTH,
+    DEFAULT_REPLAY_SPEED,
+    DEFAULT_POLL_INTERVAL_MAX,
+    DEFAULT_POLL_INTERVAL_MIN,
+    DEFAULT_TRIGGER_INTERVAL,
+    DERIVED_SENSORS,
+    EDGE_FALLING,
+    EDGE_RISING,
+    ENUM_OPTIONS,
+    EVENT_TRIGGER,
+    IDENTITY_BLOCK,
+    IDENTITY_MODEL,
+    IDENTITY_REGISTERS,
+    IDENTITY_SERIAL,
+    IDENTITY_SW_VERSION,
+    MAX_READ_WRITE_COUNT,
+    MIN_EFFICIENCY_DELTA_T,
+    MODBUS_DOMAIN,
+    MODBUS_ILLEGAL_ADDRESS,
+    MODBUS_ILLEGAL_FUNCTION,
+    MODBUS_RELOAD_SERVICES,
+    OPTIMISTIC_TIMEOUT,
+    PATH_DIRECT,
+    PATH_HA_HUB,
+    PATH_REPLAY,
+    PATH_REPROBE_INTERVAL,
+    POLL_BACKOFF_FACTOR,
+    POLL_BUDGET_RATIO,
+    POLL_FAST_CHANGE_RATIO,
+    POLL_RELAX_FACTOR,
+    POLL_SLOW_CYCLE_RATIO,
+    POLL_SPEEDUP_FACTOR,
+    READ_WRITE_MAX_MISSES,
+    STALE_AFTER_POLLS,
+    STALE_MIN_AGE,
+    TABLE_HOLDING,
+    TABLE_INPUT,
+    TIER_CONTROL,
+    TIER_NORMAL,
+    TIER_POLL_CYCLES,
+    TIER_SLOW,
+    TIER_STATIC,
+    TIER_TRIGGER,
+    UNSUPPORTED_REPROBE_INTERVAL,
+    UNSUPPORTED_SAVE_DELAY,
+    UNSUPPORTED_STORAGE_KEY,
+    UNSUPPORTED_STORAGE_VERSION,
+    WRITE_RATE_BURST,
+    WRITE_RATE_INTERVAL,
+)
+from .capture import ReplayTransport, TrafficCapture
+from .decoder import decode_registers, encode_value, register_count
+from .limiter import TokenBucket, WriteThrottled
+from .modbus_tcp import ModbusError
+from .register_map import TABLES, ReadBlock, RegisterMap, compile_register_map, select_register_map
+from .snapshot import Snapshot
+from .transport import HaHubTransport, ModbusTransport, PathHealth, PipelinedTcpTransport
 
 _LOGGER = logging.getLogger(__name__)
 
 DOMAIN = "ha_atrea_recuperation"
 
-# ASCII printable character range for register validation
-ASCII_PRINTABLE_MIN = 32
-ASCII_PRINTABLE_MAX = 126
+DEFAULT_HVAC_MAP = ENUM_OPTIONS["operation_mode"]
 
-DEFAULT_HVAC_MAP = {
-    0: "Off",
-    1: "Auto",
-    2: "Ventilation",
-    3: "Circulation with ventilation",
-    4: "Circulation",
-    5: "Night precooling",
-    6: "Balancing",
-    7: "Overpressure",
-    8: "Undefined",
-}
+# Identity registers (serial, model, SW version) needed to pick a register map
+IDENTITY_MAP = compile_register_map({"name": "identity", TABLE_INPUT: IDENTITY_REGISTERS})
 
 
 class HaAtreaModbusHub:
@@ -46,7 +119,16 @@ class HaAtreaModbusHub:
         unit: int = 1,
         modbus_hub_name: Optional[str] = None,
         poll_interval: int = 10,
+        poll_interval_min: int = DEFAULT_POLL_INTERVAL_MIN,
+        poll_interval_max: int = DEFAULT_POLL_INTERVAL_MAX,
+        burst_window: int = DEFAULT_BURST_WINDOW,
+        pipeline_depth: int = DEFAULT_PIPELINE_DEPTH,
+        capture_path: str | None = None,
+        replay_path: str | None = None,
+        replay_speed: float = DEFAULT_REPLAY_SPEED,
+        trigger_interval: float = DEFAULT_TRIGGER_INTERVAL,
         hvac_map: Dict[int, str] | None = None,
+        identity: list[int] | None = None,
     ) -> None:
         self.hass = hass
         self.name = name
@@ -54,14 +136,132 @@ class HaAtreaModbusHub:
         self.port = int(port)
         self.unit = int(unit)
         self.modbus_hub_name = modbus_hub_name
-        self.poll_interval = timedelta(seconds=int(poll_interval))
+        # adaptive poll interval (see _adapt_interval); poll_interval is the interval in effect
+        self._base_interval = float(poll_interval)
+        self._min_interval = min(float(poll_interval_min), self._base_interval)
+        self._max_interval = max(float(poll_interval_max), self._base_interval)
+        self.poll_interval = timedelta(seconds=self._base_interval)
+        # post-write burst polling: written holding keys, end time and the pending timer
+        self._burst_window = float(burst_window)
+        self._burst_keys: set[tuple[str, int]] = set()
+        self._burst_until = 0.0
+        self._burst_cancel: CALLBACK_TYPE | None = None
+        # trigger polling between polls: interval, pending timer, its block plan and the last
+        # value seen per trigger key
+        self._trigger_interval = float(trigger_interval)
+        self._trigger_cancel: CALLBACK_TYPE | None = None
+        self._trigger_plan: list[ReadBlock] = []
+        self._trigger_values: Dict[tuple[str, int], Any] = {}
+        # called with the data and the tiers read after reads outside the coordinator's schedule (bursts)
+        self._update_listener: Callable[[Snapshot, Iterable[str]], None] | None = None
+        # words read and words whose value changed during the current poll
+        self._read_words = 0
+        self._changed_words = 0
         self._hvac_map = hvac_map or DEFAULT_HVAC_MAP
 
-        # cache for registers
-        self._cache: Dict[int, Any] = {}
+        # raw register words per table, and when each word was last read successfully
+        self._cache: Dict[str, Dict[int, int]] = {table: {} for table in TABLES}
+        self._read_time: Dict[str, Dict[int, float]] = {table: {} for table in TABLES}
+        # decoded values keyed by (table, address), plus derived values keyed by DERIVED_SENSORS key;
+        # a working buffer only, entities read the snapshot published from it (see _publish)
+        self._data: Dict[Any, Any] = {}
+        self._snapshot = Snapshot({})
+        # hub state for the diagnostic sensors (see DIAGNOSTIC_SENSORS); kept out of the snapshot
+        # since it changes on every request and would give every poll a new snapshot version
+        self.diagnostics: Dict[str, Any] = {}
+        # decoded values of holding registers written but not confirmed by a read yet, the key each
+        # written register word belongs to, the written words, when each key is rolled back unless
+        # confirmed (none while a throttled write waits) and the timer rolling back expired keys
+        self._overlay: Dict[Any, Any] = {}
+        self._overlay_words: Dict[int, tuple[str, int]] = {}
+        self._overlay_raw: Dict[int, int] = {}
+        self._overlay_deadline: Dict[tuple[str, int], float] = {}
+        self._overlay_cancel: CALLBACK_TYPE | None = None
+        self._enum_options = {**ENUM_OPTIONS, "operation_mode": self._hvac_map}
+        # monotonic counters: time of the last accepted value, values waiting for confirmation and
+        # when the words each counter was last checked from were read
+        self._counter_time: Dict[Any, float] = {}
+        self._counter_pending: Dict[Any, Any] = {}
+        self._counter_read: Dict[Any, float] = {}
+        # register map selected from the decoded model string, and its read plan
+        self._map: RegisterMap | None = None
+        self._map_model: str | None = None
+        self._plan: list[ReadBlock] = []
+        self._plan_spans: list[tuple[str, int, int]] = []
+        # plans of the tier sets polls read, each split into blocks read first in every poll and
+        # blocks read in round-robin order from its rotation index while the poll budget lasts
+        self._tier_plans: Dict[frozenset[str], tuple[list[ReadBlock], list[ReadBlock]]] = {}
+        self._rotation: Dict[frozenset[str], int] = {}
+        # blocks the last poll deferred or failed to read; the next poll reads them whatever tiers
+        # it reads, so they do not wait until their tier set is due again
+        self._carried: list[ReadBlock] = []
+        self._plan_dirty = True
+        # polls started (schedules the tiers, see TIER_POLL_CYCLES), tiers the next poll reads
+        # regardless of the schedule and the tiers the last poll read
+        self._poll_count = 0
+        self._forced_tiers: set[str] = set()
+        self.polled_tiers: frozenset[str] = frozenset()
+        # start times of the last STALE_AFTER_POLLS polls due to read each tier (see is_fresh)
+        self._tier_polls: Dict[str, Deque[float]] = {tier: deque(maxlen=STALE_AFTER_POLLS) for tier in TIER_POLL_CYCLES}
+        # (table, address) keys read by the entities currently added to hass, with reference counts
+        self._demand: Counter = Counter()
+        # holding write rate limit: token bucket per register word, the newest throttled value per
+        # word waiting for tokens, the timer writing them, and write counters
+        self._write_buckets: Dict[int, TokenBucket] = {}
+        self._throttled_words: Dict[int, int] = {}
+        self._throttled_cancel: CALLBACK_TYPE | None = None
+        self.diagnostics["writes_applied"] = 0
+        self.diagnostics["writes_throttled"] = 0
+        # coil pulses waiting for their release write: coil -> cancel callback of the timer
+        self._pending_releases: Dict[int, CALLBACK_TYPE] = {}
+        # input register values each derived value was last computed from
+        self._derived_inputs: Dict[str, tuple] = {}
+        # (table, address) words the device answered with an illegal data address, persisted with
+        # the SW version they were found with and when the list was started (see _check_unsupported)
+        self._unsupported: set[tuple[str, int]] = set()
+        self._unsupported_sw: str | None = None
+        self._unsupported_since: float | None = None
+        self._unsupported_loaded = False
+        self._store: Store = Store(hass, UNSUPPORTED_STORAGE_VERSION, f"{UNSUPPORTED_STORAGE_KEY}.{slugify(name)}_{self.unit}")
 
-        # HA modbus hub will be retrieved lazily when needed
+        # HA modbus hub, resolved lazily and dropped again when the modbus integration reloads
         self._ha_modbus_hub = None
+        self._ha_modbus_hub_key: str | None = None
+        self._unsub_modbus_events = hass.bus.async_listen(
+            EVENT_CALL_SERVICE, self._async_modbus_service_called, event_filter=_is_modbus_reload
+        )
+
+        # transport paths (HA Modbus hub when one is named or no host is set, direct TCP when a
+        # host is set) with their health; all traffic goes through the active (healthiest) path.
+        # Direct TCP uses a connection shared per gateway, pipelined when pipeline_depth > 1.
+        self._transports: Dict[str, ModbusTransport] = {}
+        if self.modbus_hub_name or not self.host:
+            self._transports[PATH_HA_HUB] = HaHubTransport(self._get_ha_modbus_hub, self.unit)
+        if self.host:
+            self._transports[PATH_DIRECT] = PipelinedTcpTransport(self.host, self.port, self.unit, int(pipeline_depth))
+        if replay_path:
+            # offline replay of a captured session replaces the device
+            for transport in self._transports.values():
+                transport.close()
+            self._transports = {PATH_REPLAY: ReplayTransport(hass, replay_path, self.unit, replay_speed, int(pipeline_depth))}
+        # every transport operation is recorded while capturing
+        self._capture = TrafficCapture(hass, capture_path) if capture_path else None
+        self._health: Dict[str, PathHealth] = {path: PathHealth() for path in self._transports}
+        self._active_path: str | None = None
+        # FC23 requests in a row each path left unanswered while plain writes on it succeeded
+        self._read_write_misses: Dict[str, int] = {}
+
+        # identity block (IDENTITY_BLOCK) read while the config flow validated the connection;
+        # decoding it up front selects the register map without reading it on the first poll
+        self._seeded: set[tuple[str, int]] = set()
+        if identity:
+            address, count = IDENTITY_BLOCK
+            now = time.monotonic()
+            for offset, word in enumerate(identity[:count]):
+                self._cache[TABLE_INPUT][address + offset] = int(word) & 0xFFFF
+                self._read_time[TABLE_INPUT][address + offset] = now
+            self._decode()
+            self._seeded = {(TABLE_INPUT, a) for a, n, _ in IDENTITY_MAP.decode_table[TABLE_INPUT] if address <= a and a + n <= address + count}
 
     @property
     def device_info(self) -> DeviceInfo:
@@ -91,313 +291,1104 @@ class HaAtreaModbusHub:
             sw_version=sw_version,
         )
 
-    @staticmethod
-    def _is_valid_ascii_char(value: int) -> bool:
-        """Check if value is in printable ASCII range."""
-        return ASCII_PRINTABLE_MIN <= value <= ASCII_PRINTABLE_MAX
+    def _get_serial_number(self) -> str | None:
+        """Return the serial number decoded from registers 3000-3008."""
+        return self._data.get((TABLE_INPUT, IDENTITY_SERIAL))
 
-    def _read_string_from_registers(self, start_reg: int, end_reg: int, required: bool = False) -> str | None:
-        """Extract ASCII string from consecutive registers.
+    def _get_model_name(self) -> str | None:
+        """Return the model name decoded from registers 3009-3019."""
+        return self._data.get((TABLE_INPUT, IDENTITY_MODEL))
 
-        Args:
-            start_reg: First register to read
-            end_reg: Last register to read (exclusive)
-            required: If True, return None if any register is None; if False, stop at first None
+    def _get_sw_version(self) -> str | None:
+        """Return the SW version decoded from registers 3100-3103."""
+        return self._data.get((TABLE_INPUT, IDENTITY_SW_VERSION))
 
-        Returns:
-            Extracted string or None
+    def _get_ha_modbus_hub(self):
+        """Return the HA Modbus hub, resolving it again when the cached one is no longer current.
+
+        The hub is looked up by name in hass.data['modbus'] (the first hub there if neither a
+        name nor a host is configured). The cached object is only used while hass.data['modbus'] still holds that
+        same object, so a hub replaced by a modbus reload is never called.
         """
-        try:
-            chars = []
-            for r in range(start_reg, end_reg):
-                v = self._cache.get(r)
-                if v is None:
-                    if required:
-                        return None
-                    break
-                if v == 0:
-                    # Null terminator, stop reading
-                    break
-                # Validate printable ASCII range
-                if not self._is_valid_ascii_char(int(v)):
-                    if required:
-                        return None
-                    break
-                try:
-                    chars.append(chr(int(v)))
-                except Exception:
-                    if required:
-                        return None
-                    break
-            if chars:
-                result = "".join(chars).strip()
-                return result if result else None
-        except Exception:
+        modbus_hubs = self.hass.data.get(MODBUS_DOMAIN)
+        if not isinstance(modbus_hubs, dict):
+            self._ha_modbus_hub = None
             return None
+        hub = self._ha_modbus_hub
+        if hub is not None and modbus_hubs.get(self._ha_modbus_hub_key) is hub:
+            return hub
 
-    def _get_serial_number(self) -> str | None:
-        """Extract serial number from cached registers 3000-3008."""
-        return self._read_string_from_registers(3000, 3009, required=True)
+        self._ha_modbus_hub = None
+        if self.modbus_hub_name:
+            key = self.modbus_hub_name
+        elif not self.host:
+            key = next(iter(modbus_hubs), None)
+        else:
+            key = None
+        hub = modbus_hubs.get(key) if key is not None else None
+        if hub is not None and hasattr(hub, "async_pb_call"):
+            self._ha_modbus_hub = hub
+            self._ha_modbus_hub_key = key
+            _LOGGER.debug("Resolved HA Modbus hub %s for %s", key, self.name)
+        return self._ha_modbus_hub
 
-    def _get_model_name(self) -> str | None:
-        """Extract model name from cached registers 3009-3019."""
-        return self._read_string_from_registers(3009, 3020, required=False)
+    @callback
+    def _async_modbus_service_called(self, event: Event) -> None:
+        """Drop the cached HA Modbus hub when the modbus integration is reloaded, restarted or stopped."""
+        if self._ha_modbus_hub is not None:
+            _LOGGER.debug("modbus.%s called; resolving the HA Modbus hub of %s again", event.data.get(ATTR_SERVICE), self.name)
+        self._ha_modbus_hub = None
 
-    def _get_sw_version(self) -> str | None:
-        """Extract SW version from cached registers 3100-3103."""
-        return self._read_string_from_registers(3100, 3104, required=False)
+    @property
+    def register_map(self) -> RegisterMap:
+        """Return the register map in use (identity registers only until one is selected)."""
+        return self._map or IDENTITY_MAP
 
-    def _get_ha_modbus_hub(self):
-        """Get the HA Modbus hub from hass.data if available.
+    def tier_of(self, key: Any) -> str:
+        """Return the polling tier of a coordinator data key (TIER_NORMAL for hub values)."""
+        if not isinstance(key, tuple):
+            return TIER_NORMAL
+        table, address = key
+        meta = self.register_map.get(table, address) or {}
+        if "tier" in meta:
+            return meta["tier"]
+        if IDENTITY_MAP.get(table, address) is not None:
+            return TIER_STATIC
+        if meta.get("trigger"):
+            return TIER_TRIGGER
+        if meta.get("monotonic"):
+            return TIER_SLOW
+        if meta.get("priority") or meta.get("burst"):
+            return TIER_CONTROL
+        return TIER_NORMAL
+
+    def tier_for(self, keys: Iterable[Any]) -> str:
+        """Return the tier an entity reading keys follows: the most often read tier among them.
 
-        This attempts multiple strategies:
-        - If hass.data['modbus'] is a dict and a name is configured, use it.
-        - Otherwise scan hass.data['modbus'] for a hub object with async_pb_call.
-        - As a last resort scan top-level hass.data values for an object with async_pb_call.
+        Tiers are read at multiples of each other's rate, so every poll reading the slower
+        tiers of an entity also reads its fastest one.
         """
-        if self._ha_modbus_hub is None:
-            try:
-                modbus_hubs = self.hass.data.get("modbus")
-                if isinstance(modbus_hubs, dict):
-                    if self.modbus_hub_name:
-                        hub = modbus_hubs.get(self.modbus_hub_name)
-                        if hub and hasattr(hub, "async_pb_call"):
-                            self._ha_modbus_hub = hub
-                            _LOGGER.debug("Found HA Modbus hub by name: %s", self.modbus_hub_name)
-                            return self._ha_modbus_hub
-                    # scan the dict for a candidate
-                    for k, v in modbus_hubs.items():
-                        if hasattr(v, "async_pb_call"):
-                            self._ha_modbus_hub = v
-                            _LOGGER.debug("Found HA Modbus hub by scanning modbus dict: %s", k)
-                            return self._ha_modbus_hub
-
-                # fallback: scan top-level hass.data for an object exposing async_pb_call
-                for k, v in self.hass.data.items():
-                    if hasattr(v, "async_pb_call"):
-                        self._ha_modbus_hub = v
-                        _LOGGER.debug("Found HA Modbus hub in hass.data key: %s", k)
-                        return self._ha_modbus_hub
+        tiers = {self.tier_of(key) for key in keys}
+        return min(tiers, key=list(TIER_POLL_CYCLES).index) if tiers else TIER_NORMAL
 
-            except Exception as ex:
-                _LOGGER.debug("Could not get HA Modbus hub: %s", ex)
-        return self._ha_modbus_hub
+    def _due_tiers(self) -> frozenset[str]:
+        """Return the tiers the poll starting now reads."""
+        due = frozenset(
+            tier for tier, cycles in TIER_POLL_CYCLES.items() if self._poll_count % cycles == 0
+        ) | self._forced_tiers
+        self._poll_count += 1
+        self._forced_tiers = set()
+        return due
 
-    async def async_update(self) -> Dict[int, Any]:
-        """Poll a set of registers and update cache.
+    async def async_update(self) -> Snapshot:
+        """Read the block plan of the tiers due, update the raw cache and decode it.
 
-        The list below reflects the input and holding registers present in the document.
-        This method is called by DataUpdateCoordinator.
+        This method is called by DataUpdateCoordinator. polled_tiers holds the tiers read.
         """
+        due = self._due_tiers()
         try:
-            registers_to_poll = [
-                # inputs
-                1001, 1002, 1003, 1004, 1005, 1006, 1007, 1008, 1009, 1010, 1011, 1012, 1013, 1014,
-                1101, 1102, 1103, 1104, 1105, 1106, 1107, 1108, 1109, 1110, 1111, 1112, 1113, 1114,
-                1201, 1202, 1203, 1204, 1205, 1206,
-                3000, 3001, 3002, 3003, 3004, 3005, 3006, 3007, 3008,  # Serial number
-                3009, 3010, 3011, 3012, 3013, 3014, 3015, 3016, 3017, 3018, 3019,  # Model
-                3100, 3101, 3102, 3103,  # SW version
-                3200, 3201, 3202, 3203, 3204, 3205,
-                7103, 7104, 7105,
-                # holdings (we read a selected set here)
-                1001, 1002, 1003, 1004, 1005, 1006, 1500, 1501, 3189, 3190,
+            start = time.monotonic()
+            for tier in due:
+                self._tier_polls[tier].append(start)
+            if not self._unsupported_loaded:
+                await self._async_load_unsupported()
+            if self._map is None or (self._map_model is None and self._get_model_name()):
+                await self._async_select_map()
+            if self._plan_dirty:
+                self._build_plan()
+            self._read_words = self._changed_words = 0
+            failed = attempted = 0
+            deadline = start + self.poll_interval.total_seconds() * POLL_BUDGET_RATIO
+            priority_blocks, rotating_blocks = self._tier_plan(due)
+            rotation = self._rotation.get(due, 0)
+            rotating = rotating_blocks[rotation:] + rotating_blocks[:rotation]
+            carried = [
+                block for block in self._carried
+                if block not in priority_blocks and block not in rotating_blocks
+                and not any((block.table, word) in self._unsupported for word in range(block.address, block.address + block.count))
             ]
-            for reg in registers_to_poll:
-                val = await self._read_register(reg)
-                if val is not None:
-                    self._cache[int(reg)] = val
-                    _LOGGER.debug("Cached register %s = %s", reg, val)
-                else:
-                    _LOGGER.debug("No value for register %s", reg)
-            return self._cache
-        except Exception:
+            blocks = priority_blocks + carried + rotating
+            priority = len(priority_blocks)
+            deferred = 0
+            failed_blocks: list[ReadBlock] = []
+            # read as many blocks at once as the active path keeps in flight; batches do not
+            # mix priority and other blocks so the budget check applies to every other one
+            while attempted < len(blocks):
+                if attempted >= priority and time.monotonic() >= deadline:
+                    deferred = len(blocks) - attempted
+                    break
+                end = attempted + self._io_depth()
+                batch = blocks[attempted:min(end, priority) if attempted < priority else end]
+                results = await asyncio.gather(*(self._read_block(block) for block in batch))
+                attempted += len(batch)
+                failed_blocks.extend(block for block, ok in zip(batch, results) if not ok)
+            failed = len(failed_blocks)
+            self._carried = blocks[attempted:] + failed_blocks
+            deferred_rotating = min(deferred, len(rotating))
+            if deferred_rotating:
+                # next poll of these tiers starts with the first block left out of this one
+                self._rotation[due] = (rotation + len(rotating) - deferred_rotating) % len(rotating)
+            if deferred:
+                _LOGGER.debug("Poll budget of %s used up; deferring %d blocks to the next poll", self.name, deferred)
+            if self._seeded:
+                self._seeded.clear()
+                self._plan_dirty = True
+            self._decode()
+            self._check_triggers()
+            self._check_unsupported()
+            self._adapt_interval(time.monotonic() - start, failed)
+        except Exception as ex:
             _LOGGER.exception("Error in polling loop")
-            return self._cache
+            self._forced_tiers.update(due)
+            raise UpdateFailed(f"Error polling {self.name}: {ex}") from ex
+        finally:
+            if self._capture is not None:
+                await self._capture.async_flush()
 
-    async def _read_register(self, address: int) -> Any:
-        """Read a single register using the HA Modbus hub if available, else pymodbus fallback."""
-        try:
-            # Prefer HA Modbus hub
-            ha_hub = self._get_ha_modbus_hub()
-            if ha_hub and hasattr(ha_hub, "async_pb_call"):
-                _LOGGER.debug("Using HA Modbus hub for address %s (unit=%s)", address, self.unit)
-                # Try reading as input register first
-                try:
-                    result = await ha_hub.async_pb_call(
-                        self.unit, address, 1, "input"
-                    )
-                    _LOGGER.debug("HA hub read_input_registers result for %s: %s", address, getattr(result, "registers", result))
-                    if result and hasattr(result, "registers") and result.registers:
-                        return result.registers[0]
-                except Exception as ex:
-                    _LOGGER.debug("HA hub read_input_registers failed for %s: %s", address, ex)
-
-                # Try reading as holding register
-                try:
-                    result = await ha_hub.async_pb_call(
-                        self.unit, address, 1, "holding"
-                    )
-                    _LOGGER.debug("HA hub read_holding_registers result for %s: %s", address, getattr(result, "registers", result))
-                    if result and hasattr(result, "registers") and result.registers:
-                        return result.registers[0]
-                except Exception as ex:
-                    _LOGGER.debug("HA hub read_holding_registers failed for %s: %s", address, ex)
-
-            # Fallback to direct pymodbus read
-            if not self.host:
-                _LOGGER.debug("No host configured for pymodbus fallback (address %s)", address)
-                return None
-            _LOGGER.debug("Using pymodbus fallback to read address %s on %s:%s", address, self.host, self.port)
-            return await self.hass.async_add_executor_job(_pymodbus_read_best_effort, self.host, self.port, self.unit, int(address))
-        except Exception:
-            _LOGGER.exception("Error reading register %s", address)
-            return None
+        self.diagnostics["failed_blocks"] = failed
+        self.diagnostics["deferred_blocks"] = deferred
+        if attempted and failed == attempted:
+            self._forced_tiers.update(due)
+            raise UpdateFailed(f"No register block could be read from {self.name}")
+        if failed:
+            _LOGGER.debug("Poll of %s partially succeeded: %d of %d blocks failed", self.name, failed, attempted)
+        self.polled_tiers = due
+        self._schedule_trigger_poll()
+        return self._publish()
 
-    async def write_holding(self, address: int, value: int) -> bool:
-        """Write a single holding register via HA modbus hub if available, or pymodbus fallback."""
+    def _publish(self) -> Snapshot:
+        """Swap in a snapshot of the working data and the optimistic overlay."""
+        self._snapshot = self._snapshot.publish(self._data, self._overlay)
+        return self._snapshot
+
+    async def _read_block(self, block: ReadBlock) -> bool:
+        """Read one block of the plan into the raw cache."""
+        table, address, count = block
         try:
-            # Try HA Modbus hub first
-            ha_hub = self._get_ha_modbus_hub()
-            if ha_hub and hasattr(ha_hub, "async_pb_call"):
-                result = await ha_hub.async_pb_call(
-                    self.unit, address, int(value), "write_register"
-                )
-                _LOGGER.debug("HA hub write_register result for %s: %s", address, result)
-                if result:
-                    # Update cache immediately for optimistic updates
-                    self._cache[int(address)] = int(value)
-                    return True
-
-            # Fallback to pymodbus
-            if not self.host:
-                _LOGGER.error("No host configured for pymodbus fallback")
-                return False
-            ok = await self.hass.async_add_executor_job(_pymodbus_write_register, self.host, self.port, self.unit, int(address), int(value))
-            if ok:
-                # Update cache immediately for optimistic updates
-                self._cache[int(address)] = int(value)
-            return bool(ok)
-        except Exception:
-            _LOGGER.exception("Error writing holding register %s", address)
+            words = await self._read_registers(address, count, table)
+        except ModbusError as ex:
+            if ex.code == MODBUS_ILLEGAL_ADDRESS:
+                return await self._isolate_unsupported(block)
+            _LOGGER.debug("%s registers %s-%s: %s", table, address, address + count - 1, ex)
+            return False
+        if words is None:
+            _LOGGER.debug("No value for %s registers %s-%s", table, address, address + count - 1)
             return False
+        self._store_words(table, address, words)
+        return True
+
+    def _store_words(self, table: str, address: int, words: list[int]) -> None:
+        """Put consecutive words read from the device into the raw cache."""
+        count = len(words)
+        cache = self._cache[table]
+        read_time = self._read_time[table]
+        now = time.monotonic()
+        if table == TABLE_HOLDING and self._overlay_words:
+            self._reconcile(address, words)
+        for offset, word in enumerate(words):
+            previous = cache.get(address + offset)
+            if previous is not None and previous != word:
+                self._changed_words += 1
+            cache[address + offset] = word
+            read_time[address + offset] = now
+        self._read_words += count
+        _LOGGER.debug("Cached %s registers %s-%s = %s", table, address, address + count - 1, words)
+
+    def _reconcile(self, address: int, words: list[int]) -> None:
+        """Confirm or roll back optimistic values against holding words read from the device.
+
+        A value read back as written is confirmed. One reported differently stays pending
+        until its deadline, since the device may apply a write late, and is then rolled back.
+        Values still waiting for the write rate limit are left alone.
+        """
+        now = time.monotonic()
+        matches: Dict[tuple[str, int], bool] = {}
+        for offset, word in enumerate(words):
+            key = self._overlay_words.get(address + offset)
+            if key is None or self._is_throttled(address + offset):
+                continue
+            written = self._overlay_raw.get(address + offset, word)
+            matches[key] = matches.get(key, True) and written == word
+        for key, match in matches.items():
+            if match:
+                _LOGGER.debug("Write of %s %s confirmed by the device", key, self._overlay.get(key))
+                # the confirmed value is what the words decode to; keep it until they are decoded
+                self._data[key] = self._overlay.get(key)
+                self._drop_overlay(key)
+            elif now >= self._overlay_deadline.get(key, now):
+                self._roll_back(key, "the device reports another value")
+
+    def _roll_back(self, key: tuple[str, int], reason: str) -> None:
+        """Drop an optimistic value that the device did not confirm, logging a warning."""
+        _LOGGER.warning(
+            "%s: holding register %s was written as %s but %s; showing the device value",
+            self.name, key[1], self._overlay.get(key), reason,
+        )
+        self._drop_overlay(key)
+
+    def _drop_overlay(self, key: tuple[str, int]) -> None:
+        """Remove an optimistic value and the words it was written with."""
+        self._overlay.pop(key, None)
+        self._overlay_deadline.pop(key, None)
+        for word in [word for word, word_key in self._overlay_words.items() if word_key == key]:
+            del self._overlay_words[word]
+            self._overlay_raw.pop(word, None)
+
+    def _schedule_overlay_expiry(self) -> None:
+        """Run the rollback of unconfirmed optimistic values at the earliest deadline."""
+        if self._overlay_cancel is not None:
+            self._overlay_cancel()
+            self._overlay_cancel = None
+        if self._overlay_deadline:
+            delay = max(0.0, min(self._overlay_deadline.values()) - time.monotonic())
+            self._overlay_cancel = async_call_later(self.hass, delay, self._overlay_expired)
 
-    async def write_coil_pulse(self, coil_addr: int, pulse_ms: int = 500) -> None:
-        """Pulse a coil (True -> wait -> False) using HA modbus hub or pymodbus fallback."""
+    @callback
+    def _overlay_expired(self, _now) -> None:
+        """Roll back optimistic values not confirmed by their deadline and publish the data."""
+        self._overlay_cancel = None
+        now = time.monotonic()
+        expired = [key for key, deadline in self._overlay_deadline.items() if deadline <= now]
+        for key in expired:
+            self._roll_back(key, f"was not confirmed within {OPTIMISTIC_TIMEOUT:.0f} s")
+        self._schedule_overlay_expiry()
+        if expired and self._update_listener is not None:
+            self._update_listener(self._publish(), {self.tier_of(key) for key in expired})
+
+    async def _isolate_unsupported(self, block: ReadBlock) -> bool:
+        """Find the registers of a block that the device reported as an illegal data address.
+
+        A block holding several registers is read again one register at a time; if all of them
+        can be read the undefined registers in its gaps are the illegal ones. Returns False if a
+        register could not be read for another reason.
+        """
+        table, address, count = block
+        spans = sorted({
+            span for span in self.register_map.spans() + IDENTITY_MAP.spans()
+            if span[0] == table and address <= span[1] and span[1] + span[2] <= address + count
+        })
+        if len(spans) <= 1:
+            self._mark_unsupported(table, range(address, address + count))
+            return True
+        unsupported = len(self._unsupported)
+        results = [await self._read_block(ReadBlock(*span)) for span in spans]
+        if len(self._unsupported) == unsupported and all(results):
+            covered = {word for _, start, n in spans for word in range(start, start + n)}
+            self._mark_unsupported(table, [word for word in range(address, address + count) if word not in covered])
+        return all(results)
+
+    def _mark_unsupported(self, table: str, words: Iterable[int]) -> None:
+        """Leave register words the device does not implement out of every read plan."""
+        words = sorted(words)
+        if not words:
+            return
+        _LOGGER.warning(
+            "%s does not implement %s registers %s (illegal data address); they are no longer polled",
+            self.name, table, ", ".join(str(word) for word in words),
+        )
+        if not self._unsupported:
+            self._unsupported_since = time.time()
+        self._unsupported.update((table, word) for word in words)
+        self._plan_dirty = True
+        self._store.async_delay_save(self._unsupported_data, UNSUPPORTED_SAVE_DELAY)
+
+    def _unsupported_data(self) -> Dict[str, Any]:
+        """Return the unsupported register list as stored."""
+        return {
+            "sw_version": self._unsupported_sw,
+            "since": self._unsupported_since,
+            **{table: sorted(a for t, a in self._unsupported if t == table) for table in TABLES},
+        }
+
+    async def _async_load_unsupported(self) -> None:
+        """Load the unsupported registers found in earlier runs."""
+        self._unsupported_loaded = True
         try:
-            ha_hub = self._get_ha_modbus_hub()
-            if ha_hub and hasattr(ha_hub, "async_pb_call"):
-                # Write True
-                await ha_hub.async_pb_call(self.unit, coil_addr, True, "write_coil")
-                # Wait
-                await self.hass.async_add_executor_job(self._sleep_ms, pulse_ms)
-                # Write False
-                await ha_hub.async_pb_call(self.unit, coil_addr, False, "write_coil")
-                return
-
-            if not self.host:
-                _LOGGER.error("No host configured for pymodbus fallback")
-                return
-            await self.hass.async_add_executor_job(_pymodbus_pulse_coil, self.host, self.port, self.unit, int(coil_addr), int(pulse_ms))
+            stored = await self._store.async_load()
         except Exception:
-            _LOGGER.exception("Error pulsing coil %s", coil_addr)
+            _LOGGER.exception("Cannot load unsupported registers of %s", self.name)
+            stored = None
+        if not stored:
+            return
+        self._unsupported = {(table, int(a)) for table in TABLES for a in stored.get(table, [])}
+        self._unsupported_sw = stored.get("sw_version")
+        self._unsupported_since = stored.get("since")
+        self._plan_dirty = True
+        if self._unsupported:
+            _LOGGER.debug("Not polling %d registers %s does not implement", len(self._unsupported), self.name)
 
-    def get_cached(self, address: int) -> Any:
-        """Return cached value for a register, or None."""
-        return self._cache.get(int(address))
+    def _check_unsupported(self) -> None:
+        """Drop the unsupported registers when the SW version changed or the list got old."""
+        sw_version = self._get_sw_version()
+        reason = None
+        if sw_version and self._unsupported_sw and sw_version != self._unsupported_sw:
+            reason = f"SW version changed from {self._unsupported_sw} to {sw_version}"
+        elif self._unsupported_since and time.time() - self._unsupported_since > UNSUPPORTED_REPROBE_INTERVAL:
+            reason = "list is due for a re-probe"
+        if sw_version and sw_version != self._unsupported_sw:
+            self._unsupported_sw = sw_version
+            self._store.async_delay_save(self._unsupported_data, UNSUPPORTED_SAVE_DELAY)
+        if reason is None or not self._unsupported:
+            return
+        _LOGGER.info("Probing %d unsupported registers of %s again (%s)", len(self._unsupported), self.name, reason)
+        self._unsupported.clear()
+        self._unsupported_since = None
+        self._plan_dirty = True
+        self._store.async_delay_save(self._unsupported_data, UNSUPPORTED_SAVE_DELAY)
 
-    @staticmethod
-    def _sleep_ms(ms: int) -> None:
-        import time
-        time.sleep(ms / 1000.0)
+    def _adapt_interval(self, cycle_time: float, failed: int) -> None:
+        """Pick the next poll interval from this poll's duration, failures and change rate."""
+        interval = self.poll_interval.total_seconds()
+        change_ratio = self._changed_words / self._read_words if self._read_words else 0.0
+        if failed or cycle_time > interval * POLL_SLOW_CYCLE_RATIO:
+            interval *= POLL_BACKOFF_FACTOR
+        elif change_ratio >= POLL_FAST_CHANGE_RATIO:
+            interval *= POLL_SPEEDUP_FACTOR
+        else:
+            interval += (self._base_interval - interval) * POLL_RELAX_FACTOR
+            if abs(interval - self._base_interval) < 0.1:
+                # the steps shrink below the 0.1 s rounding; settle on the configured interval
+                interval = self._base_interval
+        # never poll faster than the device can answer
+        floor = max(self._min_interval, min(cycle_time / POLL_SLOW_CYCLE_RATIO, self._max_interval))
+        interval = round(min(max(interval, floor), self._max_interval), 1)
+        if interval != self.poll_interval.total_seconds():
+            _LOGGER.debug(
+                "Poll interval for %s: %.1f s (poll took %.2f s, %d failed blocks, %.0f%% words changed)",
+                self.name, interval, cycle_time, failed, change_ratio * 100,
+            )
+        self.poll_interval = timedelta(seconds=interval)
+        self.diagnostics["poll_interval"] = interval
 
+    async def _async_select_map(self) -> None:
+        """Read the identity registers and select the register map for the decoded model.
 
-# -------------------------
-# pymodbus helper functions (blocking; run in executor)
-# -------------------------
-def _pymodbus_read_best_effort(host: str, port: int, unit: int, address: int):
-    """Try reading as input, then holding, return first successful integer register."""
-    try:
-        from pymodbus.client.sync import ModbusTcpClient
-    except Exception:
-        _LOGGER.exception("pymodbus not available")
-        return None
-    client = ModbusTcpClient(host=host, port=port)
-    try:
-        if not client.connect():
-            _LOGGER.debug("Cannot connect to pymodbus %s:%s", host, port)
-            return None
-        # try input registers
-        rr = client.read_input_registers(address, count=1, unit=unit)
-        if rr and (not hasattr(rr, "isError") or not rr.isError()):
-            if hasattr(rr, "registers"):
-                return rr.registers[0]
-            if isinstance(rr, (list, tuple)):
-                return rr[0]
-        # try holding registers
-        rr = client.read_holding_registers(address, count=1, unit=unit)
-        if rr and (not hasattr(rr, "isError") or not rr.isError()):
-            if hasattr(rr, "registers"):
-                return rr.registers[0]
-            if isinstance(rr, (list, tuple)):
-                return rr[0]
-        return None
-    except Exception:
-        _LOGGER.exception("pymodbus read error at %s", address)
-        return None
-    finally:
+        If the model cannot be read yet, the default map is used and selection is retried
+        once the model string becomes available.
+        """
+        if not self._get_model_name():
+            for block in IDENTITY_MAP.plan_for(IDENTITY_MAP.spans(), self._unsupported):
+                await self._read_block(block)
+            self._decode()
+        model = self._get_model_name()
+        register_map = await self.hass.async_add_executor_job(select_register_map, model)
+        if self._map is not None and register_map is not self._map:
+            _LOGGER.warning(
+                "Device %s reports model %s; switching register map to %s (reload the integration to update entities)",
+                self.name, model, register_map.name,
+            )
+        self._map = register_map
+        self._map_model = model
+        self._plan_dirty = True
+        _LOGGER.debug("Using register map %s for model %s", register_map.name, model)
+
+    def is_fresh(self, keys: Iterable[tuple[str, int]]) -> bool:
+        """Return True if every register word behind keys was read within the staleness limit.
+
+        A word is stale once it was not read by the last STALE_AFTER_POLLS polls due to read its
+        tier and is older than STALE_MIN_AGE seconds, so values of blocks that keep failing are
+        not shown as current. Counting the tier's polls rather than multiplying the adaptive
+        interval keeps the limit right after the interval shortened since the tier was read.
+        """
+        now = time.monotonic()
+        for table, address in keys:
+            polls = self._tier_polls[self.tier_of((table, address))]
+            since = polls[0] if len(polls) == STALE_AFTER_POLLS else None
+            meta = self.register_map.get(table, address) or IDENTITY_MAP.get(table, address)
+            count = register_count(meta) if meta else 1
+            read_time = self._read_time[table]
+            for word in range(address, address + count):
+                read = read_time.get(word)
+                if read is None or (since is not None and read < since and now - read > STALE_MIN_AGE):
+                    return False
+        return True
+
+    def register_demand(self, keys: Iterable[tuple[str, int]]) -> Callable[[], None]:
+        """Register (table, address) keys an entity reads; returns a callback that removes them.
+
+        Entities call this when they are added to hass, so the read plan only covers
+        registers behind enabled entities. Disabled entities are never added. The tiers of
+        keys without a value yet are read in the next poll.
+        """
+        keys = list(keys)
+        self._demand.update(keys)
+        self._forced_tiers.update(self.tier_of(key) for key in keys if key not in self._data)
+        self._plan_dirty = True
+
+        def _remove() -> None:
+            self._demand.subtract(keys)
+            self._demand += Counter()  # drop keys whose count reached zero
+            self._plan_dirty = True
+
+        return _remove
+
+    def _build_plan(self) -> None:
+        """Rebuild the block read plan from the registers entities currently need.
+
+        Until any entity registered demand (first refresh during setup) the whole map is
+        read so entities start with values. Identity registers are always read so device
+        info stays current, except on the first poll for those seeded from the config entry.
+        """
+        register_map = self.register_map
+        spans = register_map.spans(self._demand) if self._demand else register_map.spans()
+        spans = [s for s in spans + IDENTITY_MAP.spans() if (s[0], s[1]) not in self._seeded]
+        self._plan_spans = spans
+        self._plan = register_map.plan_for(spans, self._unsupported)
+        self._trigger_plan = register_map.plan_for(
+            [s for s in spans if self.tier_of((s[0], s[1])) == TIER_TRIGGER], self._unsupported
+        )
+        self._tier_plans.clear()
+        self._rotation.clear()
+        self._plan_dirty = False
+        _LOGGER.debug("Read plan for %s (%d registers demanded): %s", self.name, len(self._demand), self._plan)
+
+    def _tier_plan(self, tiers: frozenset[str]) -> tuple[list[ReadBlock], list[ReadBlock]]:
+        """Return the priority and rotating blocks reading the planned registers of tiers."""
+        plan = self._tier_plans.get(tiers)
+        if plan is None:
+            register_map = self.register_map
+            spans = [s for s in self._plan_spans if self.tier_of((s[0], s[1])) in tiers]
+            blocks = register_map.plan_for(spans, self._unsupported)
+            priority = [block for block in blocks if _has_priority(register_map, block)]
+            plan = self._tier_plans[tiers] = (priority, [block for block in blocks if block not in priority])
+            _LOGGER.debug("Read plan for %s tiers %s: %s", self.name, ", ".join(sorted(tiers)), blocks)
+        return plan
+
+    def _decode(self, blocks: Iterable[ReadBlock] | None = None) -> None:
+        """Decode the raw cache of every table (or only the definitions inside blocks) and refresh derived values."""
+        blocks = None if blocks is None else list(blocks)
+        for register_map in (IDENTITY_MAP, self._map):
+            if register_map is None:
+                continue
+            for table in TABLES:
+                entries = register_map.decode_table[table]
+                if blocks is not None:
+                    entries = [entry for entry in entries if _in_blocks(blocks, table, entry[0], entry[1])]
+                values = decode_registers(self._cache[table], entries, self._enum_options)
+                for address, value in values.items():
+                    meta = register_map.get(table, address)
+                    if meta.get("monotonic"):
+                        # a counter is only checked again once its words were read again, so
+                        # decoding between reads never confirms a held back value
+                        read = min(self._read_time[table].get(word, 0.0) for word in range(address, address + register_count(meta)))
+                        if (table, address) in self._data and self._counter_read.get((table, address)) == read:
+                            continue
+                        self._counter_read[(table, address)] = read
+                        value = self._accept_counter((table, address), meta, value)
+                    self._data[(table, address)] = value
+        self._update_derived()
+
+    def _check_triggers(self) -> bool:
+        """Fire EVENT_TRIGGER for trigger registers whose value changed between zero and non-zero.
+
+        Returns True if any trigger value changed. The first value read never fires an event.
+        """
+        changed = False
+        for table in TABLES:
+            for address, meta in self.register_map.definitions[table].items():
+                if not meta.get("trigger"):
+                    continue
+                key = (table, address)
+                value = self._data.get(key)
+                previous = self._trigger_values.get(key)
+                if value == previous:
+                    continue
+                changed = True
+                self._trigger_values[key] = value
+                if value is None or previous is None or bool(value) == bool(previous):
+                    continue
+                edge = EDGE_RISING if value else EDGE_FALLING
+                _LOGGER.debug("%s %s %s trigger %s: %s -> %s", self.name, edge, table, address, previous, value)
+                self.hass.bus.async_fire(
+                    EVENT_TRIGGER,
+                    {
+                        "device": self.name,
+                        "unit": self.unit,
+                        "register": address,
+                        "name": meta["name"],
+                        "edge": edge,
+                        "value": value,
+                        "previous": previous,
+                    },
+                )
+        return changed
+
+    def _schedule_trigger_poll(self) -> None:
+        """Schedule the next trigger poll unless one is pending or there is nothing to read."""
+        if self._trigger_interval > 0 and self._trigger_cancel is None and self._trigger_plan:
+            self._trigger_cancel = async_call_later(self.hass, self._trigger_interval, self._async_trigger_poll)
+
+    async def _async_trigger_poll(self, _now) -> None:
+        """Read the trigger registers and publish them when a trigger changed."""
+        self._trigger_cancel = None
         try:
-            client.close()
+            if self._plan_dirty:
+                self._build_plan()
+            for block in self._trigger_plan:
+                await self._read_block(block)
+            self._decode(self._trigger_plan)
+            if self._check_triggers() and self._update_listener is not None:
+                self._update_listener(self._publish(), {TIER_TRIGGER})
         except Exception:
-            pass
-
-
-def _pymodbus_write_register(host: str, port: int, unit: int, address: int, value: int) -> bool:
-    try:
-        from pymodbus.client.sync import ModbusTcpClient
-    except Exception:
-        _LOGGER.exception("pymodbus not available")
-        return False
-    client = ModbusTcpClient(host=host, port=port)
-    try:
-        if not client.connect():
-            _LOGGER.debug("Cannot connect to pymodbus %s:%s", host, port)
+            _LOGGER.exception("Error in trigger poll")
+        self._schedule_trigger_poll()
+
+    def _accept_counter(self, key: Any, meta: Dict[str, Any], value: Any) -> Any:
+        """Return the counter value to publish for a monotonic register.
+
+        A counter may only grow by what "max_rate" (units per hour) allows since the
+        last accepted value. Decreases (resets) and larger jumps are held back until the
+        next read confirms them, so a single bad read never reaches statistics.
+        """
+        now = time.monotonic()
+        published = self._data.get(key)
+        elapsed = now - self._counter_time.get(key, now)
+        max_step = float(meta.get("max_rate", 0)) * elapsed / 3600 + 1
+
+        if published is None or published <= value <= published + max_step:
+            self._counter_pending.pop(key, None)
+            self._counter_time[key] = now
+            return value
+
+        pending = self._counter_pending.get(key)
+        if pending is not None and pending <= value <= pending + max_step:
+            _LOGGER.info("Counter %s changed from %s to %s (confirmed by consecutive reads)", key, published, value)
+            self._counter_pending.pop(key, None)
+            self._counter_time[key] = now
+            return value
+
+        _LOGGER.warning("Holding back implausible counter %s change %s -> %s until the next read confirms it", key, published, value)
+        self._counter_pending[key] = value
+        return published
+
+    def _update_derived(self) -> None:
+        """Recompute derived values whose input registers changed since the last poll."""
+        for key, meta in DERIVED_SENSORS.items():
+            values = {r: self._data.get((TABLE_INPUT, r)) for r in meta["inputs"]}
+            inputs = tuple(values.values())
+            if key in self._derived_inputs and self._derived_inputs[key] == inputs:
+                continue
+            self._derived_inputs[key] = inputs
+            if any(v is None for v in inputs):
+                self._data[key] = None
+                continue
+            try:
+                self._data[key] = _compute_derived(key, values)
+            except Exception:
+                _LOGGER.exception("Error computing derived value %s", key)
+                self._data[key] = None
+            _LOGGER.debug("Derived %s = %s", key, self._data[key])
+
+    async def _async_io(self, operation: str, *args: Any, paths: Iterable[str] | None = None) -> Any:
+        """Run a transport operation on the healthiest path, failing over to the other paths.
+
+        Reads are occasionally sent to an inactive path first (every PATH_REPROBE_INTERVAL)
+        so a recovered path is noticed. paths limits the paths tried. Returns the first
+        successful result, or None.
+        """
+        return (await self._async_io_path(operation, *args, paths=paths))[1]
+
+    async def _async_io_path(self, operation: str, *args: Any, paths: Iterable[str] | None = None) -> tuple[str | None, Any]:
+        """Run a transport operation like _async_io; return the path that succeeded and the result."""
+        order = self._path_order(probe=operation == "read_registers")
+        if paths is not None:
+            order = [path for path in order if path in paths]
+        for path in order:
+            start = time.monotonic()
+            error = None
+            try:
+                result = await getattr(self._transports[path], operation)(*args)
+            except ModbusError as ex:
+                # the device answered; another path would get the same exception response
+                duration = time.monotonic() - start
+                self._health[path].record(True, duration)
+                if self._capture is not None:
+                    self._capture.record(path, self.unit, operation, args, None, duration, exception=ex)
+                raise
+            except Exception as ex:
+                _LOGGER.debug("%s via %s failed for %s: %s", operation, path, args[:2], ex)
+                result = None
+                error = str(ex) or type(ex).__name__
+            duration = time.monotonic() - start
+            ok = result is not None and result is not False
+            self._health[path].record(ok, duration)
+            if self._capture is not None:
+                self._capture.record(path, self.unit, operation, args, result, duration, error)
+            self._select_active_path()
+            if ok:
+                return path, result
+        return None, None
+
+    def _io_depth(self) -> int:
+        """Return how many requests the active path handles concurrently."""
+        transport = self._transports.get(self._active_path) if self._active_path else None
+        return transport.max_in_flight if transport is not None else 1
+
+    def _path_order(self, probe: bool = False) -> list[str]:
+        """Return the usable paths, healthiest first (an inactive path due for a re-probe first)."""
+        paths = [path for path, transport in self._transports.items() if transport.available()]
+        paths.sort(key=lambda path: self._health[path].score, reverse=True)
+        if probe:
+            now = time.monotonic()
+            for path in paths[1:]:
+                if now - self._health[path].last_used >= PATH_REPROBE_INTERVAL:
+                    paths.remove(path)
+                    paths.insert(0, path)
+                    _LOGGER.debug("Re-probing %s path of %s", path, self.name)
+                    break
+        if not paths:
+            _LOGGER.debug("No Modbus path available for %s", self.name)
+        return paths
+
+    def _select_active_path(self) -> None:
+        """Make the healthiest usable path the active one and publish path health."""
+        paths = [path for path, transport in self._transports.items() if transport.available()]
+        active = max(paths, key=lambda path: self._health[path].score, default=None)
+        if active != self._active_path:
+            if self._active_path is not None:
+                _LOGGER.info("Switching %s from the %s path to the %s path", self.name, self._active_path, active)
+            self._active_path = active
+        self.diagnostics["active_path"] = active
+        self.diagnostics["path_health"] = {path: health.as_dict() for path, health in self._health.items()}
+
+    async def _read_registers(self, address: int, count: int = 1, table: str = TABLE_INPUT) -> list[int] | None:
+        """Read consecutive registers in a single request on the active path.
+
+        Returns the words only when exactly count registers were returned. Raises ModbusError
+        when the device answers with an exception response.
+        """
+        return await self._async_io("read_registers", table, int(address), int(count))
+
+    async def write_holding(self, address: int, value: int) -> bool:
+        """Write a single holding register on the active path and read back its block."""
+        return await self._write_limited(int(address), [int(value) & 0xFFFF])
+
+    async def read_registers(self, table: str, address: int, count: int) -> list[int] | None:
+        """Read count raw registers of a table in a single request (no decoding, not cached).
+
+        Raises ModbusError when the device answers with an exception response.
+        """
+        return await self._read_registers(int(address), int(count), table)
+
+    async def write_registers(self, address: int, values: list[int], defer: bool = True) -> bool:
+        """Write consecutive holding registers in a single request (FC16) and read back their block.
+
+        With defer=False a write the rate limit holds back raises WriteThrottled instead of
+        being written later.
+        """
+        return await self._write_limited(int(address), [int(v) & 0xFFFF for v in values], defer)
+
+    async def _write_limited(self, address: int, words: list[int], defer: bool = True) -> bool:
+        """Write holding registers now if every written word has a token, else later.
+
+        A throttled value is shown from the overlay and written once its words have tokens
+        again; newer values for the same words written meanwhile replace it, so the newest
+        value always reaches the device. Returns True for a throttled value (it is not written
+        yet) unless defer is False, which raises WriteThrottled and keeps nothing.
+        """
+        span = range(address, address + len(words))
+        if not any(word in self._throttled_words for word in span) and self._tokens_available(address, len(words)):
+            for word in span:
+                self._write_bucket(word).take()
+            return await self._apply_write(address, words)
+
+        delay = max(self._write_bucket(word).delay() for word in span)
+        if not defer:
+            raise WriteThrottled(address, len(words), delay)
+        self.diagnostics["writes_throttled"] += 1
+        replaced = {word: self._throttled_words[word] for word in span if word in self._throttled_words}
+        self._throttled_words.update(zip(span, words))
+        self._set_optimistic(address, words, confirm=False)
+        if replaced:
+            _LOGGER.debug("Throttled write %s to holding registers %s replaced by %s", replaced, list(span), words)
+        else:
+            _LOGGER.info(
+                "Throttling writes to holding registers %s-%s of %s; writing the newest value in %.0f s",
+                address, span[-1], self.name, delay,
+            )
+        self._schedule_throttled_write()
+        return True
+
+    def _write_bucket(self, word: int) -> TokenBucket:
+        """Return the write token bucket of a holding register word."""
+        bucket = self._write_buckets.get(word)
+        if bucket is None:
+            bucket = self._write_buckets[word] = TokenBucket(WRITE_RATE_BURST, WRITE_RATE_INTERVAL)
+        return bucket
+
+    def _tokens_available(self, address: int, count: int) -> bool:
+        """Return True if every word of a write has a token."""
+        return all(self._write_bucket(word).available() for word in range(address, address + count))
+
+    def _throttled_runs(self) -> list[tuple[int, list[int]]]:
+        """Return the throttled words as (address, words) runs of consecutive registers."""
+        runs: list[tuple[int, list[int]]] = []
+        for word in sorted(self._throttled_words):
+            if runs and runs[-1][0] + len(runs[-1][1]) == word:
+                runs[-1][1].append(self._throttled_words[word])
+            else:
+                runs.append((word, [self._throttled_words[word]]))
+        return runs
+
+    def _schedule_throttled_write(self) -> None:
+        """Run the throttled write when the first run of throttled words has tokens again."""
+        if self._throttled_cancel is not None:
+            self._throttled_cancel()
+            self._throttled_cancel = None
+        runs = self._throttled_runs()
+        if not runs:
+            return
+        delay = min(
+            max(self._write_bucket(word).delay() for word in range(address, address + len(words)))
+            for address, words in runs
+        )
+
+        @callback
+        def _write(_now) -> None:
+            self._throttled_cancel = None
+            self.hass.async_create_task(self._async_write_throttled())
+
+        self._throttled_cancel = async_call_later(self.hass, delay, _write)
+
+    async def _async_write_throttled(self, force: bool = False) -> None:
+        """Write the runs of throttled words that have tokens (all of them if force)."""
+        while True:
+            run = next(
+                (run for run in self._throttled_runs() if force or self._tokens_available(run[0], len(run[1]))),
+                None,
+            )
+            if run is None:
+                break
+            address, words = run
+            for word in range(address, address + len(words)):
+                self._write_bucket(word).take()
+                del self._throttled_words[word]
+            try:
+                await self._apply_write(address, words)
+            except Exception:
+                _LOGGER.exception("Error writing throttled values to holding registers %s-%s", address, address + len(words) - 1)
+        self._schedule_throttled_write()
+
+    async def _apply_write(self, address: int, words: list[int]) -> bool:
+        """Write holding registers, counting the writes that reached the device."""
+        if not await self._write_read_back(address, words):
             return False
-        rr = client.write_register(address, int(value), unit=unit)
-        if rr and (not hasattr(rr, "isError") or not rr.isError()):
-            return True
-        return False
-    except Exception:
-        _LOGGER.exception("pymodbus write error at %s", address)
-        return False
-    finally:
-        try:
-            client.close()
-        except Exception:
-            pass
-
-
-def _pymodbus_pulse_coil(host: str, port: int, unit: int, coil_addr: int, ms: int) -> None:
-    try:
-        from pymodbus.client.sync import ModbusTcpClient
-    except Exception:
-        _LOGGER.exception("pymodbus not available")
-        return False
-    import time
-    client = ModbusTcpClient(host=host, port=port)
-    try:
-        if not client.connect():
-            _LOGGER.debug("Cannot connect to pymodbus %s:%s", host, port)
+        self.diagnostics["writes_applied"] += 1
+        return True
+
+    def _is_throttled(self, word: int) -> bool:
+        """Return True if a holding register word has a throttled value waiting to be written."""
+        return word in self._throttled_words
+
+    async def _write_read_back(self, address: int, words: list[int]) -> bool:
+        """Write holding registers and read back the read plan block holding them.
+
+        The values are published from the overlay before the write is sent and confirmed or
+        rolled back by the read. Paths whose endpoint supports read/write multiple registers
+        (FC23) write and read in one transaction. Otherwise the registers are written (FC6/FC16)
+        and the block is read after. A path whose endpoint answers FC23 with an illegal function
+        exception, or leaves READ_WRITE_MAX_MISSES FC23 requests in a row unanswered while plain
+        writes on it succeed, is not sent FC23 again.
+        """
+        self._set_optimistic(address, words)
+        block = self._read_back_block(address, len(words))
+        last = address + len(words) - 1
+        paths = [path for path, transport in self._transports.items() if transport.supports_read_write()]
+        if len(words) > MAX_READ_WRITE_COUNT:
+            paths = []
+        result = None
+        missed = []
+        for path in paths:
+            try:
+                result = await self._async_io("read_write_registers", block.address, block.count, address, words, paths=[path])
+            except ModbusError as ex:
+                if ex.code != MODBUS_ILLEGAL_FUNCTION:
+                    _LOGGER.error("Writing holding registers %s-%s failed: %s", address, last, ex)
+                    self._discard_optimistic(address, words)
+                    return False
+                self._set_read_write_support(path, False, str(ex))
+                continue
+            if result is not None:
+                self._read_write_misses.pop(path, None)
+                self._set_read_write_support(path, True)
+                break
+            missed.append(path)
+        if result is not None:
+            self._store_words(TABLE_HOLDING, block.address, result)
+        else:
+            operation, args = ("write_register", words[0]) if len(words) == 1 else ("write_registers", words)
+            path, written = await self._async_io_path(operation, address, args)
+            if not written:
+                _LOGGER.error("Writing holding registers %s-%s failed", address, last)
+                self._discard_optimistic(address, words)
+                return False
+            if path in missed:
+                # the device took a plain write on the path that did not answer FC23
+                misses = self._read_write_misses[path] = self._read_write_misses.get(path, 0) + 1
+                if misses >= READ_WRITE_MAX_MISSES:
+                    self._set_read_write_support(path, False, f"no response to {misses} requests in a row")
+            await self._read_block(block)
+        # only the read-back block: blocks a running poll has read so far are published with it
+        self._decode([block])
+        if self._update_listener is not None:
+            self._update_listener(self._publish(), self._block_tiers(block))
+        self._start_burst([(TABLE_HOLDING, address)])
+        return True
+
+    def _read_back_block(self, address: int, count: int) -> ReadBlock:
+        """Return the holding block of the read plan covering written registers, or just them."""
+        for block in self._plan:
+            if block.table == TABLE_HOLDING and block.address <= address and address + count <= block.address + block.count:
+                return block
+        return ReadBlock(TABLE_HOLDING, address, count)
+
+    def _block_tiers(self, block: ReadBlock) -> set[str]:
+        """Return the tiers of the registers a block covers."""
+        return {
+            self.tier_of((block.table, word)) for word in range(block.address, block.address + block.count)
+            if self.register_map.get(block.table, word) is not None
+        }
+
+    def _set_read_write_support(self, path: str, supported: bool, reason: str = "") -> None:
+        """Remember whether the endpoint of a path supports read/write multiple registers (FC23)."""
+        transport = self._transports[path]
+        if not supported:
+            self._read_write_misses.pop(path, None)
+            if transport.supports_read_write():
+                _LOGGER.info(
+                    "%s does not support read/write multiple registers via %s (%s); writing and reading separately",
+                    transport.endpoint, path, reason,
+                )
+        transport.set_read_write_support(supported)
+
+    async def write_coil_pulse(self, coil_addr: int, pulse_ms: int = 500) -> bool:
+        """Pulse a coil: write True now and schedule the False write on the event loop.
+
+        No thread or connection is held during the pulse, so pulses on several coils
+        and units can run concurrently. Pulsing a coil that is still on restarts its timer.
+        """
+        coil_addr = int(coil_addr)
+        if not await self._write_coil(coil_addr, True):
             return False
-        client.write_coil(coil_addr, True, unit=unit)
-        time.sleep(ms / 1000.0)
-        client.write_coil(coil_addr, False, unit=unit)
+
+        cancel = self._pending_releases.pop(coil_addr, None)
+        if cancel is not None:
+            cancel()
+
+        @callback
+        def _release(_now) -> None:
+            self._pending_releases.pop(coil_addr, None)
+            self.hass.async_create_task(self._async_release_coil(coil_addr))
+
+        self._pending_releases[coil_addr] = async_call_later(self.hass, pulse_ms / 1000.0, _release)
         return True
-    except Exception:
-        _LOGGER.exception("pymodbus coil error at %s", coil_addr)
-        return False
-    finally:
+
+    async def _async_release_coil(self, coil_addr: int) -> None:
+        """Write False to a pulsed coil, retrying once so it is never left on."""
+        if await self._write_coil(coil_addr, False):
+            return
+        _LOGGER.warning("Releasing coil %s failed, retrying", coil_addr)
+        if not await self._write_coil(coil_addr, False):
+            _LOGGER.error("Coil %s could not be released and may still be on", coil_addr)
+
+    async def async_shutdown(self) -> None:
+        """Write throttled values, stop timers and event listeners, release coils of pulses still in progress, write the capture and close connections (called on unload / stop)."""
+        if self._throttled_cancel is not None:
+            self._throttled_cancel()
+            self._throttled_cancel = None
+        await self._async_write_throttled(force=True)
+        if self._burst_cancel is not None:
+            self._burst_cancel()
+            self._burst_cancel = None
+        if self._overlay_cancel is not None:
+            self._overlay_cancel()
+            self._overlay_cancel = None
+        self._trigger_interval = 0
+        if self._trigger_cancel is not None:
+            self._trigger_cancel()
+            self._trigger_cancel = None
+        if self._unsub_modbus_events is not None:
+            self._unsub_modbus_events()
+            self._unsub_modbus_events = None
+        pending = list(self._pending_releases.items())
+        self._pending_releases.clear()
+        for coil_addr, cancel in pending:
+            cancel()
+            await self._async_release_coil(coil_addr)
+        if self._capture is not None:
+            await self._capture.async_flush()
+        for transport in self._transports.values():
+            transport.close()
+
+    async def _write_coil(self, coil_addr: int, value: bool) -> bool:
+        """Write a single coil on the active path."""
+        if not await self._async_io("write_coil", int(coil_addr), bool(value)):
+            _LOGGER.error("Writing coil %s failed", coil_addr)
+            return False
+        return True
+
+    async def write_value(self, address: int, value: Any) -> bool:
+        """Encode a value using the holding register definition and write it."""
+        meta = self.register_map.get(TABLE_HOLDING, address)
+        if meta is None:
+            _LOGGER.error("Holding register %s is not defined", address)
+            return False
         try:
-            client.close()
+            words = encode_value(value, meta, self._enum_options)
+        except ValueError as ex:
+            _LOGGER.error("Cannot write %s to holding register %s: %s", value, address, ex)
+            return False
+        if len(words) != 1:
+            return await self.write_registers(address, words)
+        return await self.write_holding(address, words[0])
+
+    def _set_optimistic(self, address: int, value: int | list[int], confirm: bool = True) -> None:
+        """Put written holding values in the overlay and publish them before they are read back.
+
+        The raw cache keeps the values read from the device; the overlay entries are dropped
+        when a read confirms them, or rolled back OPTIMISTIC_TIMEOUT seconds after the write
+        otherwise. confirm=False keeps them without a deadline (throttled writes).
+        """
+        values = value if isinstance(value, list) else [value]
+        written = {int(address) + offset: int(word) & 0xFFFF for offset, word in enumerate(values)}
+        words = {**self._cache[TABLE_HOLDING], **written}
+        entries = [
+            entry for entry in self.register_map.decode_table[TABLE_HOLDING]
+            if any(entry[0] <= word < entry[0] + entry[1] for word in written)
+        ]
+        tiers = set()
+        for start, value in decode_registers(words, entries, self._enum_options).items():
+            key = (TABLE_HOLDING, start)
+            self._overlay[key] = value
+            if confirm:
+                self._overlay_deadline[key] = time.monotonic() + OPTIMISTIC_TIMEOUT
+            else:
+                self._overlay_deadline.pop(key, None)
+            tiers.add(self.tier_of(key))
+            for word in range(start, start + register_count(self.register_map.get(TABLE_HOLDING, start))):
+                self._overlay_words[word] = key
+        # words no map entry decodes are never reconciled, so they get no overlay entry
+        self._overlay_raw.update((word, raw) for word, raw in written.items() if word in self._overlay_words)
+        self._schedule_overlay_expiry()
+        if self._update_listener is not None:
+            self._update_listener(self._publish(), tiers)
+
+    def _discard_optimistic(self, address: int, words: list[int]) -> None:
+        """Drop the optimistic values of a write that failed and publish the data."""
+        keys = {self._overlay_words[word] for word in range(address, address + len(words)) if word in self._overlay_words}
+        for key in keys:
+            self._drop_overlay(key)
+        self._schedule_overlay_expiry()
+        if keys and self._update_listener is not None:
+            self._update_listener(self._publish(), {self.tier_of(key) for key in keys})
+
+    def set_update_listener(self, listener: Callable[[Snapshot, Iterable[str]], None] | None) -> None:
+        """Set the callback receiving the data and the tiers read after reads outside the regular poll."""
+        self._update_listener = listener
+
+    def _start_burst(self, keys: Iterable[tuple[str, int]]) -> None:
+        """Poll keys and the map's burst registers every BURST_INTERVAL for the burst window.
+
+        A write during a running burst adds its keys and restarts the window.
+        """
+        if self._burst_window <= 0:
+            return
+        self._burst_keys.update(keys)
+        self._burst_until = time.monotonic() + self._burst_window
+        if self._burst_cancel is None:
+            self._burst_cancel = async_call_later(self.hass, BURST_INTERVAL, self._async_burst_poll)
+
+    def _burst_read_keys(self) -> set[tuple[str, int]]:
+        """Return the keys a burst poll reads: written keys plus burst registers entities read."""
+        keys = set(self._burst_keys)
+        for table in TABLES:
+            for address, meta in self.register_map.definitions[table].items():
+                if meta.get("burst") and (not self._demand or self._demand[(table, address)]):
+                    keys.add((table, address))
+        return keys
+
+    async def _async_burst_poll(self, _now) -> None:
+        """Read the burst plan, publish the data and reschedule until the window ends."""
+        self._burst_cancel = None
+        try:
+            register_map = self.register_map
+            keys = self._burst_read_keys()
+            blocks = register_map.plan_for(register_map.spans(keys), self._unsupported)
+            for block in blocks:
+                await self._read_block(block)
+            self._decode(blocks)
+            if self._update_listener is not None:
+                self._update_listener(self._publish(), {self.tier_of(key) for key in keys})
         except Exception:
-            pass
+            _LOGGER.exception("Error in burst poll")
+        if time.monotonic() < self._burst_until:
+            self._burst_cancel = async_call_later(self.hass, BURST_INTERVAL, self._async_burst_poll)
+        else:
+            self._burst_keys.clear()
+            _LOGGER.debug("Burst polling for %s ended", self.name)
+
+    def mode_code(self, label: Any) -> int | None:
+        """Return the operation mode code for a decoded mode label."""
+        for code, mode_label in self._hvac_map.items():
+            if mode_label == label:
+                return int(code)
+        try:
+            return int(label)
+        except (TypeError, ValueError):
+            return None
+
+    def get_cached(self, address: int, table: str = TABLE_INPUT) -> Any:
+        """Return the cached raw word for a register, or None."""
+        return self._cache[table].get(int(address))
+
+
+@callback
+def _is_modbus_reload(event: Event | Dict[str, Any]) -> bool:
+    """Event filter: True for calls of the modbus reload, restart and stop services.
+
+    Older Home Assistant versions pass the event to filters, newer ones its data.
+    """
+    data = getattr(event, "data", event)
+    return data.get(ATTR_DOMAIN) == MODBUS_DOMAIN and data.get(ATTR_SERVICE) in MODBUS_RELOAD_SERVICES
+
+
+def _in_blocks(blocks: Iterable[ReadBlock], table: str, address: int, count: int) -> bool:
+    """Return True if count registers of a table from address lie inside one of the blocks."""
+    return any(block.table == table and block.address <= address and address + count <= block.address + block.count for block in blocks)
+
+
+def _has_priority(register_map: RegisterMap, block: ReadBlock) -> bool:
+    """Return True if a block covers a register marked "priority" in the register map."""
+    defs = register_map.definitions.get(block.table, {})
+    return any(defs.get(address, {}).get("priority") for address in range(block.address, block.address + block.count))
+
+
+# -------------------------
+# derived value helpers
+# -------------------------
+def _efficiency(gain: float, span: float) -> float | None:
+    """Return gain/span as a percentage, or None when the temperature span is too small."""
+    if abs(span) < MIN_EFFICIENCY_DELTA_T:
+        return None
+    return round(gain / span * 100.0, 1)
+
+
+def _compute_derived(key: str, v: Dict[int, float]) -> float | None:
+    """Compute a DERIVED_SENSORS value from scaled input registers.
+
+    1101 outdoor, 1102 supply, 1103 extract and 1105 return temperature (°C),
+    1109 supply and 1110 extract flow (m³/h).
+    """
+    if key == "supply_efficiency":
+        return _efficiency(v[1102] - v[1101], v[1103] - v[1101])
+    if key == "extract_efficiency":
+        return _efficiency(v[1103] - v[1105], v[1103] - v[1101])
+    if key == "recovered_heat_power":
+        return round(AIR_HEAT_CAPACITY * v[1109] * (v[1102] - v[1101]), 1)
+    if key == "flow_imbalance":
+        return round(v[1109] - v[1110], 1)
+    if key == "flow_imbalance_ratio":
+        if not v[1110]:
+            return None
+        return round((v[1109] - v[1110]) / v[1110] * 100.0, 1)
+    return None
@@ -0,0 +1,57 @@
+"""Token bucket limiting how often the hub writes a holding register.
+
+Each register word has its own bucket. A write takes a token from the bucket of every word it
+writes; tokens come back one per interval up to the bucket's capacity, so a register can take a
+few writes in a row but no more than one per interval on average.
+"""
+
+from __future__ import annotations
+
+import time
+
+
+class WriteThrottled(Exception):
+    """A write was refused because the registers were written too often."""
+
+    def __init__(self, address: int, count: int, retry_after: float) -> None:
+        super().__init__(
+            f"Holding registers {address}-{address + count - 1} were written too often; "
+            f"try again in {max(1, round(retry_after))} s"
+        )
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Write tokens of one holding register."""
+
+    def __init__(self, capacity: int, interval: float) -> None:
+        self.capacity = max(1, int(capacity))
+        self.interval = float(interval)
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if self.interval > 0:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) / self.interval)
+        else:
+            self.tokens = float(self.capacity)
+        self._updated = now
+
+    def available(self) -> bool:
+        """Return True if a token is available, without taking it."""
+        self._refill()
+        return self.tokens >= 1
+
+    def take(self) -> bool:
+        """Take a token if one is available; return False if the write has to wait."""
+        self._refill()
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+    def delay(self) -> float:
+        """Return the seconds until the next token is available."""
+        self._refill()
+        return max(0.0, (1 - self.tokens) * self.interval)
@@ -0,0 +1,295 @@
+"""Minimal asyncio Modbus TCP client for HA Atrea Recuperation.
+
+- async_read_registers(): one request on its own connection, for many short concurrent
+  probes (e.g. unit discovery in the config flow) without tying up executor threads.
+- PipelinedConnection: one persistent connection per endpoint that keeps up to
+  max_in_flight requests outstanding and matches responses by MBAP transaction ID. It falls
+  back to strict request/response when the gateway mixes up or drops pipelined requests.
+"""
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple
+import asyncio
+import itertools
+import logging
+import struct
+
+from .const import MAX_READ_COUNT, MAX_READ_WRITE_COUNT, TABLE_HOLDING, TABLE_INPUT
+
+_LOGGER = logging.getLogger(__name__)
+
+# Modbus function codes
+FUNCTION_CODES = {TABLE_HOLDING: 3, TABLE_INPUT: 4}
+FC_WRITE_COIL = 5
+FC_WRITE_REGISTER = 6
+FC_WRITE_REGISTERS = 16
+FC_READ_WRITE_REGISTERS = 23
+
+# MBAP header: transaction id, protocol id, length, unit id
+_MBAP = struct.Struct(">HHHB")
+
+_transaction_ids = itertools.count(1)
+
+
+class ModbusError(Exception):
+    """The device answered a request with a Modbus exception response."""
+
+    def __init__(self, function: int, code: int) -> None:
+        super().__init__(f"Modbus exception {code} for function {function}")
+        self.function = function
+        self.code = code
+
+
+def _next_transaction_id() -> int:
+    return next(_transaction_ids) & 0xFFFF
+
+
+def _read_request(table: str, address: int, count: int) -> bytes:
+    if not 1 <= count <= MAX_READ_COUNT:
+        raise ValueError(f"Register count {count} out of range")
+    return struct.pack(">BHH", FUNCTION_CODES[table], address, count)
+
+
+def _check_response(function: int, pdu: bytes) -> None:
+    """Raise ModbusError for an exception response, ValueError for another function."""
+    if pdu and pdu[0] == function | 0x80:
+        raise ModbusError(function, pdu[1] if len(pdu) > 1 else 0)
+    if not pdu or pdu[0] != function:
+        raise ValueError("Malformed response")
+
+
+def _parse_read(function: int, pdu: bytes, count: int) -> list[int]:
+    _check_response(function, pdu)
+    if len(pdu) != 2 + pdu[1] or pdu[1] != count * 2:
+        raise ValueError("Malformed read response")
+    return list(struct.unpack(f">{count}H", pdu[2:]))
+
+
+async def async_read_registers(
+    host: str,
+    port: int,
+    unit: int,
+    table: str,
+    address: int,
+    count: int,
+    timeout: float,
+) -> list[int]:
+    """Read count registers of a table in one request.
+
+    Raises:
+        asyncio.TimeoutError: If connecting or the response takes longer than timeout
+        OSError: If the connection fails
+        ModbusError: If the device returns an exception response
+        ValueError: If the response is malformed
+    """
+    request = _read_request(table, address, count)
+    function = request[0]
+    tid = _next_transaction_id()
+
+    async def _exchange() -> list[int]:
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(_MBAP.pack(tid, 0, len(request) + 1, unit) + request)
+            await writer.drain()
+            while True:
+                r_tid, protocol, length, r_unit = _MBAP.unpack(await reader.readexactly(_MBAP.size))
+                pdu = await reader.readexactly(length - 1)
+                if r_tid == tid and protocol == 0:
+                    break
+            if r_unit != unit:
+                raise ValueError(f"Response from unit {r_unit}, expected {unit}")
+            return _parse_read(function, pdu, count)
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    return await asyncio.wait_for(_exchange(), timeout)
+
+
+class PipelinedConnection:
+    """Persistent Modbus TCP connection with several requests in flight.
+
+    Requests get their own transaction ID and wait for the response carrying it, so
+    responses may arrive in any order. At most max_in_flight requests are outstanding. An
+    unknown transaction ID, or a timed out request whose unit answered a later request
+    (the gateway dropped it), switches the connection to strict mode (one request at a time)
+    for good. A unit that does not answer at all does not.
+    """
+
+    def __init__(self, host: str, port: int, max_in_flight: int) -> None:
+        self.host = host
+        self.port = int(port)
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.strict = self.max_in_flight == 1
+        self._slots = asyncio.Semaphore(self.max_in_flight)
+        self._strict_lock = asyncio.Lock()
+        self._connect_lock = asyncio.Lock()
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        # transaction ids given up on (timeout); their late responses are dropped silently
+        self._abandoned: set[int] = set()
+        # send order of requests and the latest request answered per unit
+        self._sequence = itertools.count()
+        self._answered: Dict[int, int] = {}
+
+    @property
+    def depth(self) -> int:
+        """Number of requests callers should keep in flight."""
+        return 1 if self.strict else self.max_in_flight
+
+    async def connect(self, timeout: float) -> None:
+        """Open the connection now if it is not open (requests otherwise connect on demand)."""
+        await self._ensure_connected(timeout)
+
+    async def read_registers(self, unit: int, table: str, address: int, count: int, timeout: float) -> list[int]:
+        request = _read_request(table, address, count)
+        return _parse_read(request[0], await self.request(unit, request, timeout), count)
+
+    async def write_register(self, unit: int, address: int, value: int, timeout: float) -> None:
+        _check_response(FC_WRITE_REGISTER, await self.request(unit, struct.pack(">BHH", FC_WRITE_REGISTER, address, value & 0xFFFF), timeout))
+
+    async def write_registers(self, unit: int, address: int, values: list[int], timeout: float) -> None:
+        request = struct.pack(f">BHHB{len(values)}H", FC_WRITE_REGISTERS, address, len(values), len(values) * 2, *[v & 0xFFFF for v in values])
+        _check_response(FC_WRITE_REGISTERS, await self.request(unit, request, timeout))
+
+    async def read_write_registers(
+        self, unit: int, read_address: int, read_count: int, write_address: int, values: list[int], timeout: float
+    ) -> list[int]:
+        """Write holding registers, then read holding registers, in one request (FC23)."""
+        if not 1 <= read_count <= MAX_READ_COUNT or not 1 <= len(values) <= MAX_READ_WRITE_COUNT:
+            raise ValueError(f"Read/write counts {read_count}/{len(values)} out of range")
+        request = struct.pack(
+            f">BHHHHB{len(values)}H",
+            FC_READ_WRITE_REGISTERS, read_address, read_count, write_address, len(values), len(values) * 2,
+            *[v & 0xFFFF for v in values],
+        )
+        return _parse_read(FC_READ_WRITE_REGISTERS, await self.request(unit, request, timeout), read_count)
+
+    async def write_coil(self, unit: int, address: int, value: bool, timeout: float) -> None:
+        _check_response(FC_WRITE_COIL, await self.request(unit, struct.pack(">BHH", FC_WRITE_COIL, address, 0xFF00 if value else 0), timeout))
+
+    async def request(self, unit: int, pdu: bytes, timeout: float) -> bytes:
+        """Send one request PDU and return the response PDU."""
+        async with self._slots:
+            if self.strict:
+                async with self._strict_lock:
+                    return await self._transact(unit, pdu, timeout)
+            return await self._transact(unit, pdu, timeout)
+
+    async def _transact(self, unit: int, pdu: bytes, timeout: float) -> bytes:
+        await self._ensure_connected(timeout)
+        tid = _next_transaction_id()
+        while tid in self._pending or tid in self._abandoned:
+            tid = _next_transaction_id()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[tid] = future
+        sequence = next(self._sequence)
+        self._writer.write(_MBAP.pack(tid, 0, len(pdu) + 1, unit) + pdu)
+        try:
+            r_unit, response = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            if self._pending.pop(tid, None) is not None:
+                self._abandoned.add(tid)
+            if self._answered.get(unit, -1) > sequence:
+                self._fall_back_to_strict(f"request to unit {unit} dropped while later ones were answered")
+            raise
+        finally:
+            self._pending.pop(tid, None)
+        self._answered[unit] = max(self._answered.get(unit, -1), sequence)
+        if r_unit != unit:
+            raise ValueError(f"Response from unit {r_unit}, expected {unit}")
+        return response
+
+    async def _ensure_connected(self, timeout: float) -> None:
+        async with self._connect_lock:
+            if self._writer is not None and not self._writer.is_closing():
+                return
+            self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), timeout)
+            self._abandoned.clear()
+            if self._read_task is not None:
+                self._read_task.cancel()
+            self._read_task = asyncio.get_running_loop().create_task(self._read_loop(self._reader))
+            _LOGGER.debug("Connected to %s:%s (%s)", self.host, self.port, "strict" if self.strict else f"pipelined, depth {self.max_in_flight}")
+
+    async def _read_loop(self, reader: asyncio.StreamReader) -> None:
+        """Dispatch responses to the requests waiting for their transaction ID."""
+        try:
+            while True:
+                tid, protocol, length, unit = _MBAP.unpack(await reader.readexactly(_MBAP.size))
+                pdu = await reader.readexactly(length - 1)
+                future = self._pending.pop(tid, None)
+                if future is None:
+                    if tid in self._abandoned:
+                        self._abandoned.discard(tid)
+                    else:
+                        self._fall_back_to_strict(f"unexpected transaction id {tid}")
+                    continue
+                if not future.done():
+                    future.set_result((unit, pdu))
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            _LOGGER.debug("Connection to %s:%s lost: %s", self.host, self.port, ex)
+            # a reader of a connection already replaced leaves the new one alone
+            if reader is self._reader:
+                self._fail_pending(ConnectionError(str(ex) or "Connection lost"))
+                self._close_writer()
+
+    def _fall_back_to_strict(self, reason: str) -> None:
+        if self.strict:
+            return
+        self.strict = True
+        _LOGGER.warning("Modbus gateway %s:%s does not handle pipelined requests (%s); using one request at a time", self.host, self.port, reason)
+
+    def _fail_pending(self, ex: Exception) -> None:
+        pending = list(self._pending.values())
+        self._pending.clear()
+        for future in pending:
+            if not future.done():
+                future.set_exception(ex)
+
+    def _close_writer(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = self._writer = None
+
+    def close(self) -> None:
+        """Close the connection and fail requests still waiting."""
+        if self._read_task is not None:
+            self._read_task.cancel()
+            self._read_task = None
+        self._fail_pending(ConnectionError("Connection closed"))
+        self._close_writer()
+
+
+# Shared connections per (host, port) endpoint with the number of users
+_connections: Dict[Tuple[str, int], Tuple[PipelinedConnection, int]] = {}
+
+
+def acquire_connection(host: str, port: int, max_in_flight: int) -> PipelinedConnection:
+    """Return the shared connection to an endpoint (units behind one gateway share it)."""
+    key = (host, int(port))
+    connection, users = _connections.get(key, (None, 0))
+    if connection is None:
+        connection = PipelinedConnection(host, port, max_in_flight)
+    _connections[key] = (connection, users + 1)
+    return connection
+
+
+def release_connection(connection: PipelinedConnection) -> None:
+    """Drop one user of a shared connection and close it when no user is left."""
+    key = (connection.host, connection.port)
+    current, users = _connections.get(key, (None, 0))
+    if current is not connection:
+        connection.close()
+        return
+    if users <= 1:
+        del _connections[key]
+        connection.close()
+    else:
+        _connections[key] = (connection, users - 1)
@@ -8,9 +8,9 @@ from homeassistant.components.number import NumberEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import HOLDING_REGISTERS
+from .const import DISCOVERY_DEVICE_KEY, TABLE_HOLDING
+from .entity import HaAtreaEntity
 
 DOMAIN = "ha_atrea_recuperation"
 
@@ -23,7 +23,7 @@ async def async_setup_entry(
     """Set up the number platform from a config entry."""
     device_data = hass.data[DOMAIN]["devices"][entry.entry_id]
     hub = device_data["hub"]
-    coordinator = device_data["coordinator"]
+    coordinator = device_data["coordinators"][hub.tier_for([(TABLE_HOLDING, 1002)])]
     name = device_data["name"]
 
     async_add_entities([
@@ -32,8 +32,7 @@ async def async_setup_entry(
             hub,
             f"{name} Target Temperature",
             1002,
-            scale=HOLDING_REGISTERS[1002]["scale"],
-            unit=HOLDING_REGISTERS[1002]["unit"],
+            unit=_register_unit(hub, 1002),
             writable=True,
             min_value=-30.0,
             max_value=90.0,
@@ -45,8 +44,10 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
     """Set up the number platform (YAML backward compatibility)."""
     entities = []
 
-    # Get all devices from hass.data
+    # Get the device this platform was loaded for (all devices without discovery info)
     devices = hass.data[DOMAIN].get("devices", {})
+    if discovery_info and discovery_info.get(DISCOVERY_DEVICE_KEY) in devices:
+        devices = {discovery_info[DISCOVERY_DEVICE_KEY]: devices[discovery_info[DISCOVERY_DEVICE_KEY]]}
 
     # Create number entity for each device (skip config entry devices)
     for device_key, device_data in devices.items():
@@ -55,7 +56,7 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
             continue
             
         hub = device_data["hub"]
-        coordinator = device_data["coordinator"]
+        coordinator = device_data["coordinators"][hub.tier_for([(TABLE_HOLDING, 1002)])]
         name = device_data["name"]
 
         entities.append(
@@ -64,8 +65,7 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
                 hub,
                 f"{name} Target Temperature",
                 1002,
-                scale=HOLDING_REGISTERS[1002]["scale"],
-                unit=HOLDING_REGISTERS[1002]["unit"],
+                unit=_register_unit(hub, 1002),
                 writable=True,
                 min_value=-30.0,
                 max_value=90.0,
@@ -75,7 +75,13 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
     async_add_entities(entities)
 
 
-class HaAtreaNumber(CoordinatorEntity, NumberEntity):
+def _register_unit(hub, register: int) -> str | None:
+    """Return the unit of a holding register from the hub's register map."""
+    meta = hub.register_map.get(TABLE_HOLDING, register) or {}
+    return meta.get("unit")
+
+
+class HaAtreaNumber(HaAtreaEntity, NumberEntity):
     """Number entity mapping to a holding register."""
 
     def __init__(
@@ -84,7 +90,6 @@ class HaAtreaNumber(CoordinatorEntity, NumberEntity):
         hub,
         name: str,
         register: int,
-        scale: float = 1.0,
         unit: str | None = None,
         writable: bool = False,
         min_value: float | None = None,
@@ -94,7 +99,6 @@ class HaAtreaNumber(CoordinatorEntity, NumberEntity):
         self._hub = hub
         self._name = name
         self._register = int(register)
-        self._scale = float(scale)
         self._unit = unit
         self._writable = writable
         self._min = min_value
@@ -102,6 +106,8 @@ class HaAtreaNumber(CoordinatorEntity, NumberEntity):
         # Include device name in unique_id to avoid conflicts with multiple devices
         device_id = hub.name.lower().replace(" ", "_")
         self._attr_unique_id = f"ha_atrea_{device_id}_number_{self._register}"
+        self._demand = ((TABLE_HOLDING, self._register),)
+        self._writes = self._demand if writable else ()
 
     @property
     def name(self) -> str:
@@ -120,10 +126,7 @@ class HaAtreaNumber(CoordinatorEntity, NumberEntity):
     def native_value(self) -> Optional[float]:
         if self.coordinator.data is None:
             return None
-        v = self.coordinator.data.get(self._register)
-        if v is None:
-            return None
-        return float(v) / self._scale
+        return self.coordinator.data.get((TABLE_HOLDING, self._register))
 
     @property
     def native_min_value(self) -> float:
@@ -134,6 +137,4 @@ class HaAtreaNumber(CoordinatorEntity, NumberEntity):
         return self._max if self._max is not None else 100.0
 
     async def async_set_native_value(self, value: float) -> None:
-        raw = int(round(float(value) * self._scale))
-        await self._hub.write_holding(self._register, raw)
-        await self.coordinator.async_request_refresh()
+        await self._hub.write_value(self._register, value)
@@ -0,0 +1,243 @@
+"""Register maps for HA Atrea Recuperation.
+
+Register definitions live in per-model JSON files (see MAPS_DIR in const.py). A map
+is compiled once when it is loaded into:
+
+- an address index: every register word -> the definition that covers it
+- a decode table: (address, count, definition) per table for decoder.decode_registers()
+- a block read plan: the fewest reads that fetch every defined register
+"""
+from __future__ import annotations
+
+from typing import AbstractSet, Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+import functools
+import json
+import logging
+import os
+
+from .const import (
+    DEFAULT_MAP,
+    ENUM_OPTIONS,
+    MAPS_DIR,
+    MAX_READ_COUNT,
+    TABLE_HOLDING,
+    TABLE_INPUT,
+    TIER_POLL_CYCLES,
+    TYPE_BITFIELD,
+    TYPE_ENUM,
+    TYPE_STRING,
+    TYPE_WORDS,
+    WORD_ORDER_HIGH_FIRST,
+    WORD_ORDER_LOW_FIRST,
+)
+from .decoder import register_count, register_type
+
+_LOGGER = logging.getLogger(__name__)
+
+TABLES = (TABLE_INPUT, TABLE_HOLDING)
+
+# Default number of undefined registers a block may span to save a separate request
+DEFAULT_MAX_GAP = 4
+
+
+class ReadBlock(NamedTuple):
+    """One read request: count consecutive registers of a table starting at address."""
+
+    table: str
+    address: int
+    count: int
+
+
+def plan_reads(
+    spans: Iterable[Tuple[str, int, int]],
+    max_gap: int = DEFAULT_MAX_GAP,
+    max_count: int = MAX_READ_COUNT,
+    exclude: AbstractSet[Tuple[str, int]] = frozenset(),
+) -> List[ReadBlock]:
+    """Merge (table, address, count) spans into as few block reads as possible.
+
+    Spans of the same table are merged when at most max_gap undefined registers lie
+    between them and the block stays within max_count registers. A span is never split,
+    so multi-register values are always read in one request. Blocks never bridge a gap
+    holding an excluded (table, address) word (registers the device does not implement).
+    """
+    blocks: List[ReadBlock] = []
+    by_table: Dict[str, List[Tuple[int, int]]] = {}
+    for table, address, count in spans:
+        by_table.setdefault(table, []).append((address, count))
+
+    for table in sorted(by_table):
+        start: Optional[int] = None
+        end = 0
+        for address, count in sorted(set(by_table[table])):
+            span_end = address + count
+            if (
+                start is not None
+                and address <= end + max_gap
+                and max(end, span_end) - start <= max_count
+                and not any((table, word) in exclude for word in range(end, address))
+            ):
+                end = max(end, span_end)
+                continue
+            if start is not None:
+                blocks.append(ReadBlock(table, start, end - start))
+            start, end = address, span_end
+        if start is not None:
+            blocks.append(ReadBlock(table, start, end - start))
+    return blocks
+
+
+class RegisterMap:
+    """A compiled register map for one Atrea model family."""
+
+    def __init__(
+        self,
+        name: str,
+        definitions: Mapping[str, Mapping[int, Mapping[str, Any]]],
+        models: Iterable[str] = (),
+        max_gap: int = DEFAULT_MAX_GAP,
+    ) -> None:
+        self.name = name
+        self.models = tuple(models)
+        self.max_gap = int(max_gap)
+        self.definitions: Dict[str, Dict[int, Dict[str, Any]]] = {
+            table: {int(a): dict(m) for a, m in definitions.get(table, {}).items()} for table in TABLES
+        }
+
+        # address index and decode table
+        self.index: Dict[Tuple[str, int], int] = {}
+        self.decode_table: Dict[str, List[Tuple[int, int, Dict[str, Any]]]] = {}
+        for table, defs in self.definitions.items():
+            entries = []
+            for address in sorted(defs):
+                meta = defs[address]
+                count = register_count(meta)
+                for word in range(address, address + count):
+                    if (table, word) in self.index:
+                        raise ValueError(f"{name}: {table} register {word} is defined twice")
+                    self.index[(table, word)] = address
+                entries.append((address, count, meta))
+            self.decode_table[table] = entries
+
+        # block read plan covering every definition
+        self.plan = self.plan_for(self.spans())
+
+    def get(self, table: str, address: int) -> Optional[Dict[str, Any]]:
+        """Return the definition starting at address, or None."""
+        return self.definitions.get(table, {}).get(int(address))
+
+    def owner(self, table: str, address: int) -> Optional[int]:
+        """Return the start address of the definition covering a register word, or None."""
+        return self.index.get((table, int(address)))
+
+    def spans(self, keys: Optional[Iterable[Tuple[str, int]]] = None) -> List[Tuple[str, int, int]]:
+        """Return (table, address, count) for the given (table, address) keys, or for all definitions."""
+        if keys is None:
+            return [(table, address, count) for table, entries in self.decode_table.items() for address, count, _ in entries]
+        spans = []
+        for table, address in keys:
+            meta = self.get(table, address)
+            if meta is not None:
+                spans.append((table, int(address), register_count(meta)))
+        return spans
+
+    def plan_for(
+        self,
+        spans: Iterable[Tuple[str, int, int]],
+        exclude: AbstractSet[Tuple[str, int]] = frozenset(),
+    ) -> List[ReadBlock]:
+        """Build a block read plan for spans using this map's gap setting.
+
+        Spans touching an excluded (table, address) word are left out and blocks do not
+        bridge gaps holding one.
+        """
+        spans = [s for s in spans if not any((s[0], word) in exclude for word in range(s[1], s[1] + s[2]))]
+        return plan_reads(spans, max_gap=self.max_gap, exclude=exclude)
+
+    def matches(self, model: Optional[str]) -> int:
+        """Return the length of the longest model prefix matching model (0 if none)."""
+        if not model:
+            return 0
+        model = model.strip().upper()
+        return max((len(p) for p in self.models if model.startswith(p.strip().upper())), default=0)
+
+
+def _validate_definition(source: str, table: str, address: int, meta: Mapping[str, Any]) -> None:
+    """Raise ValueError if a register definition is not usable."""
+    if "name" not in meta:
+        raise ValueError(f"{source}: {table} register {address} has no name")
+    rtype = register_type(meta)
+    if rtype not in TYPE_WORDS and rtype != TYPE_STRING:
+        raise ValueError(f"{source}: {table} register {address} has unknown type {rtype}")
+    if rtype == TYPE_STRING and int(meta.get("count", 0)) < 1:
+        raise ValueError(f"{source}: {table} register {address} string needs a count")
+    if rtype == TYPE_ENUM and meta.get("options") not in ENUM_OPTIONS:
+        raise ValueError(f"{source}: {table} register {address} references unknown options {meta.get('options')}")
+    if rtype == TYPE_BITFIELD and not isinstance(meta.get("bits"), dict):
+        raise ValueError(f"{source}: {table} register {address} bitfield needs bits")
+    if meta.get("word_order", WORD_ORDER_HIGH_FIRST) not in (WORD_ORDER_HIGH_FIRST, WORD_ORDER_LOW_FIRST):
+        raise ValueError(f"{source}: {table} register {address} has unknown word order {meta.get('word_order')}")
+    if "tier" in meta and meta["tier"] not in TIER_POLL_CYCLES:
+        raise ValueError(f"{source}: {table} register {address} has unknown tier {meta['tier']}")
+    if register_count(meta) > MAX_READ_COUNT:
+        raise ValueError(f"{source}: {table} register {address} spans more than {MAX_READ_COUNT} registers")
+
+
+def compile_register_map(doc: Mapping[str, Any], source: str = "register map") -> RegisterMap:
+    """Validate a register map document and compile it."""
+    definitions: Dict[str, Dict[int, Dict[str, Any]]] = {}
+    for table in TABLES:
+        defs = {}
+        for address, meta in doc.get(table, {}).items():
+            address = int(address)
+            _validate_definition(source, table, address, meta)
+            meta = dict(meta)
+            if "bits" in meta:
+                meta["bits"] = {int(bit): flag for bit, flag in meta["bits"].items()}
+            defs[address] = meta
+        definitions[table] = defs
+    return RegisterMap(
+        doc.get("name", source),
+        definitions,
+        models=doc.get("models", ()),
+        max_gap=doc.get("max_gap", DEFAULT_MAX_GAP),
+    )
+
+
+def maps_path() -> str:
+    """Return the directory holding the register map files."""
+    return os.path.join(os.path.dirname(__file__), MAPS_DIR)
+
+
+@functools.lru_cache(maxsize=None)
+def load_register_map(filename: str) -> RegisterMap:
+    """Load and compile a register map file (blocking; run in executor).
+
+    Compiled maps are cached, so every hub using the same model shares one map.
+    """
+    path = os.path.join(maps_path(), filename)
+    with open(path, encoding="utf-8") as f:
+        doc = json.load(f)
+    register_map = compile_register_map(doc, source=filename)
+    _LOGGER.debug("Loaded register map %s (%s): %d read blocks", filename, register_map.name, len(register_map.plan))
+    return register_map
+
+
+def select_register_map(model: Optional[str]) -> RegisterMap:
+    """Return the register map for a decoded model string (blocking; run in executor).
+
+    The file with the longest matching model prefix wins; DEFAULT_MAP is used otherwise
+    or when a matching file cannot be loaded.
+    """
+    best, best_len = DEFAULT_MAP, 0
+    for filename in sorted(os.listdir(maps_path())):
+        if not filename.endswith(".json") or filename == DEFAULT_MAP:
+            continue
+        try:
+            match = load_register_map(filename).matches(model)
+        except Exception:
+            _LOGGER.exception("Invalid register map %s", filename)
+            continue
+        if match > best_len:
+            best, best_len = filename, match
+    return load_register_map(best)
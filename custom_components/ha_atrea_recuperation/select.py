@@ -6,7 +6,9 @@ from homeassistant.components.select import SelectEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DISCOVERY_DEVICE_KEY, TABLE_HOLDING
+from .entity import HaAtreaEntity
 
 DOMAIN = "ha_atrea_recuperation"
 
@@ -19,7 +21,7 @@ async def async_setup_entry(
     """Set up the select platform from a config entry."""
     device_data = hass.data[DOMAIN]["devices"][entry.entry_id]
     hub = device_data["hub"]
-    coordinator = device_data["coordinator"]
+    coordinator = device_data["coordinators"][hub.tier_for(OperationModeSelect._demand)]
     name = device_data["name"]
 
     async_add_entities([OperationModeSelect(coordinator, hub, f"{name} Operation Mode")])
@@ -29,8 +31,10 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
     """Set up the select platform (YAML backward compatibility)."""
     entities = []
 
-    # Get all devices from hass.data
+    # Get the device this platform was loaded for (all devices without discovery info)
     devices = hass.data[DOMAIN].get("devices", {})
+    if discovery_info and discovery_info.get(DISCOVERY_DEVICE_KEY) in devices:
+        devices = {discovery_info[DISCOVERY_DEVICE_KEY]: devices[discovery_info[DISCOVERY_DEVICE_KEY]]}
 
     # Create select entity for each device (skip config entry devices)
     for device_key, device_data in devices.items():
@@ -39,7 +43,7 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
             continue
             
         hub = device_data["hub"]
-        coordinator = device_data["coordinator"]
+        coordinator = device_data["coordinators"][hub.tier_for(OperationModeSelect._demand)]
         name = device_data["name"]
 
         entities.append(OperationModeSelect(coordinator, hub, f"{name} Operation Mode"))
@@ -47,9 +51,12 @@ async def async_setup_platform(hass: HomeAssistant, config, async_add_entities,
     async_add_entities(entities)
 
 
-class OperationModeSelect(CoordinatorEntity, SelectEntity):
+class OperationModeSelect(HaAtreaEntity, SelectEntity):
     """Select entity to set the device operation mode (0..8)."""
 
+    _demand = ((TABLE_HOLDING, 1001),)
+    _writes = _demand
+
     def __init__(self, coordinator, hub, name: str) -> None:
         super().__init__(coordinator)
         self._hub = hub
@@ -71,14 +78,10 @@ class OperationModeSelect(CoordinatorEntity, SelectEntity):
     def current_option(self) -> str | None:
         if self.coordinator.data is None:
             return None
-        val = self.coordinator.data.get(1001)
-        if val is None:
-            return None
-        try:
-            idx = int(val)
-            return self.options[idx]
-        except Exception:
+        label = self.coordinator.data.get((TABLE_HOLDING, 1001))
+        if label not in self.options:
             return None
+        return label
 
     @property
     def options(self) -> list[str]:
@@ -93,4 +96,3 @@ class OperationModeSelect(CoordinatorEntity, SelectEntity):
         except ValueError:
             return
         await self._hub.write_holding(1001, int(idx))
-        await self.coordinator.async_request_refresh()
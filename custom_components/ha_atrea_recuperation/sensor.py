@@ -1,18 +1,21 @@
 """Generic sensor entity for HA Atrea Recuperation reading cached registers.
 
-Sensors read values from coordinator data. Some sensors combine register pairs (32-bit)
-or build a serial string from character registers.
+Sensors read values the hub decoded from the register definitions of the device's register map
+(signed/unsigned, 32-bit, float, string, enum and bitfield types). Derived sensors expose values the hub
+computes from several registers (heat recovery efficiency, recovered power, flow imbalance).
+Diagnostic sensors expose hub state such as the effective poll interval.
 """
 
 from __future__ import annotations
 
-from homeassistant.components.sensor import SensorEntity
+from homeassistant.components.sensor import SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
-from .const import HOLDING_REGISTERS, INPUT_REGISTERS
+from .const import DERIVED_SENSORS, DIAGNOSTIC_SENSORS, DISCOVERY_DEVICE_KEY, TABLE_HOLDING, TABLE_INPUT, TIER_NORMAL
+from .entity import HaAtreaEntity
 
 DOMAIN = "ha_atrea_recuperation"
 
@@ -23,91 +26,108 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensor platform from a config entry."""
-    entities = []
     device_data = hass.data[DOMAIN]["devices"][entry.entry_id]
     hub = device_data["hub"]
-    coordinator = device_data["coordinator"]
+    coordinators = device_data["coordinators"]
     name = device_data["name"]
 
-    # Sensors from INPUT_REGISTERS
-    for reg, meta in INPUT_REGISTERS.items():
+    async_add_entities(_build_sensors(coordinators, hub, name))
+
+
+async def async_setup_platform(hass: HomeAssistant, config, async_add_entities, discovery_info=None):
+    """Set up the sensor platform (YAML backward compatibility)."""
+    entities = []
+
+    # Get the device this platform was loaded for (all devices without discovery info)
+    devices = hass.data[DOMAIN].get("devices", {})
+    if discovery_info and discovery_info.get(DISCOVERY_DEVICE_KEY) in devices:
+        devices = {discovery_info[DISCOVERY_DEVICE_KEY]: devices[discovery_info[DISCOVERY_DEVICE_KEY]]}
+
+    # Create entities for each device (skip config entry devices)
+    for device_key, device_data in devices.items():
+        # Skip if this is a config entry device (has entry_id)
+        if "entry_id" in device_data:
+            continue
+            
+        hub = device_data["hub"]
+        coordinators = device_data["coordinators"]
+        name = device_data["name"]
+
+        entities.extend(_build_sensors(coordinators, hub, name))
+
+    async_add_entities(entities)
+
+
+def _build_sensors(coordinators, hub, name: str) -> list[SensorEntity]:
+    """Create all sensor entities for one device, each on the coordinator of its polling tier."""
+    entities: list[SensorEntity] = []
+
+    register_map = hub.register_map
+
+    # Sensors from the input registers of the device's register map
+    for reg, meta in register_map.definitions[TABLE_INPUT].items():
         entities.append(
             HaAtreaSensor(
-                coordinator,
+                coordinators[hub.tier_for([(TABLE_INPUT, reg)])],
                 hub,
                 f"{name} {meta['name']}",
                 reg,
-                scale=meta.get("scale", 1.0),
                 unit=meta.get("unit"),
+                unique_name=f"{name} {meta.get('unique_name', meta['name'])}",
+                monotonic=meta.get("monotonic", False),
             )
         )
 
-    # Sensors from HOLDING_REGISTERS (expose read-only)
-    for reg, meta in HOLDING_REGISTERS.items():
+    # Sensors from the holding registers (expose read-only)
+    for reg, meta in register_map.definitions[TABLE_HOLDING].items():
         entities.append(
             HaAtreaSensor(
-                coordinator,
+                coordinators[hub.tier_for([(TABLE_HOLDING, reg)])],
                 hub,
                 f"{name} {meta['name']}",
                 reg,
-                scale=meta.get("scale", 1.0),
                 unit=meta.get("unit"),
                 holding=True,
+                unique_name=f"{name} {meta.get('unique_name', meta['name'])}",
+                monotonic=meta.get("monotonic", False),
             )
         )
 
-    async_add_entities(entities)
-
-
-async def async_setup_platform(hass: HomeAssistant, config, async_add_entities, discovery_info=None):
-    """Set up the sensor platform (YAML backward compatibility)."""
-    entities = []
-
-    # Get all devices from hass.data
-    devices = hass.data[DOMAIN].get("devices", {})
-
-    # Create entities for each device (skip config entry devices)
-    for device_key, device_data in devices.items():
-        # Skip if this is a config entry device (has entry_id)
-        if "entry_id" in device_data:
-            continue
-            
-        hub = device_data["hub"]
-        coordinator = device_data["coordinator"]
-        name = device_data["name"]
-
-        # Sensors from INPUT_REGISTERS
-        for reg, meta in INPUT_REGISTERS.items():
-            entities.append(
-                HaAtreaSensor(
-                    coordinator,
-                    hub,
-                    f"{name} {meta['name']}",
-                    reg,
-                    scale=meta.get("scale", 1.0),
-                    unit=meta.get("unit"),
-                )
+    # Derived sensors computed by the hub
+    for key, meta in DERIVED_SENSORS.items():
+        entities.append(
+            HaAtreaDerivedSensor(
+                coordinators[hub.tier_for((TABLE_INPUT, r) for r in meta["inputs"])],
+                hub,
+                f"{name} {meta['name']}",
+                key,
+                unit=meta.get("unit"),
             )
+        )
 
-        # Sensors from HOLDING_REGISTERS (expose read-only)
-        for reg, meta in HOLDING_REGISTERS.items():
-            entities.append(
-                HaAtreaSensor(
-                    coordinator,
-                    hub,
-                    f"{name} {meta['name']}",
-                    reg,
-                    scale=meta.get("scale", 1.0),
-                    unit=meta.get("unit"),
-                    holding=True,
-                )
+    # Diagnostic sensors exposing hub state
+    for key, meta in DIAGNOSTIC_SENSORS.items():
+        entities.append(
+            HaAtreaDiagnosticSensor(
+                coordinators[TIER_NORMAL],
+                hub,
+                f"{name} {meta['name']}",
+                key,
+                unit=meta.get("unit"),
+                measurement=meta.get("measurement", True),
+                attributes=meta.get("attributes"),
             )
+        )
 
-    async_add_entities(entities)
+    return entities
 
 
-class HaAtreaSensor(CoordinatorEntity, SensorEntity):
-    """Sensor reading a single register (or combined pair) from the coordinator data."""
+class HaAtreaSensor(HaAtreaEntity, SensorEntity):
+    """Sensor exposing the decoded value of a register definition from the coordinator data.
+
+    Registers marked "monotonic" in the map (hour counters) are total increasing sensors, so
+    long-term statistics and utility meters treat them as counters.
+    """
 
     def __init__(
         self,
@@ -115,20 +135,25 @@ class HaAtreaSensor(CoordinatorEntity, SensorEntity):
         hub,
         name: str,
         register: int,
-        scale: float = 1.0,
         unit: str | None = None,
-        holding: bool = False
+        holding: bool = False,
+        unique_name: str | None = None,
+        monotonic: bool = False,
     ) -> None:
         super().__init__(coordinator)
         self._hub = hub
         self._name = name
         self._register = int(register)
-        self._scale = float(scale)
+        if monotonic:
+            self._attr_state_class = SensorStateClass.TOTAL_INCREASING
         self._unit = unit
         self._holding = holding
+        self._key = (TABLE_HOLDING if holding else TABLE_INPUT, self._register)
+        self._demand = (self._key,)
         # Include device name in unique_id to avoid conflicts with multiple devices
         device_id = hub.name.lower().replace(" ", "_")
-        self._attr_unique_id = f"ha_atrea_{device_id}_sensor_{self._register}_{name.replace(' ', '_').lower()}"
+        uid_name = (unique_name or name).replace(" ", "_").lower()
+        self._attr_unique_id = f"ha_atrea_{device_id}_sensor_{self._register}_{uid_name}"
 
     @property
     def name(self) -> str:
@@ -147,35 +172,143 @@ class HaAtreaSensor(CoordinatorEntity, SensorEntity):
     def native_value(self) -> float | str | None:
         if self.coordinator.data is None:
             return None
-        # 32-bit counters (combine low + high)
-        if self._register in (3200, 3202, 3204):
-            low = self.coordinator.data.get(self._register)
-            high = self.coordinator.data.get(self._register + 1)
-            if low is None:
-                return None
-            if high is None:
-                return float(low)
-            val32 = int(low) + (int(high) << 16)
-            return float(val32)
-        # Serial number - combine chars 3000..3008 when sensor for 3000 is used
-        if self._register == 3000:
-            chars = []
-            for r in range(3000, 3009):
-                v = self.coordinator.data.get(r)
-                if v is None:
-                    continue
-                try:
-                    chars.append(chr(int(v)))
-                except Exception:
-                    chars.append("?")
-            if not chars:
-                return None
-            return "".join(chars)
-        # Regular single-register sensor
-        v = self.coordinator.data.get(self._register)
-        if v is None:
+        value = self.coordinator.data.get(self._key)
+        if isinstance(value, dict):
+            # Bitfield: list the flags that are set
+            return ", ".join(flag for flag, is_set in value.items() if is_set) or "none"
+        return value
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        if self.coordinator.data is None:
             return None
-        try:
-            return float(v) / self._scale
-        except Exception:
+        value = self.coordinator.data.get(self._key)
+        if isinstance(value, dict):
+            return dict(value)
+        return None
+
+
+class HaAtreaDerivedSensor(HaAtreaEntity, SensorEntity):
+    """Sensor exposing a value computed by the hub from several registers.
+
+    State is only written when the computed value changes, so polls that leave the
+    underlying temperatures/flows untouched do not produce state updates.
+    """
+
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator, hub, name: str, key: str, unit: str | None = None) -> None:
+        super().__init__(coordinator)
+        self._hub = hub
+        self._name = name
+        self._key = key
+        self._unit = unit
+        self._last_value: float | None = None
+        self._last_available: bool | None = None
+        self._demand = tuple((TABLE_INPUT, r) for r in DERIVED_SENSORS[key]["inputs"])
+        if unit == "W":
+            self._attr_device_class = SensorDeviceClass.POWER
+        # Include device name in unique_id to avoid conflicts with multiple devices
+        device_id = hub.name.lower().replace(" ", "_")
+        self._attr_unique_id = f"ha_atrea_{device_id}_derived_{key}"
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def device_info(self):
+        """Return device info to link this entity to the device."""
+        return self._hub.device_info
+
+    @property
+    def native_unit_of_measurement(self) -> str | None:
+        return self._unit
+
+    @property
+    def native_value(self) -> float | None:
+        if self.coordinator.data is None:
             return None
+        return self.coordinator.data.get(self._key)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._last_value = self.native_value
+        self._last_available = self.available
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the derived value (or availability) changed."""
+        value = self.native_value
+        available = self.available
+        if value == self._last_value and available == self._last_available:
+            return
+        self._last_value = value
+        self._last_available = available
+        self.async_write_ha_state()
+
+
+class HaAtreaDiagnosticSensor(HaAtreaEntity, SensorEntity):
+    """Diagnostic sensor exposing hub state (e.g. the effective poll interval).
+
+    The state comes from the hub's diagnostics, not the snapshot, so it is written whenever
+    the value, its attributes or availability changed rather than on new snapshot versions.
+    """
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(
+        self,
+        coordinator,
+        hub,
+        name: str,
+        key: str,
+        unit: str | None = None,
+        measurement: bool = True,
+        attributes: str | None = None,
+    ) -> None:
+        super().__init__(coordinator)
+        self._hub = hub
+        self._name = name
+        self._key = key
+        self._unit = unit
+        self._attributes_key = attributes
+        if measurement:
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        if unit == "s":
+            self._attr_device_class = SensorDeviceClass.DURATION
+        # Include device name in unique_id to avoid conflicts with multiple devices
+        device_id = hub.name.lower().replace(" ", "_")
+        self._attr_unique_id = f"ha_atrea_{device_id}_diagnostic_{key}"
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def device_info(self):
+        """Return device info to link this entity to the device."""
+        return self._hub.device_info
+
+    @property
+    def native_unit_of_measurement(self) -> str | None:
+        return self._unit
+
+    @property
+    def native_value(self):
+        return self._hub.diagnostics.get(self._key)
+
+    @property
+    def extra_state_attributes(self) -> dict | None:
+        if self._attributes_key is None:
+            return None
+        return self._hub.diagnostics.get(self._attributes_key)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write state only when the diagnostic value, its attributes or availability changed."""
+        written = (self.native_value, self.extra_state_attributes, self.available)
+        if written == self._written:
+            return
+        self._written = written
+        self.async_write_ha_state()
@@ -0,0 +1,127 @@
+"""Services for HA Atrea Recuperation.
+
+read_registers and write_registers give automations and tooling raw access to
+register blocks. Each call is a single Modbus transaction through the device's hub.
+"""
+from __future__ import annotations
+
+import logging
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, ServiceResponse, SupportsResponse
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers import device_registry as dr
+
+from .const import (
+    ATTR_ADDRESS,
+    ATTR_COUNT,
+    ATTR_DEVICE_ID,
+    ATTR_TABLE,
+    ATTR_VALUES,
+    DOMAIN,
+    MAX_READ_COUNT,
+    MAX_WRITE_COUNT,
+    SERVICE_READ_REGISTERS,
+    SERVICE_WRITE_REGISTERS,
+    TABLE_HOLDING,
+    TABLE_INPUT,
+)
+from .limiter import WriteThrottled
+from .modbus_tcp import ModbusError
+
+_LOGGER = logging.getLogger(__name__)
+
+_ADDRESS = vol.All(vol.Coerce(int), vol.Range(min=0, max=0xFFFF))
+_WORD = vol.All(vol.Coerce(int), vol.Range(min=0, max=0xFFFF))
+
+READ_REGISTERS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DEVICE_ID): cv.string,
+        vol.Optional(ATTR_TABLE, default=TABLE_HOLDING): vol.In([TABLE_INPUT, TABLE_HOLDING]),
+        vol.Required(ATTR_ADDRESS): _ADDRESS,
+        vol.Optional(ATTR_COUNT, default=1): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_READ_COUNT)),
+    }
+)
+
+WRITE_REGISTERS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_DEVICE_ID): cv.string,
+        vol.Required(ATTR_ADDRESS): _ADDRESS,
+        vol.Required(ATTR_VALUES): vol.All(cv.ensure_list, [_WORD], vol.Length(min=1, max=MAX_WRITE_COUNT)),
+    }
+)
+
+
+def _get_hub(hass: HomeAssistant, device_id: str | None):
+    """Return the hub for a device registry id (or the only configured device)."""
+    devices = hass.data.get(DOMAIN, {}).get("devices", {})
+    hubs = [device_data["hub"] for device_data in devices.values()]
+    if not hubs:
+        raise HomeAssistantError("No Atrea device is configured")
+
+    if device_id is None:
+        if len(hubs) > 1:
+            raise HomeAssistantError("Several Atrea devices are configured; set device_id")
+        return hubs[0]
+
+    device = dr.async_get(hass).async_get(device_id)
+    if device is None:
+        raise HomeAssistantError(f"Unknown device {device_id}")
+    for hub in hubs:
+        if hub.device_info["identifiers"] & device.identifiers:
+            return hub
+    raise HomeAssistantError(f"Device {device_id} is not an Atrea device")
+
+
+async def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services (once per Home Assistant instance)."""
+    if hass.services.has_service(DOMAIN, SERVICE_READ_REGISTERS):
+        return
+
+    async def _async_read_registers(call: ServiceCall) -> ServiceResponse:
+        hub = _get_hub(hass, call.data.get(ATTR_DEVICE_ID))
+        table = call.data[ATTR_TABLE]
+        address = call.data[ATTR_ADDRESS]
+        count = call.data[ATTR_COUNT]
+        try:
+            registers = await hub.read_registers(table, address, count)
+        except ModbusError as ex:
+            raise HomeAssistantError(f"Reading {count} {table} registers from {address} failed: {ex}") from ex
+        if registers is None:
+            raise HomeAssistantError(f"Reading {count} {table} registers from {address} failed")
+        return {
+            ATTR_TABLE: table,
+            ATTR_ADDRESS: address,
+            ATTR_COUNT: count,
+            "registers": list(registers),
+        }
+
+    async def _async_write_registers(call: ServiceCall) -> ServiceResponse:
+        hub = _get_hub(hass, call.data.get(ATTR_DEVICE_ID))
+        address = call.data[ATTR_ADDRESS]
+        values = call.data[ATTR_VALUES]
+        try:
+            written = await hub.write_registers(address, values, defer=False)
+        except WriteThrottled as ex:
+            raise HomeAssistantError(str(ex)) from ex
+        if not written:
+            raise HomeAssistantError(f"Writing {len(values)} holding registers from {address} failed")
+        _LOGGER.debug("Wrote %d holding registers from %s via service", len(values), address)
+        return {ATTR_ADDRESS: address, ATTR_COUNT: len(values)}
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_READ_REGISTERS,
+        _async_read_registers,
+        schema=READ_REGISTERS_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_WRITE_REGISTERS,
+        _async_write_registers,
+        schema=WRITE_REGISTERS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
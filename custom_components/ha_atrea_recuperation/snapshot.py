@@ -0,0 +1,60 @@
+"""Immutable coordinator data for HA Atrea Recuperation.
+
+The hub decodes each poll into a private working dict and publishes it as a Snapshot at the
+end of the cycle, so entities never see a half-finished poll. Values written but not read
+back yet are kept in a separate overlay that takes precedence over the polled values.
+A snapshot's version only changes when its content changes, so consumers can detect
+changes by comparing versions.
+"""
+from __future__ import annotations
+
+from types import MappingProxyType
+from typing import Any, Iterator, Mapping
+
+
+class Snapshot(Mapping[Any, Any]):
+    """Read-only decoded values of one poll with optimistic write values laid over them."""
+
+    __slots__ = ("version", "values", "overlay")
+
+    def __init__(self, values: Mapping[Any, Any], overlay: Mapping[Any, Any] | None = None, version: int = 0) -> None:
+        self.version = version
+        self.values: Mapping[Any, Any] = MappingProxyType(dict(values))
+        self.overlay: Mapping[Any, Any] = MappingProxyType(dict(overlay or {}))
+
+    def __getitem__(self, key: Any) -> Any:
+        if key in self.overlay:
+            return self.overlay[key]
+        return self.values[key]
+
+    def __iter__(self) -> Iterator[Any]:
+        yield from self.values
+        yield from (key for key in self.overlay if key not in self.values)
+
+    def __len__(self) -> int:
+        return len(self.values.keys() | self.overlay.keys())
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.overlay or key in self.values
+
+    def is_pending(self, key: Any) -> bool:
+        """Return True if the value of key was written but not read back from the device yet."""
+        return key in self.overlay
+
+    def publish(self, values: Mapping[Any, Any], overlay: Mapping[Any, Any]) -> Snapshot:
+        """Return the snapshot to publish next: self if nothing changed, else a new version.
+
+        Unchanged parts are shared with self rather than copied.
+        """
+        values_changed = values != self.values
+        overlay_changed = overlay != self.overlay
+        if not values_changed and not overlay_changed:
+            return self
+        snapshot = Snapshot.__new__(Snapshot)
+        snapshot.version = self.version + 1
+        snapshot.values = MappingProxyType(dict(values)) if values_changed else self.values
+        snapshot.overlay = MappingProxyType(dict(overlay)) if overlay_changed else self.overlay
+        return snapshot
+
+    def __repr__(self) -> str:
+        return f"Snapshot(version={self.version}, values={len(self.values)}, overlay={dict(self.overlay)})"
@@ -0,0 +1,221 @@
+"""Modbus transport paths for HA Atrea Recuperation.
+
+A hub talks to its device over one or more paths:
+
+- HaHubTransport: the Home Assistant Modbus integration hub (async_pb_call)
+- PipelinedTcpTransport: direct Modbus TCP on one shared connection per gateway, with one
+  request or several in flight (see modbus_tcp.PipelinedConnection)
+
+Every path exposes the same operations and returns None/False on failure; reads on paths that
+see the device's Modbus exception responses (direct TCP) raise ModbusError for them. Direct TCP
+paths also offer read/write multiple registers (FC23); whether an endpoint (gateway and unit)
+supports it is learned once and shared by every path to that endpoint. PathHealth keeps the
+success rate and latency of a path so the hub can route traffic through the healthiest one.
+"""
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+import asyncio
+import logging
+import time
+
+from .const import DEFAULT_TCP_TIMEOUT, HEALTH_ALPHA, PATH_DIRECT, PATH_HA_HUB
+from .modbus_tcp import ModbusError, acquire_connection, release_connection
+
+_LOGGER = logging.getLogger(__name__)
+
+# endpoints ("host:port/unit") known to support (True) or reject (False) read/write multiple
+# registers (FC23); kept across reloads of the integration
+_read_write_support: Dict[str, bool] = {}
+
+
+def _validated_words(words: Any, count: int, address: int) -> list[int] | None:
+    """Return words as a list if exactly count registers were returned, else None."""
+    words = list(words)
+    if len(words) != count:
+        _LOGGER.warning("Expected %d registers at %s but got %d; discarding response", count, address, len(words))
+        return None
+    return [int(w) for w in words]
+
+
+class PathHealth:
+    """Exponentially weighted success rate and latency of one transport path."""
+
+    def __init__(self) -> None:
+        self.success_rate = 1.0
+        self.latency = 0.0
+        self.calls = 0
+        self.last_used = 0.0
+
+    def record(self, ok: bool, latency: float) -> None:
+        """Record the outcome and duration of one operation."""
+        self.success_rate += HEALTH_ALPHA * ((1.0 if ok else 0.0) - self.success_rate)
+        if ok:
+            self.latency = latency if not self.latency else self.latency + HEALTH_ALPHA * (latency - self.latency)
+        self.calls += 1
+        self.last_used = time.monotonic()
+
+    @property
+    def score(self) -> float:
+        """Higher is healthier: success rate discounted by latency (seconds)."""
+        return self.success_rate / (1.0 + self.latency)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "success_rate": round(self.success_rate, 3),
+            "latency_ms": round(self.latency * 1000, 1),
+            "calls": self.calls,
+        }
+
+
+class ModbusTransport(ABC):
+    """One way of reaching the device; operations return None/False on failure.
+
+    read_registers raises ModbusError when the device answers with an exception response and
+    the path can tell (the HA Modbus hub only returns None). A path must implement every
+    abstract operation; read_write_registers only matters for paths with an endpoint.
+    """
+
+    name = ""
+    # device endpoint reached through this path, for paths that can send FC23
+    endpoint: Optional[str] = None
+
+    def __init__(self, unit: int) -> None:
+        self.unit = int(unit)
+
+    def supports_read_write(self) -> bool:
+        """Return True if the path can send FC23 and its endpoint is not known to reject it."""
+        return self.endpoint is not None and _read_write_support.get(self.endpoint, True)
+
+    def set_read_write_support(self, supported: bool) -> None:
+        """Remember whether the endpoint of this path supports FC23."""
+        if self.endpoint is not None:
+            _read_write_support[self.endpoint] = supported
+
+    @property
+    def max_in_flight(self) -> int:
+        """Number of requests the path handles concurrently."""
+        return 1
+
+    def available(self) -> bool:
+        """Return True if the path can be used right now."""
+        return True
+
+    def close(self) -> None:
+        """Release connections held by the path."""
+
+    @abstractmethod
+    async def read_registers(self, table: str, address: int, count: int) -> list[int] | None:
+        """Return the words read, or None on failure."""
+
+    @abstractmethod
+    async def write_register(self, address: int, value: int) -> bool:
+        """Return True if the device acknowledged the write."""
+
+    @abstractmethod
+    async def write_registers(self, address: int, values: list[int]) -> bool:
+        """Return True if the device acknowledged the write."""
+
+    @abstractmethod
+    async def write_coil(self, address: int, value: bool) -> bool:
+        """Return True if the device acknowledged the write."""
+
+    async def read_write_registers(self, read_address: int, read_count: int, write_address: int, values: list[int]) -> list[int] | None:
+        """Write holding registers and read holding registers in one request (FC23).
+
+        Raises ModbusError when the device answers with an exception response. Paths without
+        an endpoint are never asked and cannot send it.
+        """
+        return None
+
+
+class HaHubTransport(ModbusTransport):
+    """Path through the Home Assistant Modbus integration hub."""
+
+    name = PATH_HA_HUB
+
+    def __init__(self, resolve: Callable[[], Optional[Any]], unit: int) -> None:
+        super().__init__(unit)
+        self._resolve = resolve
+
+    def available(self) -> bool:
+        return self._resolve() is not None
+
+    async def read_registers(self, table: str, address: int, count: int) -> list[int] | None:
+        result = await self._resolve().async_pb_call(self.unit, address, count, table)
+        _LOGGER.debug("HA hub read %s result for %s: %s", table, address, getattr(result, "registers", result))
+        if result and hasattr(result, "registers") and result.registers:
+            return _validated_words(result.registers, count, address)
+        return None
+
+    async def write_register(self, address: int, value: int) -> bool:
+        result = await self._resolve().async_pb_call(self.unit, address, int(value), "write_register")
+        _LOGGER.debug("HA hub write_register result for %s: %s", address, result)
+        return bool(result)
+
+    async def write_registers(self, address: int, values: list[int]) -> bool:
+        result = await self._resolve().async_pb_call(self.unit, address, list(values), "write_registers")
+        _LOGGER.debug("HA hub write_registers result for %s: %s", address, result)
+        return bool(result)
+
+    async def write_coil(self, address: int, value: bool) -> bool:
+        result = await self._resolve().async_pb_call(self.unit, address, bool(value), "write_coil")
+        _LOGGER.debug("HA hub write_coil result for %s: %s", address, result)
+        return bool(result)
+
+
+class PipelinedTcpTransport(ModbusTransport):
+    """Direct Modbus TCP path on a connection shared per gateway, pipelined at max_in_flight > 1."""
+
+    name = PATH_DIRECT
+
+    def __init__(self, host: str, port: int, unit: int, max_in_flight: int, timeout: float = DEFAULT_TCP_TIMEOUT) -> None:
+        super().__init__(unit)
+        self.host = host
+        self.port = int(port)
+        self.timeout = timeout
+        self.endpoint = f"{host}:{self.port}/{self.unit}"
+        self._connection = acquire_connection(host, self.port, max_in_flight)
+
+    @property
+    def max_in_flight(self) -> int:
+        return self._connection.depth
+
+    async def read_registers(self, table: str, address: int, count: int) -> list[int] | None:
+        try:
+            words = await self._connection.read_registers(self.unit, table, int(address), int(count), self.timeout)
+        except (asyncio.TimeoutError, OSError, ValueError) as ex:
+            _LOGGER.debug("Pipelined read %s at %s failed: %s", table, address, ex)
+            return None
+        return _validated_words(words, count, address)
+
+    async def write_register(self, address: int, value: int) -> bool:
+        return await self._write(self._connection.write_register(self.unit, int(address), int(value), self.timeout), address)
+
+    async def write_registers(self, address: int, values: list[int]) -> bool:
+        return await self._write(self._connection.write_registers(self.unit, int(address), list(values), self.timeout), address)
+
+    async def write_coil(self, address: int, value: bool) -> bool:
+        return await self._write(self._connection.write_coil(self.unit, int(address), bool(value), self.timeout), address)
+
+    async def read_write_registers(self, read_address: int, read_count: int, write_address: int, values: list[int]) -> list[int] | None:
+        try:
+            words = await self._connection.read_write_registers(
+                self.unit, int(read_address), int(read_count), int(write_address), list(values), self.timeout
+            )
+        except (asyncio.TimeoutError, OSError, ValueError) as ex:
+            _LOGGER.debug("Pipelined read/write at %s failed: %s", write_address, ex)
+            return None
+        return _validated_words(words, read_count, read_address)
+
+    async def _write(self, request, address: int) -> bool:
+        try:
+            await request
+        except (asyncio.TimeoutError, OSError, ModbusError, ValueError) as ex:
+            _LOGGER.warning("Pipelined write at %s failed: %s", address, ex)
+            return False
+        return True
+
+    def close(self) -> None:
+        release_connection(self._connection)
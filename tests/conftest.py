@@ -0,0 +1,91 @@
+"""Shared test setup: make custom_components importable from the repository root."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from unittest.mock import MagicMock  # noqa: E402
+
+import pytest  # noqa: E402
+
+from custom_components.ha_atrea_recuperation import hub as hub_module  # noqa: E402
+from custom_components.ha_atrea_recuperation.const import PATH_DIRECT, TABLE_HOLDING  # noqa: E402
+from custom_components.ha_atrea_recuperation.register_map import select_register_map  # noqa: E402
+from custom_components.ha_atrea_recuperation.transport import ModbusTransport, PathHealth  # noqa: E402
+
+
+class FakeClock:
+    """Monotonic clock the tests advance by hand."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the hub's time module with a clock the test controls."""
+    fake = FakeClock()
+    monkeypatch.setattr(hub_module, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def hub(clock):
+    """Hub on the default register map, without a device or a running Home Assistant."""
+    hub = hub_module.HaAtreaModbusHub(MagicMock(), "Test")
+    hub._map = select_register_map(None)
+    return hub
+
+
+class DeviceTransport(ModbusTransport):
+    """Device answering every read with the low byte of the register address.
+
+    Each read takes read_time seconds on the test clock; reads of the blocks in fail return
+    None. Read blocks are recorded as (table, address, count). Written holding words are read
+    back as written unless apply_writes is False.
+    """
+
+    name = PATH_DIRECT
+
+    def __init__(self, clock: FakeClock) -> None:
+        super().__init__(1)
+        self.clock = clock
+        self.read_time = 0.0
+        self.fail: set[tuple[str, int, int]] = set()
+        self.reads: list[tuple[str, int, int]] = []
+        self.holding: dict[int, int] = {}
+        self.apply_writes = True
+
+    async def read_registers(self, table, address, count):
+        self.clock.now += self.read_time
+        self.reads.append((table, address, count))
+        if (table, address, count) in self.fail:
+            return None
+        words = self.holding if table == TABLE_HOLDING else {}
+        return [words.get(address + offset, (address + offset) & 0xFF) for offset in range(count)]
+
+    async def write_register(self, address, value):
+        return await self.write_registers(address, [value])
+
+    async def write_registers(self, address, values):
+        if self.apply_writes:
+            self.holding.update((address + offset, value) for offset, value in enumerate(values))
+        return True
+
+    async def write_coil(self, address, value):
+        return True
+
+
+@pytest.fixture
+def device(hub, clock, monkeypatch):
+    """Poll the hub fixture from a DeviceTransport instead of a Modbus connection."""
+    monkeypatch.setattr(hub_module, "async_call_later", lambda *args: lambda: None)
+    transport = DeviceTransport(clock)
+    hub._unsupported_loaded = True
+    hub._transports = {PATH_DIRECT: transport}
+    hub._health = {PATH_DIRECT: PathHealth()}
+    return transport
@@ -0,0 +1,31 @@
+"""Tests for the burst polls after a write."""
+
+import asyncio
+
+from custom_components.ha_atrea_recuperation.const import TABLE_HOLDING, TABLE_INPUT
+
+
+def test_burst_poll_decodes_only_the_burst_registers(hub, clock, monkeypatch):
+    monkeypatch.setattr("custom_components.ha_atrea_recuperation.hub.async_call_later", lambda *args: None)
+    read = []
+
+    async def read_block(block):
+        read.append(block)
+        hub._store_words(block.table, block.address, [block.address % 50] * block.count)
+        return True
+
+    hub._store_words(TABLE_INPUT, 3200, [100, 0])
+    hub._decode()
+    clock.now += 10
+    hub._store_words(TABLE_INPUT, 3200, [0x0064, 0x0007])
+    hub._decode()
+
+    hub._read_block = read_block
+    hub._burst_keys = {(TABLE_HOLDING, 1004)}
+    hub._burst_until = clock.now - 1
+    clock.now += 1
+    asyncio.run(hub._async_burst_poll(None))
+
+    assert read and all(block.address < 3200 for block in read)
+    assert hub._data[(TABLE_HOLDING, 1004)] == 1004 % 50
+    assert hub._data[(TABLE_INPUT, 3200)] == 100
@@ -0,0 +1,78 @@
+"""Tests for Modbus traffic capture and replay."""
+
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+import pytest
+
+from custom_components.ha_atrea_recuperation.capture import ReplayTransport, TrafficCapture
+from custom_components.ha_atrea_recuperation.const import PATH_DIRECT, TABLE_HOLDING
+from custom_components.ha_atrea_recuperation.modbus_tcp import ModbusError
+
+
+def _hass():
+    hass = MagicMock()
+
+    async def _executor(func, *args):
+        return func(*args)
+
+    hass.async_add_executor_job = _executor
+    return hass
+
+
+def test_records_are_compact_json_lines(tmp_path):
+    path = str(tmp_path / "capture.jsonl")
+    capture = TrafficCapture(_hass(), path)
+    capture.record(PATH_DIRECT, 1, "read_registers", (TABLE_HOLDING, 1001, 2), [1, 2], 0.01234)
+    capture.record(PATH_DIRECT, 1, "write_register", (1001, 5), False, 0.5, "timeout")
+    capture.record(PATH_DIRECT, 1, "read_registers", (TABLE_HOLDING, 1003, 1), None, 0.02, exception=ModbusError(3, 2))
+    asyncio.run(capture.async_flush())
+
+    lines = (tmp_path / "capture.jsonl").read_text().splitlines()
+    assert " " not in lines[0]
+    records = [json.loads(line) for line in lines]
+    assert records[0]["p"] == PATH_DIRECT and records[0]["u"] == 1
+    assert records[0]["op"] == "read_registers" and records[0]["a"] == [TABLE_HOLDING, 1001, 2]
+    assert records[0]["r"] == [1, 2] and records[0]["d"] == 0.0123 and "e" not in records[0]
+    assert records[1]["r"] is False and records[1]["e"] == "timeout"
+    assert records[2]["x"] == [3, 2] and records[2]["e"] == "Modbus exception 2 for function 3"
+
+
+def test_capture_rotates_and_keeps_the_configured_backups(tmp_path):
+    path = str(tmp_path / "capture.jsonl")
+    capture = TrafficCapture(_hass(), path, max_bytes=10, backups=2)
+    for value in range(4):
+        capture.record(PATH_DIRECT, 1, "write_register", (1001, value), True, 0.0)
+        asyncio.run(capture.async_flush())
+
+    kept = {name: json.loads(open(tmp_path / name).read())["a"][1] for name in ("capture.jsonl", "capture.jsonl.1", "capture.jsonl.2")}
+    assert kept == {"capture.jsonl": 3, "capture.jsonl.1": 2, "capture.jsonl.2": 1}
+    assert not (tmp_path / "capture.jsonl.3").exists()
+
+
+def test_replay_answers_with_the_captured_responses_in_order(tmp_path):
+    path = str(tmp_path / "capture.jsonl")
+    capture = TrafficCapture(_hass(), path, max_bytes=10, backups=1)
+    capture.record(PATH_DIRECT, 1, "read_registers", (TABLE_HOLDING, 1001, 2), [1, 2], 0.0)
+    asyncio.run(capture.async_flush())
+    capture.record(PATH_DIRECT, 1, "read_registers", (TABLE_HOLDING, 1001, 2), [3, 4], 0.0)
+    capture.record(PATH_DIRECT, 1, "write_register", (1001, 5), True, 0.0)
+    capture.record(PATH_DIRECT, 1, "read_registers", (TABLE_HOLDING, 1003, 1), None, 0.0, exception=ModbusError(3, 2))
+    asyncio.run(capture.async_flush())
+
+    replay = ReplayTransport(_hass(), path, 1, speed=0, backups=1)
+
+    async def _run():
+        reads = [await replay.read_registers(TABLE_HOLDING, 1001, 2) for _ in range(3)]
+        written = await replay.write_register(1001, 5)
+        missing = await replay.write_register(1001, 6)
+        with pytest.raises(ModbusError) as err:
+            await replay.read_registers(TABLE_HOLDING, 1003, 1)
+        return reads, written, missing, err.value
+
+    reads, written, missing, error = asyncio.run(_run())
+    # the rotated file is replayed first, and the responses start over when they run out
+    assert reads == [[1, 2], [3, 4], [1, 2]]
+    assert written is True and missing is False
+    assert (error.function, error.code) == (3, 2)
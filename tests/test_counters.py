@@ -0,0 +1,98 @@
+"""Tests for atomic multi-register values and monotonic counter validation."""
+
+from collections import defaultdict
+from unittest.mock import MagicMock
+
+from homeassistant.components.sensor import SensorStateClass
+
+from custom_components.ha_atrea_recuperation.const import TABLE_INPUT
+from custom_components.ha_atrea_recuperation.decoder import decode_registers
+from custom_components.ha_atrea_recuperation.sensor import HaAtreaSensor, _build_sensors
+
+KEY = (TABLE_INPUT, 3200)  # M1 hours: uint32, low word first, max_rate 1 h per hour
+META = {"type": "uint32", "word_order": "low_first", "monotonic": True, "max_rate": 1}
+
+
+def test_partial_multi_register_value_is_not_decoded():
+    entries = [(3200, 2, META)]
+    assert decode_registers({3200: 5}, entries) == {}
+    assert decode_registers({3200: 5, 3201: 0}, entries) == {3200: 5}
+
+
+def test_first_value_and_plausible_growth_are_accepted(hub, clock):
+    assert hub._accept_counter(KEY, META, 100) == 100
+    hub._data[KEY] = 100
+    clock.now += 3600
+    assert hub._accept_counter(KEY, META, 102) == 102
+
+
+def test_implausible_jump_is_held_back_until_confirmed(hub, clock):
+    hub._data[KEY] = hub._accept_counter(KEY, META, 100)
+    clock.now += 10
+    assert hub._accept_counter(KEY, META, 458852) == 100
+    assert hub._counter_pending[KEY] == 458852
+    clock.now += 10
+    assert hub._accept_counter(KEY, META, 458852) == 458852
+    assert KEY not in hub._counter_pending
+
+
+def test_single_bad_read_is_dropped(hub, clock):
+    hub._data[KEY] = hub._accept_counter(KEY, META, 100)
+    clock.now += 10
+    assert hub._accept_counter(KEY, META, 458852) == 100
+    clock.now += 10
+    assert hub._accept_counter(KEY, META, 100) == 100
+    assert KEY not in hub._counter_pending
+
+
+def test_reset_is_held_back_until_confirmed(hub, clock):
+    hub._data[KEY] = hub._accept_counter(KEY, META, 100)
+    clock.now += 10
+    assert hub._accept_counter(KEY, META, 0) == 100
+    clock.now += 10
+    assert hub._accept_counter(KEY, META, 0) == 0
+
+
+def test_decode_without_a_new_read_does_not_confirm_a_held_back_counter(hub, clock):
+    hub._store_words(TABLE_INPUT, 3200, [100, 0])
+    hub._decode()
+    assert hub._data[KEY] == 100
+
+    clock.now += 10
+    hub._store_words(TABLE_INPUT, 3200, [0x0064, 0x0007])  # 458852
+    hub._decode()
+    assert hub._data[KEY] == 100
+    assert hub._counter_pending[KEY] == 458852
+
+    # a poll of other registers only (e.g. the zone triggers) decodes again
+    clock.now += 10
+    hub._store_words(TABLE_INPUT, 7103, [0, 0, 0])
+    hub._decode()
+    hub._decode()
+    assert hub._data[KEY] == 100
+
+    # the next read of the counter confirms it
+    clock.now += 10
+    hub._store_words(TABLE_INPUT, 3200, [0x0064, 0x0007])
+    hub._decode()
+    assert hub._data[KEY] == 458852
+
+
+def test_reread_of_the_old_value_drops_a_held_back_counter(hub, clock):
+    hub._store_words(TABLE_INPUT, 3200, [100, 0])
+    hub._decode()
+    clock.now += 10
+    hub._store_words(TABLE_INPUT, 3200, [0x0064, 0x0007])
+    hub._decode()
+    clock.now += 10
+    hub._store_words(TABLE_INPUT, 3200, [100, 0])
+    hub._decode()
+    assert hub._data[KEY] == 100
+    assert KEY not in hub._counter_pending
+
+
+def test_hour_counters_are_total_increasing_sensors(hub):
+    sensors = [entity for entity in _build_sensors(defaultdict(MagicMock), hub, "Test") if isinstance(entity, HaAtreaSensor)]
+
+    counters = {sensor._key for sensor in sensors if sensor.state_class == SensorStateClass.TOTAL_INCREASING}
+    assert counters == {(TABLE_INPUT, 3200), (TABLE_INPUT, 3202), (TABLE_INPUT, 3204)}
@@ -0,0 +1,107 @@
+"""Tests for decoding and encoding register words by register type."""
+
+import pytest
+
+from custom_components.ha_atrea_recuperation.const import ENUM_OPTIONS
+from custom_components.ha_atrea_recuperation.decoder import (
+    decode_registers,
+    decode_value,
+    encode_value,
+    register_count,
+)
+
+
+@pytest.mark.parametrize(
+    ("words", "meta", "expected"),
+    [
+        ([0xFFFF], {"type": "uint16"}, 65535),
+        ([0xFFFF], {"type": "int16"}, -1),
+        ([0xFF38], {"type": "int16", "scale": 10}, -20.0),
+        ([235], {"type": "int16", "scale": 10}, 23.5),
+        ([0x0001, 0x0002], {"type": "uint32"}, 0x00010002),
+        ([0x0002, 0x0001], {"type": "uint32", "word_order": "low_first"}, 0x00010002),
+        ([0xFFFF, 0xFFFE], {"type": "int32"}, -2),
+        ([0x41BC, 0x0000], {"type": "float32"}, 23.5),
+        ([0x0000, 0x41BC], {"type": "float32", "word_order": "low_first"}, 23.5),
+    ],
+)
+def test_decode_numbers(words, meta, expected):
+    assert decode_value(words, meta) == expected
+
+
+def test_decode_float32_nan_is_none():
+    assert decode_value([0x7FC0, 0x0000], {"type": "float32"}) is None
+
+
+def test_decode_string_stops_at_nul_and_non_printable():
+    meta = {"type": "string", "count": 6}
+    assert decode_value([ord("R"), ord("D"), ord("5"), 0, ord("X"), ord("Y")], meta) == "RD5"
+    assert decode_value([ord("R"), 7, ord("D"), 0, 0, 0], meta) == "R"
+    assert decode_value([ord("R"), 7, ord("D"), 0, 0, 0], {**meta, "strict": True}) is None
+    assert decode_value([0] * 6, meta) is None
+
+
+def test_decode_enum_uses_named_options():
+    meta = {"type": "enum", "options": "operation_mode"}
+    assert decode_value([2], meta, ENUM_OPTIONS) == "Ventilation"
+    assert decode_value([42], meta, ENUM_OPTIONS) == "42"
+
+
+def test_decode_bitfield():
+    meta = {"type": "bitfield", "bits": {"0": "filter", "3": "frost"}}
+    assert decode_value([0b1001], meta) == {"filter": True, "frost": True}
+    assert decode_value([0b0001], meta) == {"filter": True, "frost": False}
+
+
+def test_register_count():
+    assert register_count({}) == 1
+    assert register_count({"type": "uint32"}) == 2
+    assert register_count({"type": "float32"}) == 2
+    assert register_count({"type": "string", "count": 8}) == 8
+
+
+def test_decode_registers_decodes_a_table():
+    entries = [
+        (1000, 1, {"type": "int16", "scale": 10}),
+        (1001, 2, {"type": "uint32"}),
+    ]
+    raw = {1000: 215, 1001: 0, 1002: 7}
+    assert decode_registers(raw, entries) == {1000: 21.5, 1001: 7}
+
+
+@pytest.mark.parametrize(
+    ("value", "meta", "words"),
+    [
+        (23.5, {"type": "int16", "scale": 10}, [235]),
+        (-2.0, {"type": "int16", "scale": 10}, [0xFFEC]),
+        (70, {"type": "uint16"}, [70]),
+        (0x00010002, {"type": "uint32"}, [0x0001, 0x0002]),
+        (0x00010002, {"type": "uint32", "word_order": "low_first"}, [0x0002, 0x0001]),
+        (-2, {"type": "int32"}, [0xFFFF, 0xFFFE]),
+        (23.5, {"type": "float32"}, [0x41BC, 0x0000]),
+    ],
+)
+def test_encode_round_trips(value, meta, words):
+    assert encode_value(value, meta) == words
+    assert decode_value(words, meta) == value
+
+
+def test_encode_enum_by_label_or_code():
+    meta = {"type": "enum", "options": "operation_mode"}
+    assert encode_value("Circulation", meta, ENUM_OPTIONS) == [4]
+    assert encode_value(1, meta, ENUM_OPTIONS) == [1]
+
+
+@pytest.mark.parametrize(
+    ("value", "meta"),
+    [
+        (70000, {"type": "uint16"}),
+        (-1, {"type": "uint16"}),
+        (3276.8, {"type": "int16", "scale": 10}),
+        ("x", {"type": "string", "count": 2}),
+        (1, {"type": "bitfield", "bits": {}}),
+    ],
+)
+def test_encode_rejects_unrepresentable_values(value, meta):
+    with pytest.raises(ValueError):
+        encode_value(value, meta)
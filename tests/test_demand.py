@@ -0,0 +1,73 @@
+"""Tests for the read plan built from the registers entities demand."""
+
+import asyncio
+
+from custom_components.ha_atrea_recuperation.const import TABLE_HOLDING, TABLE_INPUT, TIER_SLOW
+
+INDOOR = (TABLE_INPUT, 1104)
+MODE = (TABLE_HOLDING, 1001)
+COUNTER = (TABLE_INPUT, 3200)
+
+
+def _planned(hub):
+    """Return the (table, address) of every register word the read plan covers."""
+    return {(block.table, word) for block in hub._plan for word in range(block.address, block.address + block.count)}
+
+
+def test_demand_changes_mark_the_plan_dirty(hub):
+    hub._build_plan()
+    assert not hub._plan_dirty
+
+    remove = hub.register_demand([INDOOR])
+    assert hub._plan_dirty
+    hub._build_plan()
+    assert not hub._plan_dirty
+
+    remove()
+    assert hub._plan_dirty
+
+
+def test_plan_covers_only_the_demanded_registers(hub):
+    hub._build_plan()
+    whole_map = _planned(hub)
+    assert {INDOOR, MODE, COUNTER} <= whole_map
+
+    remove_indoor = hub.register_demand([INDOOR])
+    hub.register_demand([MODE])
+    hub._build_plan()
+    planned = _planned(hub)
+    assert {INDOOR, MODE} <= planned
+    assert COUNTER not in planned
+    assert len(planned) < len(whole_map)
+
+    remove_indoor()
+    hub._build_plan()
+    assert INDOOR not in _planned(hub)
+    assert MODE in _planned(hub)
+
+
+def test_register_demanded_twice_stays_planned_until_both_are_removed(hub):
+    remove_first = hub.register_demand([INDOOR, MODE])
+    remove_second = hub.register_demand([INDOOR])
+
+    remove_first()
+    hub._build_plan()
+    assert INDOOR in _planned(hub)
+    assert MODE not in _planned(hub)
+
+    remove_second()
+    hub._build_plan()
+    # without any demand the whole map is read again
+    assert {INDOOR, MODE, COUNTER} <= _planned(hub)
+
+
+def test_new_demand_is_read_in_the_next_poll_whatever_its_tier(hub, device):
+    hub.register_demand([INDOOR])
+    asyncio.run(hub.async_update())
+    asyncio.run(hub.async_update())
+    assert COUNTER not in [read[:2] for read in device.reads]
+
+    hub.register_demand([COUNTER])
+    asyncio.run(hub.async_update())
+    assert TIER_SLOW in hub.polled_tiers
+    assert COUNTER in [read[:2] for read in device.reads]
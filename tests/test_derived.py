@@ -0,0 +1,34 @@
+"""Tests for the derived values the hub computes from input registers."""
+
+import pytest
+
+from custom_components.ha_atrea_recuperation.hub import _compute_derived
+
+# outdoor 0 °C, supply 18 °C, extract 22 °C, return 4 °C, supply 200 and extract 180 m³/h
+VALUES = {1101: 0.0, 1102: 18.0, 1103: 22.0, 1105: 4.0, 1109: 200.0, 1110: 180.0}
+
+
+def test_supply_efficiency():
+    assert _compute_derived("supply_efficiency", VALUES) == pytest.approx(81.8, abs=0.05)
+
+
+def test_extract_efficiency():
+    assert _compute_derived("extract_efficiency", VALUES) == pytest.approx(81.8, abs=0.05)
+
+
+def test_efficiency_unknown_for_small_temperature_difference():
+    values = {**VALUES, 1101: 21.5}
+    assert _compute_derived("supply_efficiency", values) is None
+
+
+def test_recovered_heat_power():
+    assert _compute_derived("recovered_heat_power", VALUES) == pytest.approx(0.335 * 200 * 18, abs=0.05)
+
+
+def test_flow_imbalance():
+    assert _compute_derived("flow_imbalance", VALUES) == 20.0
+    assert _compute_derived("flow_imbalance_ratio", VALUES) == pytest.approx(11.1)
+
+
+def test_flow_imbalance_ratio_without_extract_flow():
+    assert _compute_derived("flow_imbalance_ratio", {**VALUES, 1110: 0.0}) is None
@@ -0,0 +1,83 @@
+"""Tests for the unit discovery scan."""
+
+import asyncio
+import struct
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from custom_components.ha_atrea_recuperation.discovery import async_scan_units
+
+MBAP = struct.Struct(">HHHB")
+IDENTITY = [ord(c) for c in "123456789"] + [ord(c) for c in "RD5"] + [0] * 8
+
+
+class ScanGateway:
+    """Modbus TCP server where only the given units answer, with the identity block."""
+
+    def __init__(self, units):
+        self.units = set(units)
+        self.connections = 0
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                tid, _, length, unit = MBAP.unpack(await reader.readexactly(MBAP.size))
+                pdu = await reader.readexactly(length - 1)
+                if unit not in self.units:
+                    continue
+                function, _, count = struct.unpack(">BHH", pdu[:5])
+                response = struct.pack(f">BB{count}H", function, count * 2, *IDENTITY[:count])
+                writer.write(MBAP.pack(tid, 0, len(response) + 1, unit) + response)
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+
+def test_host_scan_uses_one_connection():
+    async def scenario():
+        gateway = ScanGateway({3, 7})
+        port = await gateway.start()
+        try:
+            found = await async_scan_units(MagicMock(), range(1, 11), hosts=["127.0.0.1"], port=port, timeout=0.2, max_in_flight=4)
+            return found, gateway.connections
+        finally:
+            gateway.server.close()
+
+    found, connections = asyncio.run(scenario())
+    assert [(unit.unit, unit.serial, unit.model) for unit in found] == [(3, "123456789", "RD5"), (7, "123456789", "RD5")]
+    assert connections == 1
+
+
+def test_unreachable_host_is_skipped():
+    async def scenario():
+        server = await asyncio.start_server(lambda reader, writer: None, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        server.close()
+        await server.wait_closed()
+        return await async_scan_units(MagicMock(), range(1, 248), hosts=["127.0.0.1"], port=port, timeout=0.2)
+
+    assert asyncio.run(scenario()) == []
+
+
+def test_hub_scan_runs_one_probe_at_a_time_and_times_only_the_call():
+    calls = {"active": 0, "most": 0}
+
+    async def async_pb_call(unit, address, count, table):
+        calls["active"] += 1
+        calls["most"] = max(calls["most"], calls["active"])
+        await asyncio.sleep(0.05)
+        calls["active"] -= 1
+        return SimpleNamespace(registers=IDENTITY[:count])
+
+    hass = MagicMock()
+    hass.data = {"modbus": {"atrea": SimpleNamespace(async_pb_call=async_pb_call)}}
+    found = asyncio.run(async_scan_units(hass, range(1, 7), modbus_hub="atrea", timeout=0.1))
+
+    assert [unit.unit for unit in found] == [1, 2, 3, 4, 5, 6]
+    assert calls["most"] == 1
@@ -0,0 +1,102 @@
+"""Tests for the holding register write limiter."""
+
+import asyncio
+
+import pytest
+
+from custom_components.ha_atrea_recuperation import limiter
+from custom_components.ha_atrea_recuperation.limiter import TokenBucket, WriteThrottled
+
+
+@pytest.fixture
+def limiter_clock(monkeypatch, clock):
+    monkeypatch.setattr(limiter, "time", clock)
+    return clock
+
+
+def test_bucket_allows_a_burst_then_one_write_per_interval(limiter_clock):
+    bucket = TokenBucket(3, 20.0)
+    assert [bucket.take() for _ in range(4)] == [True, True, True, False]
+    assert bucket.delay() == pytest.approx(20.0)
+    limiter_clock.now += 10
+    assert not bucket.available()
+    assert bucket.delay() == pytest.approx(10.0)
+    limiter_clock.now += 10
+    assert bucket.available()
+    assert bucket.take()
+    assert not bucket.take()
+
+
+def test_bucket_refills_up_to_capacity(limiter_clock):
+    bucket = TokenBucket(2, 5.0)
+    bucket.take()
+    bucket.take()
+    limiter_clock.now += 1000
+    assert [bucket.take() for _ in range(3)] == [True, True, False]
+
+
+def test_bucket_without_interval_never_limits(limiter_clock):
+    bucket = TokenBucket(1, 0)
+    assert all(bucket.take() for _ in range(10))
+    assert bucket.delay() == 0.0
+
+
+def _writing_hub(hub, monkeypatch):
+    written = []
+    timers = []
+
+    async def write_read_back(address, words):
+        written.append((address, words))
+        return True
+
+    monkeypatch.setattr("custom_components.ha_atrea_recuperation.hub.async_call_later", lambda hass, delay, action: timers.append(delay) or (lambda: None))
+    hub._write_read_back = write_read_back
+    return written, timers
+
+
+def test_buckets_are_kept_per_register_word(hub, limiter_clock, monkeypatch):
+    written, timers = _writing_hub(hub, monkeypatch)
+
+    async def run():
+        for value in range(3):
+            assert await hub.write_registers(1000, [value, value])
+        # another word of the same read block has its own tokens
+        assert await hub.write_registers(1002, [7])
+        # the throttled write overlaps a word without tokens
+        assert await hub.write_registers(1001, [8, 9])
+
+    asyncio.run(run())
+    assert written == [(1000, [0, 0]), (1000, [1, 1]), (1000, [2, 2]), (1002, [7])]
+    assert hub._throttled_words == {1001: 8, 1002: 9}
+    assert hub.diagnostics["writes_throttled"] == 1
+    assert timers == [pytest.approx(20.0)]
+
+
+def test_throttled_words_are_written_with_the_newest_value(hub, limiter_clock, monkeypatch):
+    written, _ = _writing_hub(hub, monkeypatch)
+
+    async def run():
+        for value in range(5):
+            await hub.write_registers(1000, [value])
+        limiter_clock.now += 20
+        await hub._async_write_throttled()
+
+    asyncio.run(run())
+    assert written == [(1000, [0]), (1000, [1]), (1000, [2]), (1000, [4])]
+    assert hub._throttled_words == {}
+    assert hub.diagnostics["writes_applied"] == 4
+
+
+def test_write_without_defer_raises_instead_of_queuing(hub, limiter_clock, monkeypatch):
+    written, timers = _writing_hub(hub, monkeypatch)
+
+    async def run():
+        for value in range(3):
+            await hub.write_registers(1000, [value], defer=False)
+        with pytest.raises(WriteThrottled):
+            await hub.write_registers(1000, [3], defer=False)
+
+    asyncio.run(run())
+    assert len(written) == 3
+    assert hub._throttled_words == {}
+    assert timers == []
@@ -0,0 +1,148 @@
+"""Tests for pipelined Modbus TCP transaction matching and the strict fallback."""
+
+import asyncio
+import struct
+
+import pytest
+
+from custom_components.ha_atrea_recuperation.modbus_tcp import ModbusError, PipelinedConnection
+
+MBAP = struct.Struct(">HHHB")
+
+
+class FakeGateway:
+    """Modbus TCP server answering reads with the register address as value.
+
+    reverse: answer after `reverse` requests arrived, newest first.
+    tid_offset: answer with a transaction ID shifted by this much.
+    drop: number of leading requests to leave unanswered.
+    silent_units: units that never answer.
+    """
+
+    def __init__(self, reverse=0, tid_offset=0, drop=0, silent_units=()):
+        self.reverse = reverse
+        self.tid_offset = tid_offset
+        self.drop = drop
+        self.silent_units = set(silent_units)
+        self.server = None
+
+    async def start(self) -> int:
+        self.server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    def stop(self) -> None:
+        self.server.close()
+
+    async def _handle(self, reader, writer):
+        held = []
+        try:
+            while True:
+                tid, _, length, unit = MBAP.unpack(await reader.readexactly(MBAP.size))
+                pdu = await reader.readexactly(length - 1)
+                if unit in self.silent_units:
+                    continue
+                if self.drop:
+                    self.drop -= 1
+                    continue
+                function, address, count = struct.unpack(">BHH", pdu[:5])
+                if address == 0xFFFF:
+                    response = struct.pack(">BB", function | 0x80, 2)
+                else:
+                    words = [address + i for i in range(count)]
+                    response = struct.pack(f">BB{count}H", function, count * 2, *words)
+                frame = MBAP.pack((tid + self.tid_offset) & 0xFFFF, 0, len(response) + 1, unit) + response
+                held.append(frame)
+                if len(held) >= max(1, self.reverse):
+                    for frame in reversed(held):
+                        writer.write(frame)
+                    held.clear()
+                    await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_out_of_order_responses_are_matched_by_transaction_id():
+    async def scenario():
+        gateway = FakeGateway(reverse=4)
+        connection = PipelinedConnection("127.0.0.1", await gateway.start(), 4)
+        try:
+            results = await asyncio.gather(
+                *(connection.read_registers(1, "input", address, 2, 2.0) for address in (1000, 1100, 1200, 1300))
+            )
+            return results, connection.strict
+        finally:
+            connection.close()
+            gateway.stop()
+
+    results, strict = run(scenario())
+    assert results == [[1000, 1001], [1100, 1101], [1200, 1201], [1300, 1301]]
+    assert not strict
+
+
+def test_exception_response_raises_modbus_error():
+    async def scenario():
+        gateway = FakeGateway()
+        connection = PipelinedConnection("127.0.0.1", await gateway.start(), 2)
+        try:
+            await connection.read_registers(1, "input", 0xFFFF, 1, 2.0)
+        finally:
+            connection.close()
+            gateway.stop()
+
+    with pytest.raises(ModbusError) as err:
+        run(scenario())
+    assert err.value.code == 2
+
+
+def test_unknown_transaction_id_falls_back_to_strict():
+    async def scenario():
+        gateway = FakeGateway(tid_offset=1000)
+        connection = PipelinedConnection("127.0.0.1", await gateway.start(), 4)
+        try:
+            with pytest.raises(asyncio.TimeoutError):
+                await connection.read_registers(1, "input", 1000, 1, 0.3)
+            return connection.strict, connection.depth
+        finally:
+            connection.close()
+            gateway.stop()
+
+    assert run(scenario()) == (True, 1)
+
+
+def test_dropped_request_of_an_answering_unit_falls_back_to_strict():
+    async def scenario():
+        gateway = FakeGateway(drop=1)
+        connection = PipelinedConnection("127.0.0.1", await gateway.start(), 4)
+        try:
+            first = asyncio.ensure_future(connection.read_registers(1, "input", 1000, 1, 0.5))
+            await asyncio.sleep(0.05)
+            assert await connection.read_registers(1, "input", 1100, 1, 0.5) == [1100]
+            with pytest.raises(asyncio.TimeoutError):
+                await first
+            return connection.strict
+        finally:
+            connection.close()
+            gateway.stop()
+
+    assert run(scenario()) is True
+
+
+def test_silent_unit_does_not_fall_back_to_strict():
+    async def scenario():
+        gateway = FakeGateway(silent_units={9})
+        connection = PipelinedConnection("127.0.0.1", await gateway.start(), 4)
+        try:
+            silent = asyncio.ensure_future(connection.read_registers(9, "input", 1000, 1, 0.3))
+            assert await connection.read_registers(1, "input", 1100, 1, 0.5) == [1100]
+            with pytest.raises(asyncio.TimeoutError):
+                await silent
+            return connection.strict
+        finally:
+            connection.close()
+            gateway.stop()
+
+    assert run(scenario()) is False
@@ -0,0 +1,90 @@
+"""Tests for the optimistic overlay of written holding registers."""
+
+import asyncio
+
+from custom_components.ha_atrea_recuperation import limiter
+from custom_components.ha_atrea_recuperation.const import (
+    OPTIMISTIC_TIMEOUT,
+    TABLE_HOLDING,
+    WRITE_RATE_BURST,
+    WRITE_RATE_INTERVAL,
+)
+
+KEY = (TABLE_HOLDING, 1002)
+
+
+def _published(hub):
+    """Collect the snapshots the hub publishes between polls; the last one is shown."""
+    snapshots = []
+    hub.set_update_listener(lambda snapshot, tiers: snapshots.append(snapshot))
+    return snapshots
+
+
+def test_unmapped_written_words_get_no_overlay_entry(hub):
+    hub._set_optimistic(1006, [5, 6, 7])
+
+    assert hub._overlay_raw == {1006: 5}
+    assert set(hub._overlay_words) == {1006}
+
+
+def test_read_confirming_the_write_clears_the_overlay(hub):
+    hub._set_optimistic(1006, [5, 6, 7])
+    hub._store_words(TABLE_HOLDING, 1006, [5, 6, 7])
+
+    assert hub._overlay == {}
+    assert hub._overlay_raw == {}
+    assert hub._overlay_words == {}
+
+
+def test_read_back_matching_the_write_confirms_the_value(hub, device):
+    published = _published(hub)
+    assert asyncio.run(hub.write_holding(1002, 215))
+
+    # published at once from the overlay, then confirmed by the read-back
+    assert published[0][KEY] == 21.5 and published[0].is_pending(KEY)
+    snapshot = published[-1]
+    assert snapshot[KEY] == 21.5
+    assert not snapshot.is_pending(KEY)
+    assert hub._overlay_deadline == {}
+
+
+def test_value_reported_differently_is_rolled_back_after_the_deadline(hub, clock, device, caplog):
+    device.apply_writes = False
+    published = _published(hub)
+    assert asyncio.run(hub.write_holding(1002, 215))
+
+    # the device may apply a write late: the value stays pending until the deadline
+    assert published[-1][KEY] == 21.5 and published[-1].is_pending(KEY)
+    assert asyncio.run(hub.async_update()).is_pending(KEY)
+    assert "was written as" not in caplog.text
+
+    clock.now += OPTIMISTIC_TIMEOUT
+    snapshot = asyncio.run(hub.async_update())
+    assert snapshot[KEY] == 23.4
+    assert not snapshot.is_pending(KEY)
+    assert any(record.levelname == "WARNING" and "was written as 21.5" in record.getMessage() for record in caplog.records)
+
+
+def test_throttled_words_are_not_reconciled_until_they_are_written(hub, clock, device, monkeypatch):
+    monkeypatch.setattr(limiter, "time", clock)
+    device.apply_writes = False
+    published = _published(hub)
+
+    async def run():
+        for value in range(WRITE_RATE_BURST):
+            await hub.write_holding(1002, 200 + value)
+        device.apply_writes = True
+        await hub.write_holding(1002, 215)
+
+    asyncio.run(run())
+    assert hub._throttled_words == {1002: 215}
+
+    # reads showing another value neither confirm nor roll back a value not sent yet
+    clock.now += OPTIMISTIC_TIMEOUT
+    snapshot = asyncio.run(hub.async_update())
+    assert snapshot[KEY] == 21.5 and snapshot.is_pending(KEY)
+
+    clock.now += WRITE_RATE_INTERVAL
+    asyncio.run(hub._async_write_throttled())
+    assert hub._throttled_words == {}
+    assert published[-1][KEY] == 21.5 and not published[-1].is_pending(KEY)
@@ -0,0 +1,59 @@
+"""Tests for the transport paths a hub is created with."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from homeassistant.core import Event, is_callback
+
+from custom_components.ha_atrea_recuperation import hub as hub_module
+from custom_components.ha_atrea_recuperation.const import PATH_DIRECT, PATH_HA_HUB
+from custom_components.ha_atrea_recuperation.transport import ModbusTransport
+
+
+def _hass(*hub_names):
+    hass = MagicMock()
+    hass.data = {"modbus": {name: MagicMock(spec=["async_pb_call"]) for name in hub_names}}
+    return hass
+
+
+def test_direct_host_has_no_ha_hub_path():
+    hub = hub_module.HaAtreaModbusHub(_hass("other"), "Test", host="192.0.2.1")
+    assert list(hub._transports) == [PATH_DIRECT]
+    assert hub._get_ha_modbus_hub() is None
+
+
+def test_named_hub_and_host_fail_over_between_both_paths():
+    hass = _hass("other", "atrea")
+    hub = hub_module.HaAtreaModbusHub(hass, "Test", host="192.0.2.1", modbus_hub_name="atrea")
+    assert set(hub._transports) == {PATH_HA_HUB, PATH_DIRECT}
+    assert hub._get_ha_modbus_hub() is hass.data["modbus"]["atrea"]
+
+
+def test_missing_named_hub_is_not_replaced_by_another():
+    hub = hub_module.HaAtreaModbusHub(_hass("other"), "Test", modbus_hub_name="atrea")
+    assert hub._get_ha_modbus_hub() is None
+
+
+def test_without_host_or_name_the_first_hub_is_used():
+    hass = _hass("first", "second")
+    hub = hub_module.HaAtreaModbusHub(hass, "Test")
+    assert list(hub._transports) == [PATH_HA_HUB]
+    assert hub._get_ha_modbus_hub() is hass.data["modbus"]["first"]
+
+
+def test_transport_missing_an_operation_cannot_be_created():
+    class ReadOnlyTransport(ModbusTransport):
+        async def read_registers(self, table, address, count):
+            return [0] * count
+
+    with pytest.raises(TypeError):
+        ReadOnlyTransport(1)
+
+
+def test_only_modbus_reload_calls_pass_the_event_filter():
+    reload = {"domain": "modbus", "service": "reload"}
+    assert is_callback(hub_module._is_modbus_reload)
+    assert hub_module._is_modbus_reload(reload)
+    assert hub_module._is_modbus_reload(Event("call_service", reload))
+    assert not hub_module._is_modbus_reload({"domain": "modbus", "service": "write_register"})
+    assert not hub_module._is_modbus_reload({"domain": "light", "service": "reload"})
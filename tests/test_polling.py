@@ -0,0 +1,169 @@
+"""Tests for the poll schedule: tiers, the poll budget, blocks carried to the next poll and the adaptive interval."""
+
+import asyncio
+from datetime import timedelta
+
+from custom_components.ha_atrea_recuperation.const import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_POLL_INTERVAL_MAX,
+    DEFAULT_POLL_INTERVAL_MIN,
+    POLL_BACKOFF_FACTOR,
+    POLL_BUDGET_RATIO,
+    POLL_SPEEDUP_FACTOR,
+    STALE_AFTER_POLLS,
+    TABLE_INPUT,
+    TIER_POLL_CYCLES,
+    TIER_SLOW,
+    TIER_STATIC,
+)
+
+COUNTERS = (TABLE_INPUT, 3200, 6)
+SW_VERSION = (TABLE_INPUT, 3100, 4)
+
+
+def _poll(hub, clock):
+    device_reads = hub._transports["direct"].reads
+    start = len(device_reads)
+    asyncio.run(hub.async_update())
+    clock.now += hub.poll_interval.total_seconds()
+    return device_reads[start:]
+
+
+def _blocks(blocks):
+    return [(block.table, block.address, block.count) for block in blocks]
+
+
+def _read_time_for(hub, blocks):
+    """Read time after which the poll budget runs out while the given number of blocks is read."""
+    return hub.poll_interval.total_seconds() * POLL_BUDGET_RATIO / blocks + 0.01
+
+
+def test_priority_blocks_are_read_even_after_the_budget_is_used_up(hub, clock, device):
+    device.read_time = hub.poll_interval.total_seconds()
+
+    reads = _poll(hub, clock)
+
+    priority, rotating = hub._tier_plan(hub.polled_tiers)
+    assert priority and rotating
+    assert reads == _blocks(priority)
+    assert hub.diagnostics["deferred_blocks"] == len(rotating)
+
+
+def test_rotation_resumes_at_the_first_block_left_out(hub, clock, device):
+    _poll(hub, clock)
+    # the following polls all read the tiers read in every poll
+    due = frozenset(tier for tier, cycles in TIER_POLL_CYCLES.items() if cycles == 1)
+    priority, rotating = (_blocks(blocks) for blocks in hub._tier_plan(due))
+    assert len(rotating) > 2
+
+    # the budget runs out after the priority blocks and the first rotating block
+    device.read_time = _read_time_for(hub, len(priority) + 1)
+    assert _poll(hub, clock) == priority + rotating[:1]
+    assert hub.diagnostics["deferred_blocks"] == len(rotating) - 1
+
+    device.read_time = _read_time_for(hub, len(priority) + 1)
+    assert _poll(hub, clock) == priority + rotating[1:2]
+
+    device.read_time = 0.0
+    assert _poll(hub, clock) == priority + rotating[2:] + rotating[:2]
+    assert hub.diagnostics["deferred_blocks"] == 0
+
+
+def test_first_poll_reads_every_tier_and_later_polls_skip_slow_ones(hub, clock, device):
+    first = _poll(hub, clock)
+    second = _poll(hub, clock)
+
+    assert COUNTERS in first and SW_VERSION in first
+    assert COUNTERS not in second and SW_VERSION not in second
+    assert hub.polled_tiers.isdisjoint({TIER_SLOW, TIER_STATIC})
+
+
+def test_blocks_deferred_by_the_budget_are_read_in_the_next_poll(hub, clock, device):
+    device.read_time = 1.5
+
+    first = _poll(hub, clock)
+    assert COUNTERS not in first and SW_VERSION not in first
+    assert hub.diagnostics["deferred_blocks"] == 3
+
+    device.read_time = 0.0
+    second = _poll(hub, clock)
+    assert COUNTERS in second and SW_VERSION in second
+    assert hub.diagnostics["deferred_blocks"] == 0
+
+
+def test_failed_blocks_are_read_again_in_the_next_poll(hub, clock, device):
+    device.fail.add(COUNTERS)
+    first = _poll(hub, clock)
+    assert COUNTERS in first
+    assert hub.diagnostics["failed_blocks"] == 1
+
+    device.fail.clear()
+    second = _poll(hub, clock)
+    assert COUNTERS in second
+    third = _poll(hub, clock)
+    assert COUNTERS not in third
+
+
+def _interval(hub):
+    return hub.poll_interval.total_seconds()
+
+
+def test_interval_backs_off_on_failures_up_to_the_maximum(hub):
+    hub._adapt_interval(0.1, failed=1)
+    assert _interval(hub) == DEFAULT_POLL_INTERVAL * POLL_BACKOFF_FACTOR
+
+    for _ in range(20):
+        hub._adapt_interval(0.1, failed=1)
+    assert _interval(hub) == DEFAULT_POLL_INTERVAL_MAX
+
+
+def test_interval_backs_off_on_slow_polls_and_never_undercuts_the_poll_time(hub):
+    hub._adapt_interval(DEFAULT_POLL_INTERVAL * 0.6, failed=0)
+    assert _interval(hub) == DEFAULT_POLL_INTERVAL * POLL_BACKOFF_FACTOR
+
+    # a poll taking longer than the maximum is polled at the maximum
+    hub._adapt_interval(DEFAULT_POLL_INTERVAL_MAX * 2, failed=0)
+    assert _interval(hub) == DEFAULT_POLL_INTERVAL_MAX
+
+
+def test_interval_speeds_up_on_changes_down_to_the_minimum(hub):
+    hub._read_words = hub._changed_words = 10
+    hub._adapt_interval(0.1, failed=0)
+    assert _interval(hub) == DEFAULT_POLL_INTERVAL * POLL_SPEEDUP_FACTOR
+
+    for _ in range(5):
+        hub._adapt_interval(0.1, failed=0)
+    assert _interval(hub) == DEFAULT_POLL_INTERVAL_MIN
+
+
+def test_interval_returns_to_the_configured_interval(hub):
+    for _ in range(5):
+        hub._adapt_interval(0.1, failed=1)
+    assert _interval(hub) > DEFAULT_POLL_INTERVAL
+
+    intervals = []
+    for _ in range(30):
+        hub._adapt_interval(0.1, failed=0)
+        intervals.append(_interval(hub))
+    assert intervals == sorted(intervals, reverse=True)
+    assert intervals[-1] == DEFAULT_POLL_INTERVAL
+    assert hub.diagnostics["poll_interval"] == DEFAULT_POLL_INTERVAL
+
+
+def test_register_stays_fresh_until_its_tier_misses_its_reads(hub, clock, device):
+    counter = COUNTERS[:2]
+    _poll(hub, clock)
+    assert hub.is_fresh([counter])
+
+    # slower polls followed by a shorter interval do not make it stale between its tier's reads
+    clock.now += 20 * DEFAULT_POLL_INTERVAL_MAX
+    hub.poll_interval = timedelta(seconds=DEFAULT_POLL_INTERVAL_MIN)
+    assert hub.is_fresh([counter])
+
+    device.fail.add(COUNTERS)
+    for missed in range(1, STALE_AFTER_POLLS + 1):
+        hub._poll_count = missed * TIER_POLL_CYCLES[TIER_SLOW]
+        _poll(hub, clock)
+        assert hub.is_fresh([counter]) == (missed < STALE_AFTER_POLLS)
+    # registers of the tiers read in every poll are unaffected
+    assert hub.is_fresh([(TABLE_INPUT, 1104)])
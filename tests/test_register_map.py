@@ -0,0 +1,72 @@
+"""Tests for register map compilation and block read planning."""
+
+import pytest
+
+from custom_components.ha_atrea_recuperation.register_map import (
+    ReadBlock,
+    compile_register_map,
+    plan_reads,
+    select_register_map,
+)
+
+
+def test_spans_within_max_gap_are_merged():
+    spans = [("input", 1000, 1), ("input", 1002, 1), ("input", 1007, 1)]
+    assert plan_reads(spans, max_gap=4) == [ReadBlock("input", 1000, 8)]
+
+
+def test_spans_beyond_max_gap_are_separate_blocks():
+    spans = [("input", 1000, 1), ("input", 1006, 1)]
+    assert plan_reads(spans, max_gap=4) == [ReadBlock("input", 1000, 1), ReadBlock("input", 1006, 1)]
+
+
+def test_tables_are_planned_separately():
+    spans = [("holding", 1000, 1), ("input", 1001, 1)]
+    assert plan_reads(spans) == [ReadBlock("holding", 1000, 1), ReadBlock("input", 1001, 1)]
+
+
+def test_blocks_stay_within_max_count_without_splitting_spans():
+    spans = [("input", 1000, 2), ("input", 1002, 2), ("input", 1004, 2)]
+    assert plan_reads(spans, max_count=5) == [ReadBlock("input", 1000, 4), ReadBlock("input", 1004, 2)]
+
+
+def test_overlapping_and_duplicate_spans_are_merged():
+    spans = [("input", 3200, 2), ("input", 3200, 2), ("input", 3201, 1)]
+    assert plan_reads(spans) == [ReadBlock("input", 3200, 2)]
+
+
+def test_compile_indexes_multi_register_definitions():
+    register_map = compile_register_map({"name": "t", "input": {"3200": {"name": "M1", "type": "uint32"}}})
+    assert register_map.owner("input", 3201) == 3200
+    assert register_map.spans() == [("input", 3200, 2)]
+    assert register_map.plan == [ReadBlock("input", 3200, 2)]
+
+
+def test_compile_rejects_overlapping_definitions():
+    with pytest.raises(ValueError):
+        compile_register_map({
+            "name": "t",
+            "input": {"3200": {"name": "M1", "type": "uint32"}, "3201": {"name": "M2"}},
+        })
+
+
+def test_spans_for_keys_skip_undefined_registers():
+    register_map = select_register_map(None)
+    assert register_map.spans([("input", 3200), ("input", 9999)]) == [("input", 3200, 2)]
+
+
+def test_blocks_do_not_bridge_excluded_words():
+    spans = [("input", 1000, 1), ("input", 1003, 1)]
+    assert plan_reads(spans, exclude={("input", 1001)}) == [ReadBlock("input", 1000, 1), ReadBlock("input", 1003, 1)]
+    assert plan_reads(spans, exclude={("holding", 1001)}) == [ReadBlock("input", 1000, 4)]
+
+
+def test_plan_for_leaves_out_spans_touching_excluded_words():
+    register_map = compile_register_map({
+        "name": "t",
+        "input": {"1000": {"name": "a"}, "1001": {"name": "b", "type": "uint32"}, "1003": {"name": "c"}},
+    })
+    assert register_map.plan_for(register_map.spans(), exclude={("input", 1002)}) == [
+        ReadBlock("input", 1000, 1),
+        ReadBlock("input", 1003, 1),
+    ]
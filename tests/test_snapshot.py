@@ -0,0 +1,20 @@
+"""Tests for the snapshot versions a hub publishes."""
+
+import asyncio
+
+from custom_components.ha_atrea_recuperation.const import PATH_DIRECT
+
+
+def test_polls_reading_the_same_registers_keep_the_snapshot_version(hub, clock, device):
+    async def poll():
+        snapshot = await hub.async_update()
+        clock.now += 10
+        return snapshot
+
+    first = asyncio.run(poll())
+    calls = hub.diagnostics["path_health"][PATH_DIRECT]["calls"]
+    versions = [asyncio.run(poll()).version for _ in range(3)]
+
+    assert versions == [first.version] * 3
+    assert hub.diagnostics["path_health"][PATH_DIRECT]["calls"] > calls
+    assert "path_health" not in first
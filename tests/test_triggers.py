@@ -0,0 +1,39 @@
+"""Tests for the trigger poll between regular polls."""
+
+import asyncio
+
+from custom_components.ha_atrea_recuperation.const import TABLE_INPUT, TIER_TRIGGER
+
+
+def _serve(hub, registers):
+    """Answer block reads from registers (address -> word) instead of a device."""
+
+    async def read_block(block):
+        hub._store_words(block.table, block.address, [registers[block.address + i] for i in range(block.count)])
+        return True
+
+    hub._read_block = read_block
+
+
+def test_trigger_poll_decodes_only_the_trigger_registers(hub, clock):
+    hub._trigger_interval = 0
+    published = []
+    hub.set_update_listener(lambda snapshot, tiers: published.append((dict(snapshot), set(tiers))))
+    hub._store_words(TABLE_INPUT, 3200, [100, 0])
+    hub._store_words(TABLE_INPUT, 1104, [215])
+    hub._decode()
+
+    # a held back counter jump and a register changed in the cache outside the trigger blocks
+    clock.now += 10
+    hub._store_words(TABLE_INPUT, 3200, [0x0064, 0x0007])
+    hub._decode()
+    hub._cache[TABLE_INPUT][1104] = 300
+
+    clock.now += 1
+    _serve(hub, {7103: 0, 7104: 1, 7105: 0})
+    asyncio.run(hub._async_trigger_poll(None))
+
+    assert hub._data[(TABLE_INPUT, 7104)] == 1
+    assert hub._data[(TABLE_INPUT, 3200)] == 100
+    assert hub._data[(TABLE_INPUT, 1104)] == 21.5
+    assert published and published[-1][1] == {TIER_TRIGGER}
@@ -0,0 +1,149 @@
+"""Tests for writing holding registers and reading them back."""
+
+import asyncio
+
+import pytest
+
+from custom_components.ha_atrea_recuperation import transport as transport_module
+from custom_components.ha_atrea_recuperation.const import (
+    MODBUS_ILLEGAL_FUNCTION,
+    PATH_DIRECT,
+    PATH_HA_HUB,
+    READ_WRITE_MAX_MISSES,
+    TABLE_HOLDING,
+    TABLE_INPUT,
+)
+from custom_components.ha_atrea_recuperation.modbus_tcp import ModbusError
+from custom_components.ha_atrea_recuperation.transport import ModbusTransport, PathHealth
+
+
+class RecordingTransport(ModbusTransport):
+    """Device holding registers in memory; records the operations sent to it."""
+
+    name = PATH_DIRECT
+
+    def __init__(self, endpoint=None, read_write="ok"):
+        super().__init__(1)
+        self.endpoint = endpoint
+        # FC23 behaviour: "ok" answers, "illegal" raises illegal function, "silent" returns None
+        self.read_write = read_write
+        self.holding = {}
+        self.operations = []
+
+    async def read_registers(self, table, address, count):
+        self.operations.append("read_registers")
+        return [self.holding.get(address + offset, 0) for offset in range(count)]
+
+    async def write_register(self, address, value):
+        self.operations.append("write_register")
+        self.holding[address] = value
+        return True
+
+    async def write_registers(self, address, values):
+        self.operations.append("write_registers")
+        self.holding.update((address + offset, value) for offset, value in enumerate(values))
+        return True
+
+    async def write_coil(self, address, value):
+        return True
+
+    async def read_write_registers(self, read_address, read_count, write_address, values):
+        self.operations.append("read_write_registers")
+        if self.read_write == "illegal":
+            raise ModbusError(23, MODBUS_ILLEGAL_FUNCTION)
+        if self.read_write == "silent":
+            return None
+        self.holding.update((write_address + offset, value) for offset, value in enumerate(values))
+        return [self.holding.get(read_address + offset, 0) for offset in range(read_count)]
+
+
+def _writing_hub(hub, monkeypatch, **transports):
+    monkeypatch.setattr("custom_components.ha_atrea_recuperation.hub.async_call_later", lambda *args: lambda: None)
+    monkeypatch.setattr(transport_module, "_read_write_support", {})
+    hub._transports = transports
+    hub._health = {path: PathHealth() for path in transports}
+    return hub
+
+
+def test_read_back_publishes_only_the_written_block(hub, monkeypatch):
+    transport = RecordingTransport()
+    _writing_hub(hub, monkeypatch, direct=transport)
+    published = []
+    hub.set_update_listener(lambda snapshot, tiers: published.append(snapshot))
+    # a poll in progress has read this block but not decoded it yet
+    hub._store_words(TABLE_INPUT, 1101, [250])
+
+    assert asyncio.run(hub._write_read_back(1004, [3]))
+
+    assert published[-1][(TABLE_HOLDING, 1004)] == 3
+    assert (TABLE_INPUT, 1101) not in published[-1]
+
+
+def test_read_write_answered_writes_and_reads_in_one_request(hub, monkeypatch):
+    transport = RecordingTransport("gateway:502/1")
+    _writing_hub(hub, monkeypatch, direct=transport)
+
+    assert asyncio.run(hub._write_read_back(1004, [3]))
+
+    assert transport.operations == ["read_write_registers"]
+    assert hub._data[(TABLE_HOLDING, 1004)] == 3
+
+
+def test_illegal_function_stops_read_write_at_once(hub, monkeypatch):
+    transport = RecordingTransport("gateway:502/1", read_write="illegal")
+    _writing_hub(hub, monkeypatch, direct=transport)
+
+    assert asyncio.run(hub._write_read_back(1004, [3]))
+
+    assert transport.operations == ["read_write_registers", "write_register", "read_registers"]
+    assert not transport.supports_read_write()
+
+
+def test_unanswered_read_write_is_stopped_only_after_repeated_misses(hub, monkeypatch):
+    transport = RecordingTransport("gateway:502/1", read_write="silent")
+    _writing_hub(hub, monkeypatch, direct=transport)
+
+    async def write(times):
+        for value in range(times):
+            assert await hub._write_read_back(1004, [value])
+
+    asyncio.run(write(READ_WRITE_MAX_MISSES - 1))
+    assert transport.supports_read_write()
+    assert transport.holding[1004] == READ_WRITE_MAX_MISSES - 2
+
+    asyncio.run(write(1))
+    assert not transport.supports_read_write()
+
+
+def test_read_write_miss_counts_only_when_its_own_path_took_the_write(hub, monkeypatch):
+    direct = RecordingTransport("gateway:502/1", read_write="silent")
+    ha_hub = RecordingTransport()
+    _writing_hub(hub, monkeypatch, **{PATH_DIRECT: direct, PATH_HA_HUB: ha_hub})
+
+    async def fail(address, value):
+        return False
+
+    # plain writes fail on the direct path too and go over the HA hub instead
+    direct.write_register = fail
+
+    async def write():
+        for value in range(READ_WRITE_MAX_MISSES + 1):
+            assert await hub._write_read_back(1004, [value])
+
+    asyncio.run(write())
+    assert direct.supports_read_write()
+    assert ha_hub.holding[1004] == READ_WRITE_MAX_MISSES
+
+
+@pytest.mark.parametrize("code", [2, 4])
+def test_other_read_write_exceptions_fail_the_write(hub, monkeypatch, code):
+    transport = RecordingTransport("gateway:502/1")
+
+    async def read_write_registers(*args):
+        raise ModbusError(23, code)
+
+    transport.read_write_registers = read_write_registers
+    _writing_hub(hub, monkeypatch, direct=transport)
+
+    assert not asyncio.run(hub._write_read_back(1004, [3]))
+    assert transport.supports_read_write()